@@ -1,23 +1,53 @@
+import json
+import os
+from typing import Iterator
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, jsonify, make_response, Response, request, stream_with_context
+from flask.logging import default_handler
 # from flask_cors import CORS
 
-from meal_max.models import kitchen_model
-from meal_max.models.battle_model import BattleModel
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
+from meal_max.models import kitchen_model, odds_model, tournament_model
+from meal_max.models.arena_registry import ArenaNotFoundError, ArenaRegistry, DEFAULT_ARENA_ID
+from meal_max.utils.logger import configure_logger, get_logging_stats
+from meal_max.utils.migrations import check_schema
+from meal_max.utils.random_utils import get_random_source
+from meal_max.utils.sql_utils import check_database_connection, check_table_exists, get_pool_stats
 
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Apply any pending schema migrations, or refuse to start on an outdated schema
+check_schema()
+
 app = Flask(__name__)
+# Route logs through the shared background writer instead of Flask's own stderr handler
+app.logger.removeHandler(default_handler)
+configure_logger(app.logger)
 # This bypasses standard security stuff we'll talk about later
 # If you get errors that use words like cross origin or flight,
 # uncomment this
 # CORS(app)
 
-# Initialize the BattleModel
-battle_model = BattleModel()
+# Each arena holds its own combatants, so concurrent clients do not overwrite each other's
+arena_registry = ArenaRegistry()
+
+
+def _get_arena_id() -> str:
+    """
+    Returns the arena a request acts on: ?arena_id=, else arena_id in the JSON body, else the default.
+
+    Raises:
+        ValueError: If the JSON body is not an object or the arena id is invalid.
+    """
+    arena_id = request.args.get('arena_id')
+    if arena_id is None and request.is_json:
+        data = request.get_json(silent=True)
+        if data is not None and not isinstance(data, dict):
+            raise ValueError('Invalid input, the JSON body must be an object')
+        arena_id = (data or {}).get('arena_id')
+    return DEFAULT_ARENA_ID if arena_id is None else ArenaRegistry.validate_arena_id(arena_id)
 
 ####################################################
 #
@@ -58,6 +88,30 @@ def db_check() -> Response:
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Route to expose internal performance counters for monitoring.
+
+    Returns:
+        JSON response with the database connection pool, random source, arena, meal, leaderboard, odds cache and logging counters.
+    """
+    try:
+        app.logger.info("Collecting metrics")
+        return make_response(jsonify({
+            'status': 'success',
+            'db_pool': get_pool_stats(),
+            'random_source': get_random_source().stats(),
+            'arenas': arena_registry.stats(),
+            'meal_cache': kitchen_model.meal_cache.stats(),
+            'leaderboard_cache': kitchen_model.leaderboard_cache.stats(),
+            'odds_cache': odds_model.odds_cache.stats(),
+            'logging': get_logging_stats()
+        }), 200)
+    except Exception as e:
+        app.logger.error("Error collecting metrics: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 ##########################################################
 #
@@ -87,23 +141,15 @@ def add_meal() -> Response:
     try:
         # Get the JSON data from the request
         data = request.get_json()
-
-        # Extract and validate required fields
-        meal = data.get('meal')
-        cuisine = data.get('cuisine')
-        price = data.get('price')
-        difficulty = data.get('difficulty')
-
-        if not meal or not cuisine or price is None or difficulty not in ['HIGH', 'MED', 'LOW']:
+        if not isinstance(data, dict):
             return make_response(jsonify({'error': 'Invalid input, all fields are required with valid values'}), 400)
 
-        # Check that price is a float and has at most two decimal places
+        # Validate the fields the same way bulk imports do
         try:
-            price = float(price)
-            if round(price, 2) != price:
-                raise ValueError("Price has more than two decimal places")
+            meal, cuisine, price, difficulty = kitchen_model.validate_meal(
+                data.get('meal'), data.get('cuisine'), data.get('price'), data.get('difficulty'))
         except ValueError as e:
-            return make_response(jsonify({'error': 'Price must be a valid float with at most two decimal places'}), 400)
+            return make_response(jsonify({'error': str(e)}), 400)
 
         # Call the kitchen_model function to add the combatant to the database
         app.logger.info('Adding meal: %s, %s, %.2f, %s', meal, cuisine, price, difficulty)
@@ -115,10 +161,65 @@ def add_meal() -> Response:
         app.logger.error("Failed to add combatant: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+def _ndjson_response(rows: Iterator[dict]) -> Response:
+    """Streams rows to the client as newline-delimited JSON while they are read from the database."""
+    def generate():
+        try:
+            for row in rows:
+                yield json.dumps(row) + '\n'
+        finally:
+            # Return the pooled connection even if the client disconnects mid-stream
+            rows.close()
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _iter_ndjson(stream):
+    """Yields one parsed object per non-blank line; unparseable lines are yielded as-is and reported as invalid rows."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line.decode('utf-8', errors='replace')
+
+@app.route('/api/create-meals/bulk', methods=['POST'])
+def add_meals_bulk() -> Response:
+    """
+    Route to add many meals to the database in a single transaction.
+
+    Expected Input:
+        A JSON array of meal objects, or (with Content-Type application/x-ndjson)
+        one meal object per line. Each object has the fields of /api/create-meal.
+
+    Returns:
+        JSON response with the number of meals inserted and, for each skipped
+        row, its index and whether it was a duplicate or failed validation.
+    Raises:
+        400 error if the body is not a JSON array or NDJSON.
+        500 error if there is an issue adding the meals to the database.
+    """
+    app.logger.info('Creating meals in bulk')
+    try:
+        if request.mimetype == 'application/x-ndjson':
+            meals = _iter_ndjson(request.stream)
+        else:
+            meals = request.get_json(silent=True)
+            if not isinstance(meals, list):
+                return make_response(jsonify({'error': 'Invalid input, expected a JSON array of meals or NDJSON'}), 400)
+
+        result = kitchen_model.create_meals_bulk(meals)
+
+        app.logger.info("Bulk import added %d meals", result['inserted'])
+        return make_response(jsonify({'status': 'success', **result}), 201)
+    except Exception as e:
+        app.logger.error("Failed to add meals in bulk: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/clear-meals', methods=['DELETE'])
 def clear_catalog() -> Response:
     """
-    Route to clear all meals (recreates the table).
+    Route to clear all meals (deletes every meal, keeping the schema).
 
     Returns:
         JSON response indicating success of the operation or error message.
@@ -128,7 +229,7 @@ def clear_catalog() -> Response:
         kitchen_model.clear_meals()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error clearing catalog: {e}")
+        app.logger.error("Error clearing catalog: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/delete-meal/<int:meal_id>', methods=['DELETE'])
@@ -143,12 +244,12 @@ def delete_meal(meal_id: int) -> Response:
         JSON response indicating success of the operation or error message.
     """
     try:
-        app.logger.info(f"Deleting meal by ID: {meal_id}")
+        app.logger.info("Deleting meal by ID: %s", meal_id)
 
         kitchen_model.delete_meal(meal_id)
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error deleting meal: {e}")
+        app.logger.error("Error deleting meal: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-meal-by-id/<int:meal_id>', methods=['GET'])
@@ -163,12 +264,12 @@ def get_meal_by_id(meal_id: int) -> Response:
         JSON response with the meal details or error message.
     """
     try:
-        app.logger.info(f"Retrieving meal by ID: {meal_id}")
+        app.logger.info("Retrieving meal by ID: %s", meal_id)
 
         meal = kitchen_model.get_meal_by_id(meal_id)
         return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving meal by ID: {e}")
+        app.logger.error("Error retrieving meal by ID: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-meal-by-name/<string:meal_name>', methods=['GET'])
@@ -183,7 +284,7 @@ def get_meal_by_name(meal_name: str) -> Response:
         JSON response with the meal details or error message.
     """
     try:
-        app.logger.info(f"Retrieving meal by name: {meal_name}")
+        app.logger.info("Retrieving meal by name: %s", meal_name)
 
         if not meal_name:
             return make_response(jsonify({'error': 'Meal name is required'}), 400)
@@ -191,7 +292,7 @@ def get_meal_by_name(meal_name: str) -> Response:
         meal = kitchen_model.get_meal_by_name(meal_name)
         return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving meal by name: {e}")
+        app.logger.error("Error retrieving meal by name: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -202,6 +303,52 @@ def get_meal_by_name(meal_name: str) -> Response:
 ############################################################
 
 
+@app.route('/api/create-arena', methods=['POST'])
+def create_arena() -> Response:
+    """
+    Route to open a new, empty arena.
+
+    Every battle route acts on the arena given by the arena_id query parameter
+    or JSON field, and on the shared default arena without one. Arenas other
+    than the default one must be opened here first.
+
+    Returns:
+        JSON response with the id of the new arena.
+    """
+    try:
+        arena_id = arena_registry.create_arena()
+        app.logger.info("Opened arena %s", arena_id)
+        return make_response(jsonify({'status': 'success', 'arena_id': arena_id}), 201)
+    except Exception as e:
+        app.logger.error("Failed to open arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/close-arena/<string:arena_id>', methods=['DELETE'])
+def close_arena(arena_id: str) -> Response:
+    """
+    Route to close an arena, dropping its combatants.
+
+    Path Parameter:
+        - arena_id (str): The id of the arena to close.
+
+    Returns:
+        JSON response indicating success of the operation.
+    Raises:
+        400 error if the arena id is invalid.
+        404 error if the arena does not exist.
+    """
+    try:
+        app.logger.info("Closing arena %s", arena_id)
+        if not arena_registry.close_arena(arena_id):
+            return make_response(jsonify({'error': f'Arena {arena_id} not found'}), 404)
+        return make_response(jsonify({'status': 'success'}), 200)
+    except ValueError as e:
+        app.logger.error("Failed to close arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to close arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/battle', methods=['GET'])
 def battle() -> Response:
     """
@@ -210,16 +357,26 @@ def battle() -> Response:
     Returns:
         JSON response indicating the result of the battle and the winner.
     Raises:
+        400 error if the arena id is invalid.
+        404 error if the arena does not exist.
         500 error if there is an issue during the battle.
     """
+    try:
+        arena_id = _get_arena_id()
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+
     try:
         app.logger.info('Two meals enter, one meal leaves!')
 
-        winner = battle_model.battle()
+        with arena_registry.checkout(arena_id) as battle_model:
+            winner = battle_model.battle()
 
         return make_response(jsonify({'status': 'success', 'winner': winner}), 200)
+    except ArenaNotFoundError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
     except Exception as e:
-        app.logger.error(f"Battle error: {e}")
+        app.logger.error("Battle error: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/clear-combatants', methods=['POST'])
@@ -230,13 +387,23 @@ def clear_combatants() -> Response:
     Returns:
         JSON response indicating success of the operation.
     Raises:
+        400 error if the arena id is invalid.
+        404 error if the arena does not exist.
         500 error if there is an issue clearing combatants.
     """
+    try:
+        arena_id = _get_arena_id()
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+
     try:
         app.logger.info('Clearing all combatants...')
-        battle_model.clear_combatants()
+        with arena_registry.checkout(arena_id) as battle_model:
+            battle_model.clear_combatants()
         app.logger.info('Combatants cleared.')
         return make_response(jsonify({'status': 'success'}), 200)
+    except ArenaNotFoundError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
     except Exception as e:
         app.logger.error("Failed to clear combatants: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
@@ -248,11 +415,22 @@ def get_combatants() -> Response:
 
     Returns:
         JSON response with the list of combatants.
+    Raises:
+        400 error if the arena id is invalid.
+        404 error if the arena does not exist.
+        500 error if there is an issue getting combatants.
     """
+    try:
+        arena_id = _get_arena_id()
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+
     try:
         app.logger.info('Getting combatants...')
-        combatants = battle_model.get_combatants()
+        combatants = arena_registry.get_combatants(arena_id)
         return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
+    except ArenaNotFoundError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
     except Exception as e:
         app.logger.error("Failed to get combatants: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
@@ -268,20 +446,30 @@ def prep_combatant() -> Response:
     Returns:
         JSON response indicating the success of combatant preparation.
     Raises:
+        400 error if no meal is named or the arena id is invalid.
+        404 error if the arena does not exist.
         500 error if there is an issue preparing combatants.
     """
     try:
         data = request.json
-        meal = data.get('meal')
+        meal = data.get('meal') if isinstance(data, dict) else None
         app.logger.info("Preparing combatant: %s", meal)
 
         if not meal:
             return make_response(jsonify({'error': 'You must name a combatant'}), 400)
+        try:
+            arena_id = _get_arena_id()
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
 
         try:
             meal = kitchen_model.get_meal_by_name(meal)
-            battle_model.prep_combatant(meal)
-            combatants = battle_model.get_combatants()
+            with arena_registry.checkout(arena_id) as battle_model:
+                battle_model.prep_combatant(meal)
+                # Copied, as the arena may change once it is unlocked
+                combatants = list(battle_model.get_combatants())
+        except ArenaNotFoundError as e:
+            return make_response(jsonify({'error': str(e)}), 404)
         except Exception as e:
             app.logger.error("Failed to prepare combatant: %s", str(e))
             return make_response(jsonify({'error': str(e)}), 500)
@@ -292,6 +480,143 @@ def prep_combatant() -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+############################################################
+#
+# Tournament
+#
+############################################################
+
+
+@app.route('/api/tournament', methods=['POST'])
+def tournament() -> Response:
+    """
+    Route to run a tournament between all active meals in one go.
+
+    Expected JSON Input:
+        - format (str, optional): 'round_robin' (default) or 'bracket'.
+        - seed (int, optional): Makes the outcome reproducible.
+        - record (bool, optional): Whether to add the results to the meals' stats (default: true).
+
+    Returns:
+        JSON response with the champion, the standings and the number of matches played.
+    Raises:
+        400 error if the input is invalid or there are not enough meals.
+        500 error if there is an issue running the tournament.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        fmt = data.get('format', 'round_robin')
+        seed = data.get('seed')
+        record = data.get('record', True)
+
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+            return make_response(jsonify({'error': 'seed must be a non-negative integer'}), 400)
+        if not isinstance(record, bool):
+            return make_response(jsonify({'error': 'record must be true or false'}), 400)
+
+        app.logger.info("Running a %s tournament", fmt)
+        result = tournament_model.run_tournament(fmt, seed=seed, record=record)
+        return make_response(jsonify({'status': 'success', **result}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid tournament: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Tournament error: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+
+############################################################
+#
+# Odds
+#
+############################################################
+
+
+def _parse_odds_params(params: dict) -> tuple:
+    """Returns (method, samples, seed) from query or JSON parameters, raising ValueError if they are malformed."""
+    method = params.get('method', 'analytic')
+    samples = params.get('samples', odds_model.ODDS_SAMPLES)
+    seed = params.get('seed')
+    try:
+        samples = int(samples)
+        seed = None if seed is None else int(seed)
+    except (TypeError, ValueError):
+        raise ValueError('samples and seed must be integers')
+    if seed is not None and seed < 0:
+        raise ValueError('seed must be a non-negative integer')
+    return method, samples, seed
+
+@app.route('/api/battle-odds', methods=['GET'])
+def battle_odds() -> Response:
+    """
+    Route to get each meal's chance of winning a battle, without playing it.
+
+    Query Parameters:
+        - meal1 (str): The name of the meal prepped first.
+        - meal2 (str): The name of the meal prepped second.
+        - method (str, optional): 'analytic' (default, exact) or 'monte_carlo'.
+        - samples (int, optional): Random numbers drawn by the Monte Carlo method.
+        - seed (int, optional): Makes a Monte Carlo estimate reproducible.
+
+    Returns:
+        JSON response with both meals' scores and win probabilities.
+    Raises:
+        400 error if the input is invalid or a meal is missing or deleted.
+        500 error if there is an issue computing the odds.
+    """
+    try:
+        meal1 = request.args.get('meal1')
+        meal2 = request.args.get('meal2')
+        if not meal1 or not meal2:
+            return make_response(jsonify({'error': 'You must name two meals'}), 400)
+
+        method, samples, seed = _parse_odds_params(request.args)
+        app.logger.info("Computing odds of %s against %s", meal1, meal2)
+        result = odds_model.get_battle_odds(meal1, meal2, method, samples, seed)
+        return make_response(jsonify({'status': 'success', **result}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid odds request: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Odds error: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/battle-odds/matrix', methods=['POST'])
+def battle_odds_matrix() -> Response:
+    """
+    Route to get the odds of every pair of meals in one go.
+
+    Expected JSON Input:
+        - meals (list[str], optional): The meals to include, by name. Default is all active meals.
+        - method (str, optional): 'analytic' (default, exact) or 'monte_carlo'.
+        - samples (int, optional): Random numbers drawn per meal by the Monte Carlo method.
+        - seed (int, optional): Makes a Monte Carlo estimate reproducible.
+
+    Returns:
+        JSON response with the meals and a matrix where matrix[i][j] is the chance that
+        meals[i] wins when prepped before meals[j].
+    Raises:
+        400 error if the input is invalid, a meal is missing or deleted, or there are too many meals.
+        500 error if there is an issue computing the odds.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        names = data.get('meals')
+        if names is not None and (not isinstance(names, list) or not all(isinstance(name, str) for name in names)):
+            return make_response(jsonify({'error': 'meals must be a list of meal names'}), 400)
+
+        method, samples, seed = _parse_odds_params(data)
+        app.logger.info("Computing an odds matrix (%s)", method)
+        result = odds_model.get_odds_matrix(names, method, samples, seed)
+        return make_response(jsonify({'status': 'success', **result}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid odds matrix request: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Odds matrix error: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+
 ############################################################
 #
 # Leaderboard
@@ -306,24 +631,80 @@ def get_leaderboard() -> Response:
 
     Query Parameters:
         - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+        - stream (str, optional): 'ndjson' to stream one meal per line instead of a single JSON document.
+        - limit (int, optional): The most meals to return, e.g. 10 for the top 10.
+        - offset (int, optional): How many of the best meals to skip. Default is 0.
 
     Returns:
-        JSON response with a sorted leaderboard of meals.
+        JSON response with a sorted leaderboard of meals. With limit or offset, each
+        meal also has its rank, and total gives the number of meals on the whole leaderboard.
     Raises:
+        400 error if limit or offset is invalid.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         sort_by = request.args.get('sort', 'wins')  # Default sort by wins
         app.logger.info("Generating leaderboard sorted by %s", sort_by)
 
+        if request.args.get('stream') == 'ndjson':
+            return _ndjson_response(kitchen_model.iter_leaderboard(sort_by))
+
+        if 'limit' in request.args or 'offset' in request.args:
+            try:
+                limit = request.args.get('limit')
+                limit = None if limit is None else int(limit)
+                offset = int(request.args.get('offset', 0))
+                if (limit is not None and limit < 1) or offset < 0:
+                    raise ValueError
+            except ValueError:
+                return make_response(jsonify({'error': 'limit must be a positive integer and offset zero or more'}), 400)
+            page = kitchen_model.get_leaderboard_page(sort_by, limit, offset)
+            return make_response(jsonify({'status': 'success', **page}), 200)
+
         leaderboard_data = kitchen_model.get_leaderboard(sort_by)
 
         return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
     except Exception as e:
-        app.logger.error(f"Error generating leaderboard: {e}")
+        app.logger.error("Error generating leaderboard: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+@app.route('/api/meal-rank/<int:meal_id>', methods=['GET'])
+def get_meal_rank(meal_id: int) -> Response:
+    """
+    Route to get a meal's place on the leaderboard and the meals around it.
+
+    Path Parameter:
+        - meal_id (int): The ID of the meal.
+
+    Query Parameters:
+        - sort (str): 'wins' (default) or 'win_pct'.
+        - neighbours (int, optional): How many meals to return above and below it. Default is 2.
+
+    Returns:
+        JSON response with the meal's rank, the leaderboard size and its neighbours.
+    Raises:
+        400 error if the input is invalid, or the meal is missing, deleted or has not battled yet.
+        500 error if there is an issue reading the leaderboard.
+    """
+    try:
+        sort_by = request.args.get('sort', 'wins')
+        try:
+            neighbours = int(request.args.get('neighbours', 2))
+        except ValueError:
+            return make_response(jsonify({'error': 'neighbours must be an integer'}), 400)
+        app.logger.info("Looking up the rank of meal %s by %s", meal_id, sort_by)
+
+        rank = kitchen_model.get_meal_rank(meal_id, sort_by, neighbours)
+        return make_response(jsonify({'status': 'success', **rank}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid rank lookup: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Error looking up rank: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
+    app.run(debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true', host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Benchmark recording battle outcomes, before and after single-transaction recording.
+
+Run from the meal_max directory:
+
+    python -m benchmarks.battle_benchmark --battles 5000 --meals 50 --threads 4
+
+"separate" is the old path: update_meal_stats() for the winner and for the
+loser, each a SELECT plus an UPDATE with its own commit. "single" is
+record_battle_result(): two guarded UPDATEs and one commit.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from meal_max.models import kitchen_model
+from meal_max.utils.migrations import apply_migrations, load_migrations
+from meal_max.utils.sql_utils import PRAGMA_PROFILES, ConnectionPool, get_pragma_profile
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+def record_separately(winner_id: int, loser_id: int) -> None:
+    kitchen_model.update_meal_stats(winner_id, 'win')
+    kitchen_model.update_meal_stats(loser_id, 'loss')
+
+RECORDERS = {
+    "separate": record_separately,
+    "single": kitchen_model.record_battle_result,
+}
+
+
+def bench_recorder(name: str, profile: str, battles: int, meals: int, threads: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "meal_max.db")
+        with sqlite3.connect(db_path) as conn:
+            apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+            conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)",
+                             [(f"Meal {i}", "Fusion", 10.0, "MED") for i in range(meals)])
+
+        pool = ConnectionPool(db_path, max_size=threads, pragmas=get_pragma_profile(profile))
+        record = RECORDERS[name]
+        per_thread = battles // threads
+
+        def battle(index):
+            rng = random.Random(index)
+            for _ in range(per_thread):
+                winner_id, loser_id = rng.sample(range(1, meals + 1), 2)
+                record(winner_id, loser_id)
+
+        with mock.patch.object(kitchen_model, "get_db_connection", pool.checkout):
+            workers = [threading.Thread(target=battle, args=(i,)) for i in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+
+        with sqlite3.connect(db_path) as conn:
+            recorded = conn.execute("SELECT SUM(wins) FROM meals").fetchone()[0]
+        pool.close()
+
+    return {"recorder": name, "battles/s": per_thread * threads / elapsed, "recorded": recorded}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--battles", type=int, default=5000)
+    parser.add_argument("--meals", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--profile", default="balanced", choices=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'recorder':<10} {'battles/s':>12} {'recorded':>10}")
+    for name in RECORDERS:
+        result = bench_recorder(name, args.profile, args.battles, args.meals, args.threads)
+        print(f"{result['recorder']:<10} {result['battles/s']:>12.0f} {result['recorded']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark the leaderboard under mixed read and battle traffic, with and without its cache.
+
+Run from the meal_max directory:
+
+    python -m benchmarks.leaderboard_benchmark --meals 2000 --requests 5000 --battle-share 0.05 --threads 4
+
+Each thread sends --requests / --threads requests. A --battle-share of them
+record a battle with record_battle_result(), which drops the cached
+leaderboards; the rest read get_leaderboard() sorted by wins or win_pct.
+"uncached" sets the TTL to 0, so every read goes to the database.
+
+The lookup table then times get_leaderboard_page() for a top 10 and
+get_meal_rank() for random meals on a table of --lookup-meals meals: with no
+cached ranking (index queries), then once get_leaderboard() has cached it.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from meal_max.models import kitchen_model
+from meal_max.utils.migrations import apply_migrations, load_migrations
+from meal_max.utils.sql_utils import PRAGMA_PROFILES, ConnectionPool, get_pragma_profile
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+def create_db(db_path: str, meals: int) -> None:
+    rng = random.Random(0)
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, ?, ?, ?, ?, ?)",
+                         [(f"Meal {i}", "Fusion", 10.0, "MED", 20, rng.randint(0, 20)) for i in range(meals)])
+
+def bench(mode: str, db_path: str, args: argparse.Namespace) -> dict:
+    pool = ConnectionPool(db_path, max_size=args.threads, pragmas=get_pragma_profile(args.profile))
+    cache = kitchen_model._LeaderboardCache(ttl=kitchen_model.LEADERBOARD_CACHE_TTL if mode == "cached" else 0)
+    per_thread = args.requests // args.threads
+    latencies = []
+
+    def client(index):
+        rng = random.Random(index)
+        own = []
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            if rng.random() < args.battle_share:
+                winner_id, loser_id = rng.sample(range(1, args.meals + 1), 2)
+                kitchen_model.record_battle_result(winner_id, loser_id)
+            else:
+                kitchen_model.get_leaderboard(rng.choice(kitchen_model.LEADERBOARD_SORTS))
+                own.append(time.perf_counter() - start)
+        latencies.extend(own)
+
+    with mock.patch.object(kitchen_model, "get_db_connection", pool.checkout), \
+            mock.patch.object(kitchen_model, "leaderboard_cache", cache), \
+            mock.patch.object(kitchen_model, "_meal_listeners", [cache.on_meal_change]):
+        workers = [threading.Thread(target=client, args=(i,)) for i in range(args.threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+    pool.close()
+
+    stats = cache.stats()
+    latencies.sort()
+    lookups = stats["hits"] + stats["misses"]
+    return {"mode": mode, "requests/s": per_thread * args.threads / elapsed,
+            "read p50 ms": latencies[len(latencies) // 2] * 1000,
+            "hit ratio": stats["hits"] / lookups if lookups else 0.0}
+
+def bench_lookups(db_path: str, args: argparse.Namespace) -> list[dict]:
+    pool = ConnectionPool(db_path, max_size=1, pragmas=get_pragma_profile(args.profile))
+    cache = kitchen_model._LeaderboardCache(ttl=3600)
+    rng = random.Random(1)
+    lookups = {
+        "top 10": lambda: kitchen_model.get_leaderboard_page("wins", limit=10),
+        "rank": lambda: kitchen_model.get_meal_rank(rng.randint(1, args.lookup_meals), "wins"),
+    }
+    results = []
+    with mock.patch.object(kitchen_model, "get_db_connection", pool.checkout), \
+            mock.patch.object(kitchen_model, "leaderboard_cache", cache):
+        for name, lookup in lookups.items():
+            result = {"lookup": name}
+            for mode in ("uncached", "cached"):
+                cache.on_meal_change("cleared", None)
+                if mode == "cached":
+                    kitchen_model.get_leaderboard("wins")
+                latencies = []
+                for _ in range(200):
+                    start = time.perf_counter()
+                    lookup()
+                    latencies.append(time.perf_counter() - start)
+                latencies.sort()
+                result[f"{mode} p50 us"] = latencies[100] * 1e6
+            results.append(result)
+    pool.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meals", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--battle-share", type=float, default=0.05, help="Share of requests that record a battle")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--lookup-meals", type=int, default=100000)
+    parser.add_argument("--profile", default="balanced", choices=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'mode':<10} {'requests/s':>12} {'read p50 ms':>12} {'hit ratio':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "meal_max.db")
+        create_db(db_path, args.meals)
+        for mode in ("uncached", "cached"):
+            result = bench(mode, db_path, args)
+            print(f"{result['mode']:<10} {result['requests/s']:>12.0f} {result['read p50 ms']:>12.3f} "
+                  f"{result['hit ratio']:>10.2f}")
+
+        db_path = os.path.join(tmp, "lookups.db")
+        create_db(db_path, args.lookup_meals)
+        print(f"\n{'lookup':<10} {'uncached p50 us':>16} {'cached p50 us':>14}")
+        for result in bench_lookups(db_path, args):
+            print(f"{result['lookup']:<10} {result['uncached p50 us']:>16.1f} {result['cached p50 us']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark the logging cost of one battle request under the old and new logging setups.
+
+Run from the meal_max directory:
+
+    python -m benchmarks.logging_benchmark --requests 20000 --threads 4
+
+Each request logs what a battle does: get_battle_score() for both meals (two
+INFO records each) and three DEBUG "connection returned to pool" records from
+sql_utils. stderr is redirected to a temporary file for the run.
+
+- "sync x2" is the old configure_logger(): DEBUG level and a stderr handler
+  attached twice, as happened when it ran again inside a request.
+- "queue debug" is the queue and writer thread at DEBUG.
+- "queue info" is the default INFO level.
+- "sampled" adds LOG_SAMPLE_RATES=meal_max.models.battle_model=100.
+
+Record fields are collected as with LOG_LEAN_RECORDS=true, the production
+setting, in every mode.
+
+"request us" is the mean time a request spends logging. "drained s" also
+waits for the writer thread to empty the queue. The queue is sized so that
+nothing is dropped.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from meal_max.models import battle_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils import logger as log_setup
+from meal_max.utils import sql_utils
+from meal_max.utils.logger import SamplingFilter, flush_logging, skip_unused_record_fields
+
+
+MODES = ("sync x2", "queue debug", "queue info", "sampled")
+
+
+def setup(mode: str, loggers: list[logging.Logger]) -> None:
+    queue_handler = log_setup._get_queue_handler()
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        for log_filter in list(logger.filters):
+            logger.removeFilter(log_filter)
+        if mode == "sync x2":
+            for _ in range(2):
+                handler = logging.StreamHandler(sys.stderr)
+                handler.setFormatter(logging.Formatter(log_setup.LOG_FORMAT))
+                logger.addHandler(handler)
+        else:
+            logger.addHandler(queue_handler)
+        logger.setLevel(logging.DEBUG if mode in ("sync x2", "queue debug") else logging.INFO)
+    if mode == "sampled":
+        battle_model.logger.addFilter(SamplingFilter(100))
+
+def bench(mode: str, args: argparse.Namespace) -> dict:
+    model = BattleModel()
+    meals = [Meal(id=1, meal="Pizza", cuisine="Italian", price=12.5, difficulty="LOW"),
+             Meal(id=2, meal="Sushi", cuisine="Japanese", price=20.0, difficulty="HIGH")]
+    setup(mode, [battle_model.logger, sql_utils.logger])
+    per_thread = args.requests // args.threads
+
+    def client():
+        for _ in range(per_thread):
+            for meal in meals:
+                model.get_battle_score(meal)
+            for _ in range(3):
+                sql_utils.logger.debug("Database connection returned to pool.")
+
+    workers = [threading.Thread(target=client) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    flush_logging()
+    drained = time.perf_counter() - start
+
+    return {"mode": mode, "request us": elapsed / (per_thread * args.threads) * 1e6 * args.threads,
+            "drained s": drained}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    skip_unused_record_fields()
+    # Room for every record, so the queue modes are timed without drops
+    log_setup._get_queue_handler().queue.maxsize = args.requests * 7
+    results = []
+    with tempfile.TemporaryFile() as sink:
+        saved_stderr = os.dup(2)
+        os.dup2(sink.fileno(), 2)
+        try:
+            for mode in MODES:
+                results.append(bench(mode, args))
+        finally:
+            os.dup2(saved_stderr, 2)
+            os.close(saved_stderr)
+
+    print(f"{'mode':<12} {'request us':>11} {'drained s':>10}")
+    for result in results:
+        print(f"{result['mode']:<12} {result['request us']:>11.1f} {result['drained s']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark the odds matrix: the closed form versus Monte Carlo in one process and in a process pool.
+
+Run from the meal_max directory:
+
+    python -m benchmarks.odds_benchmark --meals 500 --samples 100000 --workers 4
+
+Each engine computes the matrix of every pair among --meals meals once,
+straight from simulate_matrix() / win_probability(), so the database and
+the cache are left out. "max error" is the largest difference from the
+exact odds.
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+from meal_max.models.odds_model import simulate_matrix, win_probability
+
+
+def bench(engine: str, scores: np.ndarray, samples: int, workers: int, exact: np.ndarray) -> dict:
+    start = time.perf_counter()
+    if engine == "analytic":
+        matrix = win_probability(np.abs(scores[:, None] - scores[None, :]) / 100, "random_org")
+    else:
+        matrix = simulate_matrix(scores, samples, "random_org", seed=1, workers=workers, parallel_threshold=0)
+    elapsed = time.perf_counter() - start
+    off_diagonal = ~np.eye(len(scores), dtype=bool)
+    return {"engine": engine, "workers": workers, "elapsed": elapsed,
+            "max error": float(np.abs(matrix - exact)[off_diagonal].max())}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meals", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=100000, help="Random numbers drawn per meal")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    scores = np.random.default_rng(0).uniform(0, 300, size=args.meals)
+    exact = win_probability(np.abs(scores[:, None] - scores[None, :]) / 100, "random_org")
+
+    results = [bench("analytic", scores, args.samples, 1, exact),
+               bench("monte_carlo", scores, args.samples, 1, exact)]
+    if args.workers > 1:
+        results.append(bench("monte_carlo", scores, args.samples, args.workers, exact))
+
+    print(f"{'engine':<12} {'workers':>8} {'elapsed s':>10} {'max error':>10}")
+    for result in results:
+        print(f"{result['engine']:<12} {result['workers']:>8} {result['elapsed']:>10.3f} {result['max error']:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
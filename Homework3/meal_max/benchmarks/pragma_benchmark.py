@@ -0,0 +1,113 @@
+"""
+Benchmark read/write throughput on the meals table for each PRAGMA profile.
+
+Run from the meal_max directory:
+
+    python -m benchmarks.pragma_benchmark --rows 5000 --threads 4
+
+Every write mirrors create_meal()/update_meal_stats(): one statement and one
+commit per call, issued concurrently from several threads through the pool.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from meal_max.utils.migrations import apply_migrations, load_migrations
+from meal_max.utils.sql_utils import PRAGMA_PROFILES, ConnectionPool, get_pragma_profile
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+def run_threads(threads: int, work) -> tuple[float, int]:
+    """Runs work(thread_index) on several threads and returns (elapsed seconds, error count)."""
+    errors = []
+
+    def target(index):
+        try:
+            work(index)
+        except sqlite3.OperationalError as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start, len(errors)
+
+def bench_profile(profile: str, rows: int, threads: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "meal_max.db")
+        with sqlite3.connect(db_path) as conn:
+            apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+
+        pool = ConnectionPool(db_path, max_size=threads, pragmas=get_pragma_profile(profile))
+        per_thread = rows // threads
+
+        def insert(index):
+            for i in range(per_thread):
+                with pool.checkout() as conn:
+                    conn.execute(
+                        "INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)",
+                        (f"Meal {index}-{i}", "Italian", 5.0 + i % 20, ("LOW", "MED", "HIGH")[i % 3]),
+                    )
+                    conn.commit()
+
+        def play(index):
+            rng = random.Random(index)
+            for _ in range(per_thread):
+                meal_id = rng.randint(1, per_thread * threads)
+                with pool.checkout() as conn:
+                    conn.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,)).fetchone()
+                    conn.execute("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?", (meal_id,))
+                    conn.commit()
+
+        def read(index):
+            rng = random.Random(index)
+            for i in range(per_thread * 4):
+                with pool.checkout() as conn:
+                    if i % 100 == 0:
+                        conn.execute("SELECT id, meal, cuisine, price, difficulty, battles, wins FROM meals "
+                                     "WHERE deleted = false AND battles > 0 ORDER BY wins DESC").fetchall()
+                    else:
+                        conn.execute("SELECT id, meal, cuisine, price, difficulty, deleted FROM meals WHERE meal = ?",
+                                     (f"Meal {index}-{rng.randrange(per_thread)}",)).fetchone()
+
+        insert_time, insert_errors = run_threads(threads, insert)
+        update_time, update_errors = run_threads(threads, play)
+        read_time, read_errors = run_threads(threads, read)
+        pool.close()
+
+    total = per_thread * threads
+    return {
+        "profile": profile,
+        "inserts/s": total / insert_time,
+        "updates/s": total / update_time,
+        "reads/s": total * 4 / read_time,
+        "errors": insert_errors + update_errors + read_errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--profiles", nargs="+", default=list(PRAGMA_PROFILES), choices=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'profile':<10} {'inserts/s':>12} {'updates/s':>12} {'reads/s':>12} {'errors':>8}")
+    for profile in args.profiles:
+        result = bench_profile(profile, args.rows, args.threads)
+        print(f"{result['profile']:<10} {result['inserts/s']:>12.0f} {result['updates/s']:>12.0f} "
+              f"{result['reads/s']:>12.0f} {result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark tournaments: one prep/battle round trip per match versus the vectorized engine.
+
+Run from the meal_max directory:
+
+    python -m benchmarks.tournament_benchmark --meals 10000 --per-match 2000
+
+"per-match" plays --per-match matches the way clients do today: two
+get_meal_by_name() lookups to prep the combatants, then BattleModel.battle(),
+which records the result in its own transaction. It uses a local random source,
+so random.org latency is left out. "round_robin" and "bracket" run
+run_tournament() over all --meals meals and record every result in one batch.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from unittest import mock
+
+from meal_max.models import battle_model, kitchen_model, tournament_model
+from meal_max.utils.migrations import apply_migrations, load_migrations
+from meal_max.utils.sql_utils import PRAGMA_PROFILES, ConnectionPool, get_pragma_profile
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+CUISINES = ["Italian", "Japanese", "Mexican", "Indian", "French", "Thai", "Greek"]
+DIFFICULTIES = ["LOW", "MED", "HIGH"]
+
+
+def create_db(db_path: str, meals: int) -> None:
+    rng = random.Random(0)
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)",
+                         [(f"Meal {i}", rng.choice(CUISINES), round(rng.uniform(5, 40), 2), rng.choice(DIFFICULTIES))
+                          for i in range(meals)])
+
+def bench_per_match(meals: int, matches: int) -> dict:
+    rng = random.Random(1)
+    model = battle_model.BattleModel()
+    start = time.perf_counter()
+    for _ in range(matches):
+        first, second = rng.sample(range(meals), 2)
+        model.clear_combatants()
+        model.prep_combatant(kitchen_model.get_meal_by_name(f"Meal {first}"))
+        model.prep_combatant(kitchen_model.get_meal_by_name(f"Meal {second}"))
+        model.battle()
+    elapsed = time.perf_counter() - start
+    return {"engine": "per-match", "meals": meals, "matches": matches,
+            "matches/s": matches / elapsed, "elapsed": elapsed}
+
+def bench_tournament(fmt: str, meals: int) -> dict:
+    result = tournament_model.run_tournament(fmt, seed=1)
+    return {"engine": fmt, "meals": meals, "matches": result["matches"],
+            "matches/s": result["matches"] / result["elapsed_sec"], "elapsed": result["elapsed_sec"]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meals", type=int, default=10000)
+    parser.add_argument("--per-match", type=int, default=2000, help="Matches to play one at a time")
+    parser.add_argument("--profile", default="balanced", choices=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'engine':<12} {'meals':>8} {'matches':>12} {'matches/s':>14} {'elapsed s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "meal_max.db")
+        create_db(db_path, args.meals)
+        pool = ConnectionPool(db_path, max_size=2, pragmas=get_pragma_profile(args.profile))
+        local = random.Random(2)
+        with mock.patch.object(kitchen_model, "get_db_connection", pool.checkout), \
+                mock.patch.object(tournament_model, "get_db_connection", pool.checkout), \
+                mock.patch.object(battle_model, "get_random", lambda: round(local.random(), 2)):
+            results = [bench_per_match(args.meals, args.per_match),
+                       bench_tournament("bracket", args.meals),
+                       bench_tournament("round_robin", args.meals)]
+        pool.close()
+
+    for result in results:
+        print(f"{result['engine']:<12} {result['meals']:>8} {result['matches']:>12} "
+              f"{result['matches/s']:>14.0f} {result['elapsed']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,5 +13,9 @@ else
     echo "Skipping database creation."
 fi
 
-# Start the Python application
-exec python app.py
+# Start the application: gunicorn in production, else Flask's development server
+if [ "$APP_ENV" = "production" ]; then
+    exec gunicorn -c gunicorn.conf.py app:app
+else
+    exec python app.py
+fi
@@ -0,0 +1,330 @@
+from contextlib import contextmanager
+from dataclasses import asdict
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, Optional
+import uuid
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Arenas unused for this many seconds are dropped, along with their combatants
+ARENA_IDLE_TIMEOUT = float(os.getenv("ARENA_IDLE_TIMEOUT", "600"))
+# The most arenas kept at once; beyond it the least recently used idle arena is dropped
+ARENA_MAX_COUNT = int(os.getenv("ARENA_MAX_COUNT", "10000"))
+
+# Seconds a request may hold an arena before another request may take it over. Keep it
+# at least the server's request timeout, so a live request never loses its arena.
+ARENA_LOCK_LEASE = float(os.getenv("ARENA_LOCK_LEASE", "30"))
+# Seconds a request waits for a busy arena before giving up
+ARENA_LOCK_WAIT = float(os.getenv("ARENA_LOCK_WAIT", "10"))
+# First and longest pause between attempts to take a busy arena
+ARENA_LOCK_POLL = 0.005
+ARENA_LOCK_POLL_MAX = 0.1
+
+# The arena used by requests that do not name one
+DEFAULT_ARENA_ID = "default"
+
+ARENA_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Arenas a request may use: the default one, any used within the idle timeout, and any held under a live lease
+_LIVE_ARENA = "(id = ? OR last_used > ? OR locked_until >= ?)"
+
+
+class ArenaNotFoundError(LookupError):
+    """Raised when a request names an arena that was never created, or was closed or dropped."""
+
+
+class ArenaRegistry:
+    """
+    Keeps a separate set of combatants for each arena, so clients can prep and
+    fight their own combatants without overwriting each other's.
+
+    Arenas live in the arenas table, so every worker process sees the same
+    ones. A request that changes an arena takes a lease on it: such requests
+    to the same arena take turns, in this process or any other, while battles
+    in different arenas run in parallel. Reading the combatants takes no lease.
+
+    Arenas are opened with create_arena(); only the default arena is created
+    on first use. An arena idle for idle_timeout seconds is treated as gone,
+    and each create_arena() deletes those, then, when more than max_arenas
+    exist, the least recently used. An arena is never dropped while a request
+    holds its lease, and the default arena never expires.
+
+    Attributes:
+        idle_timeout (float): Seconds after its last use that an arena is dropped.
+        max_arenas (int): The most arenas kept at once.
+        lock_lease (float): Seconds a request may hold an arena before another may take it over.
+        lock_wait (float): Seconds a request waits for a busy arena.
+    """
+
+    def __init__(self, idle_timeout: float = ARENA_IDLE_TIMEOUT, max_arenas: int = ARENA_MAX_COUNT,
+                 lock_lease: float = ARENA_LOCK_LEASE, lock_wait: float = ARENA_LOCK_WAIT,
+                 clock: Callable[[], float] = time.time):
+        if max_arenas < 1:
+            raise ValueError(f"Invalid arena limit: {max_arenas} (must be at least 1).")
+        self.idle_timeout = idle_timeout
+        self.max_arenas = max_arenas
+        self.lock_lease = lock_lease
+        self.lock_wait = lock_wait
+        # Wall clock time, as the times are compared across processes
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Counts for this process only
+        self._stats = {"created": 0, "expired": 0, "evicted": 0, "busy_waits": 0, "lost_leases": 0}
+
+    @staticmethod
+    def new_arena_id() -> str:
+        """Returns a fresh, unguessable arena id."""
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def validate_arena_id(arena_id: str) -> str:
+        """
+        Checks that an arena id is 1 to 64 letters, digits, dashes or underscores.
+
+        Raises:
+            ValueError: If the arena id is invalid.
+        """
+        if not isinstance(arena_id, str) or not ARENA_ID_PATTERN.match(arena_id):
+            logger.error("Invalid arena id: %s", arena_id)
+            raise ValueError(f"Invalid arena id: {arena_id}")
+        return arena_id
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def _live_arena_args(self, arena_id: str, now: float) -> tuple:
+        return (arena_id, DEFAULT_ARENA_ID, now - self.idle_timeout, now)
+
+    def create_arena(self, arena_id: Optional[str] = None) -> str:
+        """
+        Opens a new, empty arena, first dropping idle arenas and, beyond max_arenas, the least recently used.
+
+        Args:
+            arena_id (Optional[str]): The id to open it under; a new_arena_id() when not given.
+
+        Returns:
+            str: The arena id.
+
+        Raises:
+            ValueError: If the arena id is invalid or already in use.
+            sqlite3.Error: If any database error occurs.
+        """
+        arena_id = self.new_arena_id() if arena_id is None else self.validate_arena_id(arena_id)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                # Idle arenas, unless a request holds a live lease on them
+                cursor.execute("""
+                    DELETE FROM arenas
+                    WHERE id != ? AND last_used <= ? AND (lock_token IS NULL OR locked_until < ?)
+                """, (DEFAULT_ARENA_ID, now - self.idle_timeout, now))
+                expired = cursor.rowcount
+
+                cursor.execute("INSERT OR IGNORE INTO arenas (id, last_used) VALUES (?, ?)", (arena_id, now))
+                if cursor.rowcount != 1:
+                    logger.error("Arena %s already exists", arena_id)
+                    raise ValueError(f"Arena {arena_id} already exists")
+
+                cursor.execute("SELECT COUNT(*) FROM arenas")
+                excess = cursor.fetchone()[0] - self.max_arenas
+                evicted = 0
+                if excess > 0:
+                    cursor.execute("""
+                        DELETE FROM arenas WHERE id IN (
+                            SELECT id FROM arenas
+                            WHERE id NOT IN (?, ?) AND (lock_token IS NULL OR locked_until < ?)
+                            ORDER BY last_used LIMIT ?
+                        )
+                    """, (arena_id, DEFAULT_ARENA_ID, now, excess))
+                    evicted = cursor.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self._count("created")
+        logger.info("Created arena %s", arena_id)
+        if expired:
+            self._count("expired", expired)
+            logger.info("Dropped %d arenas idle for %.0f seconds", expired, self.idle_timeout)
+        if evicted:
+            self._count("evicted", evicted)
+            logger.info("Evicted %d arenas to stay within %d arenas", evicted, self.max_arenas)
+        return arena_id
+
+    def get_combatants(self, arena_id: str = DEFAULT_ARENA_ID) -> list[Meal]:
+        """
+        Reads an arena's combatants without taking its lease.
+
+        A request that holds the lease may be changing them; this returns
+        them as last saved. Reading does not count as using the arena.
+
+        Args:
+            arena_id (str): The arena id.
+
+        Returns:
+            list[Meal]: The arena's combatants.
+
+        Raises:
+            ValueError: If the arena id is invalid.
+            ArenaNotFoundError: If the arena does not exist.
+            sqlite3.Error: If any database error occurs.
+        """
+        self.validate_arena_id(arena_id)
+        with get_db_connection() as conn:
+            row = conn.execute(f"SELECT combatants FROM arenas WHERE id = ? AND {_LIVE_ARENA}",
+                               self._live_arena_args(arena_id, self._clock())).fetchone()
+        if row is None:
+            if arena_id == DEFAULT_ARENA_ID:
+                return []
+            logger.error("Arena %s not found", arena_id)
+            raise ArenaNotFoundError(f"Arena {arena_id} not found")
+        return [Meal(**fields) for fields in json.loads(row[0])]
+
+    def _try_acquire(self, arena_id: str, token: str) -> Optional[list[Meal]]:
+        """
+        Takes the arena's lease if it is free. Returns its combatants, or None if it is busy.
+
+        Raises:
+            ArenaNotFoundError: If the arena does not exist.
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                created = False
+                if arena_id == DEFAULT_ARENA_ID:
+                    cursor.execute("INSERT OR IGNORE INTO arenas (id, last_used) VALUES (?, ?)", (arena_id, now))
+                    created = cursor.rowcount == 1
+
+                cursor.execute(f"""
+                    SELECT combatants, lock_token IS NULL OR locked_until < ? FROM arenas
+                    WHERE id = ? AND {_LIVE_ARENA}
+                """, (now, *self._live_arena_args(arena_id, now)))
+                row = cursor.fetchone()
+                combatants = None
+                if row is not None and row[1]:
+                    cursor.execute("UPDATE arenas SET lock_token = ?, locked_until = ?, last_used = ? WHERE id = ?",
+                                   (token, now + self.lock_lease, now, arena_id))
+                    combatants = [Meal(**fields) for fields in json.loads(row[0])]
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        if created:
+            self._count("created")
+            logger.info("Created arena %s", arena_id)
+        if row is None:
+            logger.error("Arena %s not found", arena_id)
+            raise ArenaNotFoundError(f"Arena {arena_id} not found")
+        return combatants
+
+    def _release(self, arena_id: str, token: str, combatants: list[Meal]) -> None:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE arenas SET combatants = ?, last_used = ?, lock_token = NULL, locked_until = NULL
+                WHERE id = ? AND lock_token = ?
+            """, (json.dumps([asdict(meal) for meal in combatants]), self._clock(), arena_id, token))
+            released = cursor.rowcount == 1
+            conn.commit()
+        if not released:
+            self._count("lost_leases")
+            logger.warning("Arena %s was closed or its lease ran out while in use; its changes were dropped", arena_id)
+
+    @contextmanager
+    def checkout(self, arena_id: str = DEFAULT_ARENA_ID) -> Iterator[BattleModel]:
+        """
+        Lends out an arena's BattleModel for the duration of one request.
+
+        The combatants are loaded when the lease is taken and saved when it is
+        given back, so changes made to the model inside the block are kept.
+
+        Args:
+            arena_id (str): The arena id.
+
+        Yields:
+            BattleModel: The arena's battle model, locked against other requests to the same arena.
+
+        Raises:
+            ValueError: If the arena id is invalid.
+            ArenaNotFoundError: If the arena does not exist; only the default arena is created here.
+            RuntimeError: If the arena stays busy for lock_wait seconds.
+            sqlite3.Error: If any database error occurs.
+        """
+        self.validate_arena_id(arena_id)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_wait
+        delay = ARENA_LOCK_POLL
+        while True:
+            combatants = self._try_acquire(arena_id, token)
+            if combatants is not None:
+                break
+            if time.monotonic() >= deadline:
+                logger.error("Arena %s stayed busy for %.1f seconds", arena_id, self.lock_wait)
+                raise RuntimeError(f"Arena {arena_id} is busy, please retry")
+            self._count("busy_waits")
+            time.sleep(delay)
+            delay = min(delay * 2, ARENA_LOCK_POLL_MAX)
+
+        battle_model = BattleModel()
+        battle_model.combatants = combatants
+        try:
+            yield battle_model
+        finally:
+            self._release(arena_id, token, battle_model.combatants)
+
+    def close_arena(self, arena_id: str) -> bool:
+        """
+        Drops an arena and its combatants.
+
+        Args:
+            arena_id (str): The arena id.
+
+        Returns:
+            bool: Whether the arena existed.
+
+        Raises:
+            ValueError: If the arena id is invalid.
+            sqlite3.Error: If any database error occurs.
+        """
+        self.validate_arena_id(arena_id)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM arenas WHERE id = ?", (arena_id,))
+            closed = cursor.rowcount == 1
+            conn.commit()
+        if closed:
+            logger.info("Closed arena %s", arena_id)
+        return closed
+
+    def stats(self) -> dict:
+        """Returns the number of arenas in the database and this process's counters."""
+        try:
+            with get_db_connection() as conn:
+                active = conn.execute("SELECT COUNT(*) FROM arenas").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+        with self._lock:
+            return {"active": active, "max_arenas": self.max_arenas, "idle_timeout": self.idle_timeout,
+                    "lock_lease": self.lock_lease, **self._stats}
@@ -1,7 +1,7 @@
 import logging
 from typing import List
 
-from meal_max.models.kitchen_model import Meal, update_meal_stats
+from meal_max.models.kitchen_model import Meal, record_battle_result
 from meal_max.utils.logger import configure_logger
 from meal_max.utils.random_utils import get_random
 
@@ -10,6 +10,10 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Subtracted from a meal's battle score; easier meals score higher
+DIFFICULTY_MODIFIER = {"HIGH": 1, "MED": 2, "LOW": 3}
+
+
 class BattleModel:
 
     def __init__(self):
@@ -59,9 +63,8 @@ class BattleModel:
         # Log the winner
         logger.info("The winner is: %s", winner.meal)
 
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
+        # Update stats for both combatants in one transaction
+        record_battle_result(winner.id, loser.id)
 
         # Remove the losing combatant from combatants
         self.combatants.remove(loser)
@@ -73,14 +76,13 @@ class BattleModel:
         self.combatants.clear()
 
     def get_battle_score(self, combatant: Meal) -> float:
-        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
 
         # Log the calculation process
         logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
                     combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
 
         # Calculate score
-        score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
+        score = (combatant.price * len(combatant.cuisine)) - DIFFICULTY_MODIFIER[combatant.difficulty]
 
         # Log the calculated score
         logger.info("Battle score for %s: %.3f", combatant.meal, score)
@@ -95,6 +97,10 @@ class BattleModel:
         if len(self.combatants) >= 2:
             logger.error("Attempted to add combatant '%s' but combatants list is full", combatant_data.meal)
             raise ValueError("Combatant list is full, cannot add more combatants.")
+        if any(combatant.id == combatant_data.id for combatant in self.combatants):
+            # record_battle_result() rejects a meal battling itself, so refuse it before the battle
+            logger.error("Attempted to add combatant '%s' twice", combatant_data.meal)
+            raise ValueError(f"Meal '{combatant_data.meal}' is already a combatant.")
 
         # Log the addition of the combatant
         logger.info("Adding combatant '%s' to combatants list", combatant_data.meal)
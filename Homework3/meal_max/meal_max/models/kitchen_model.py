@@ -2,8 +2,10 @@ from dataclasses import dataclass
 import logging
 import os
 import sqlite3
-from typing import Any
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
 
+from meal_max.utils.cache import LRUCache
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
 
@@ -12,6 +14,26 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# How many names create_meals_bulk() checks per duplicate lookup query
+BULK_LOOKUP_CHUNK = 500
+
+# Rows fetched per round trip when streaming the leaderboard
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+# Called as callback(event, meal_ids) after meals change, e.g. to drop cached results
+_meal_listeners: list[Callable[[str, Optional[tuple[int, ...]]], None]] = []
+
+# Seconds a cached leaderboard is served for at most. Writes through this module drop it
+# at once; the TTL bounds how stale it gets when another process writes. 0 turns it off.
+LEADERBOARD_CACHE_TTL = float(os.getenv("LEADERBOARD_CACHE_TTL", "5"))
+LEADERBOARD_SORTS = ("wins", "win_pct")
+
+# Meals kept by get_meal_by_id() and get_meal_by_name(). Deletes and clears through this
+# module drop them; the TTL bounds how long another process's delete goes unnoticed.
+MEAL_CACHE_SIZE = int(os.getenv("MEAL_CACHE_SIZE", "1024"))
+MEAL_CACHE_TTL = float(os.getenv("MEAL_CACHE_TTL", "60"))
+
+
 @dataclass
 class Meal:
     id: int
@@ -27,11 +49,53 @@ class Meal:
             raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
 
 
-def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
-    if not isinstance(price, (int, float)) or price <= 0:
+def add_meal_listener(callback: Callable[[str, Optional[tuple[int, ...]]], None]) -> None:
+    """
+    Registers a function to call after meals change.
+
+    Args:
+        callback: Called with the event ("created", "stats", "deleted" or "cleared")
+            and the ids of the meals that changed, or None when every meal did or the ids are unknown.
+    """
+    _meal_listeners.append(callback)
+
+def _notify(event: str, meal_ids: Optional[tuple[int, ...]] = None) -> None:
+    for callback in list(_meal_listeners):
+        try:
+            callback(event, meal_ids)
+        except Exception:
+            logger.exception("Meal listener failed on %s event", event)
+
+def validate_meal(meal: Any, cuisine: Any, price: Any, difficulty: Any) -> tuple[str, str, float, str]:
+    """
+    Checks the fields of a new meal, for /api/create-meal and bulk imports alike.
+
+    The price may be a number or a numeric string, such as "12.5".
+
+    Returns:
+        tuple[str, str, float, str]: The meal, cuisine, price as a float and difficulty.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    if not isinstance(meal, str) or not meal or not isinstance(cuisine, str) or not cuisine:
+        raise ValueError("Invalid input, meal and cuisine are required")
+    try:
+        if isinstance(price, bool):
+            raise TypeError
+        value = float(price)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if not value > 0:
         raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if round(value, 2) != value:
+        raise ValueError(f"Invalid price: {price}. Price must have at most two decimal places.")
     if difficulty not in ['LOW', 'MED', 'HIGH']:
         raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    return (meal, cuisine, value, difficulty)
+
+def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
+    meal, cuisine, price, difficulty = validate_meal(meal, cuisine, price, difficulty)
 
     try:
         with get_db_connection() as conn:
@@ -43,6 +107,7 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
             conn.commit()
 
             logger.info("Meal successfully added to the database: %s", meal)
+        _notify("created", (cursor.lastrowid,))
 
     except sqlite3.IntegrityError:
         logger.error("Duplicate meal name: %s", meal)
@@ -52,22 +117,96 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
+def _validate_meal_row(row: Any) -> tuple[str, str, float, str]:
+    if not isinstance(row, dict):
+        raise ValueError("Invalid input, each meal must be a JSON object")
+    return validate_meal(row.get('meal'), row.get('cuisine'), row.get('price'), row.get('difficulty'))
+
+def create_meals_bulk(meals: Iterable[Any]) -> dict[str, Any]:
+    """
+    Inserts many meals with a single executemany in one transaction.
+
+    Rows that fail validation or whose name already exists (in the table or
+    earlier in the batch) are reported and skipped; the rest are inserted.
+
+    Returns:
+        dict[str, Any]: The number of inserted meals and, per skipped row,
+            its index in the input along with the reason.
+
+    Raises:
+        sqlite3.Error: If any database error occurs; nothing is inserted.
+    """
+    valid = []
+    seen = set()
+    errors = []
+    duplicates = []
+    for index, row in enumerate(meals):
+        try:
+            values = _validate_meal_row(row)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        if values[0] in seen:
+            duplicates.append({'index': index, 'meal': values[0]})
+            continue
+        seen.add(values[0])
+        valid.append((index, values))
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock up front so no other writer can insert a name between the check and the insert
+            cursor.execute("BEGIN IMMEDIATE")
+
+            existing = set()
+            names = [values[0] for _, values in valid]
+            for start in range(0, len(names), BULK_LOOKUP_CHUNK):
+                chunk = names[start:start + BULK_LOOKUP_CHUNK]
+                cursor.execute("SELECT meal FROM meals WHERE meal IN (%s)" % ", ".join("?" * len(chunk)), chunk)
+                existing.update(row[0] for row in cursor.fetchall())
+
+            rows = []
+            for index, values in valid:
+                if values[0] in existing:
+                    duplicates.append({'index': index, 'meal': values[0]})
+                else:
+                    rows.append(values)
+
+            cursor.executemany("""
+                INSERT INTO meals (meal, cuisine, price, difficulty)
+                VALUES (?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+
+            logger.info("Bulk insert added %d meals (%d duplicates, %d invalid)", len(rows), len(duplicates), len(errors))
+
+    except sqlite3.Error as e:
+        logger.error("Database error during bulk insert: %s", str(e))
+        raise e
+
+    if rows:
+        _notify("created")
+    duplicates.sort(key=lambda duplicate: duplicate['index'])
+    return {'inserted': len(rows), 'duplicates': duplicates, 'errors': errors}
+
 def clear_meals() -> None:
     """
-    Recreates the meals table, effectively deleting all meals.
+    Deletes all meals, keeping the table, its indexes and the schema version.
+
+    Ids start again from 1, as they did when the table was recreated.
 
     Raises:
         sqlite3.Error: If any database error occurs.
     """
     try:
-        with open(os.getenv("SQL_CREATE_TABLE_PATH", "/app/sql/create_meal_table.sql"), "r") as fh:
-            create_table_script = fh.read()
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.executescript(create_table_script)
+            cursor.execute("DELETE FROM meals")
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'meals'")
             conn.commit()
 
             logger.info("Meals cleared successfully.")
+        _notify("cleared")
 
     except sqlite3.Error as e:
         logger.error("Database error while clearing meals: %s", str(e))
@@ -91,53 +230,320 @@ def delete_meal(meal_id: int) -> None:
             conn.commit()
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
+        _notify("deleted", (meal_id,))
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
+def _leaderboard_query(sort_by: str) -> str:
+    # win_pct is a generated column; the filter matches the partial leaderboard
+    # indexes from migration 0002, which also serve the ORDER BY.
     query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+        SELECT id, meal, cuisine, price, difficulty, battles, wins, win_pct
+        FROM meals WHERE deleted = FALSE AND battles > 0
     """
 
     if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
+        query += " ORDER BY win_pct DESC, id"
     elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
+        query += " ORDER BY wins DESC, id"
     else:
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    return query
+
+def _leaderboard_entry(row: tuple) -> dict[str, Any]:
+    return {
+        'id': row[0],
+        'meal': row[1],
+        'cuisine': row[2],
+        'price': row[3],
+        'difficulty': row[4],
+        'battles': row[5],
+        'wins': row[6],
+        'win_pct': round(row[7] * 100, 1)  # Convert to percentage
+    }
+
+class _Ranking:
+    """
+    One sort order of the leaderboard, with each meal's position in it.
+
+    Attributes:
+        entries (list[dict[str, Any]]): The leaderboard entries, best first.
+        positions (dict[int, int]): The index of each meal's entry, by meal id.
+    """
+
+    __slots__ = ("entries", "positions")
+
+    def __init__(self, entries: list[dict[str, Any]]):
+        self.entries = entries
+        self.positions = {entry['id']: index for index, entry in enumerate(entries)}
+
+
+class _LeaderboardCache:
+    """
+    The last ranking read for each sort order.
+
+    Every write through this module drops all of them: any stats change can
+    reorder both sorts. New meals have no battles yet, so creating one leaves
+    the cache alone. The cache generation keeps a read that raced with a
+    write from caching what it read before the write.
+    """
+
+    def __init__(self, ttl: float = LEADERBOARD_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.cache = LRUCache(maxsize=len(LEADERBOARD_SORTS), ttl=ttl, clock=clock)
+
+    def on_meal_change(self, event: str, meal_ids: Optional[tuple[int, ...]]) -> None:
+        if event != "created":
+            self.cache.clear()
+
+    def version(self) -> int:
+        return self.cache.generation()
+
+    def get(self, sort_by: str) -> Optional[_Ranking]:
+        return self.cache.get(sort_by)
+
+    def put(self, sort_by: str, ranking: _Ranking, version: int) -> None:
+        self.cache.put(sort_by, ranking, version)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+leaderboard_cache = _LeaderboardCache()
+add_meal_listener(leaderboard_cache.on_meal_change)
+
+
+def _get_ranking(sort_by: str) -> _Ranking:
+    query = _leaderboard_query(sort_by)
+    ranking = leaderboard_cache.get(sort_by)
+    if ranking is not None:
+        return ranking
 
     try:
+        version = leaderboard_cache.version()
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query)
             rows = cursor.fetchall()
 
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7] * 100, 1)  # Convert to percentage
-            }
-            leaderboard.append(meal)
+        ranking = _Ranking([_leaderboard_entry(row) for row in rows])
+        leaderboard_cache.put(sort_by, ranking, version)
 
         logger.info("Leaderboard retrieved successfully")
-        return leaderboard
+        return ranking
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_leaderboard(sort_by: str="wins") -> list[dict[str, Any]]:
+    """
+    Returns the meals with at least one battle, best first.
+
+    Served from the leaderboard cache when possible; the list is shared
+    between callers, so it must not be modified.
+
+    Raises:
+        ValueError: If sort_by is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    return _get_ranking(sort_by).entries
+
+def _query_leaderboard_page(sort_by: str, limit: int, offset: int) -> tuple[list[tuple], int]:
+    # Reads just the page in index order, and the total, from one snapshot
+    query = _leaderboard_query(sort_by) + " LIMIT ? OFFSET ?"
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute(query, (limit, offset))
+                rows = cursor.fetchall()
+                cursor.execute("SELECT COUNT(*) FROM meals WHERE deleted = FALSE AND battles > 0")
+                total = cursor.fetchone()[0]
+            finally:
+                conn.rollback()
+        return rows, total
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_leaderboard_page(sort_by: str="wins", limit: Optional[int]=None, offset: int=0) -> dict[str, Any]:
+    """
+    Returns one page of the leaderboard, e.g. the top 10.
+
+    Sliced from the cached ranking when there is one. Otherwise the page is
+    read from the leaderboard index with LIMIT/OFFSET, which is much cheaper
+    than loading the whole ranking on a large table.
+
+    Args:
+        sort_by (str): "wins" or "win_pct".
+        limit (Optional[int]): The most entries to return; all of them when None.
+        offset (int): How many of the best entries to skip.
+
+    Returns:
+        dict[str, Any]: The entries, each with its rank, and the number of meals on the whole leaderboard.
+
+    Raises:
+        ValueError: If sort_by, limit or offset is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError(f"Invalid limit: {limit}. Must be a positive integer.")
+    if offset < 0:
+        raise ValueError(f"Invalid offset: {offset}. Must be zero or more.")
+
+    _leaderboard_query(sort_by)
+    ranking = leaderboard_cache.get(sort_by)
+    if ranking is None and limit is not None:
+        rows, total = _query_leaderboard_page(sort_by, limit, offset)
+        entries = [_leaderboard_entry(row) for row in rows]
+    else:
+        ranking = ranking or _get_ranking(sort_by)
+        total = len(ranking.entries)
+        entries = ranking.entries[offset:total if limit is None else offset + limit]
+
+    page = [{'rank': offset + index + 1, **entry} for index, entry in enumerate(entries)]
+    return {'leaderboard': page, 'total': total, 'offset': offset, 'limit': limit}
+
+def _query_meal_rank(meal_id: int, sort_by: str, neighbours: int) -> tuple[int, int, list[tuple], tuple, list[tuple]]:
+    # Counts the meals ahead with two index range searches, then reads the meal and its neighbours
+    query = _leaderboard_query(sort_by) + " LIMIT ? OFFSET ?"
+    column = sort_by  # Validated by _leaderboard_query
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute(f"SELECT {column}, battles, deleted FROM meals WHERE id = ?", (meal_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                value, battles, deleted = row
+                if deleted:
+                    logger.info("Meal with ID %s has been deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+                if battles == 0:
+                    logger.info("Meal with ID %s has not battled yet", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} has not battled yet")
+
+                cursor.execute(f"SELECT COUNT(*) FROM meals WHERE deleted = FALSE AND battles > 0 AND {column} > ?",
+                               (value,))
+                index = cursor.fetchone()[0]
+                cursor.execute(f"SELECT COUNT(*) FROM meals WHERE deleted = FALSE AND battles > 0 AND {column} = ? AND id < ?",
+                               (value, meal_id))
+                index += cursor.fetchone()[0]
+                cursor.execute("SELECT COUNT(*) FROM meals WHERE deleted = FALSE AND battles > 0")
+                total = cursor.fetchone()[0]
+
+                start = max(index - neighbours, 0)
+                cursor.execute(query, (index - start + 1 + neighbours, start))
+                rows = cursor.fetchall()
+            finally:
+                conn.rollback()
+        return index, total, rows[:index - start], rows[index - start], rows[index - start + 1:]
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_meal_rank(meal_id: int, sort_by: str="wins", neighbours: int=2) -> dict[str, Any]:
+    """
+    Returns a meal's place on the leaderboard, with the meals just above and below it.
+
+    Ranks start at 1 and follow the leaderboard order, so ties go to the lower id.
+    Read from the cached ranking when there is one, otherwise with index
+    range counts rather than loading the whole ranking.
+
+    Args:
+        meal_id (int): The meal to look up.
+        sort_by (str): "wins" or "win_pct".
+        neighbours (int): How many meals to include on each side.
+
+    Returns:
+        dict[str, Any]: The rank, the number of meals on the leaderboard, the meal's
+            entry, and the entries above (best first) and below it.
+
+    Raises:
+        ValueError: If sort_by or neighbours is invalid, or the meal is missing,
+            deleted or has not battled yet.
+        sqlite3.Error: If any database error occurs.
+    """
+    if neighbours < 0:
+        raise ValueError(f"Invalid neighbours: {neighbours}. Must be zero or more.")
+
+    _leaderboard_query(sort_by)
+    ranking = leaderboard_cache.get(sort_by)
+    index = None if ranking is None else ranking.positions.get(meal_id)
+    if index is None:
+        # Not cached, or not on the cached ranking: the query says which, and why
+        index, total, above, meal, below = _query_meal_rank(meal_id, sort_by, neighbours)
+        return {
+            'rank': index + 1,
+            'total': total,
+            'meal': _leaderboard_entry(meal),
+            'above': [_leaderboard_entry(row) for row in above],
+            'below': [_leaderboard_entry(row) for row in below],
+        }
+
+    entries = ranking.entries
+    return {
+        'rank': index + 1,
+        'total': len(entries),
+        'meal': entries[index],
+        'above': entries[max(index - neighbours, 0):index],
+        'below': entries[index + 1:index + 1 + neighbours],
+    }
+
+def iter_leaderboard(sort_by: str="wins", batch_size: int=EXPORT_BATCH_SIZE) -> Iterator[dict[str, Any]]:
+    # Validate sort_by now rather than on the first row of the stream
+    query = _leaderboard_query(sort_by)
+    return _stream_leaderboard(query, batch_size)
+
+def _stream_leaderboard(query: str, batch_size: int) -> Iterator[dict[str, Any]]:
+    # Fetches rows in batches so memory use stays flat; the pooled connection
+    # stays checked out until the generator is exhausted or closed.
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _leaderboard_entry(row)
+
+        logger.info("Leaderboard streamed successfully")
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
 
+meal_cache = LRUCache(maxsize=MEAL_CACHE_SIZE, ttl=MEAL_CACHE_TTL)
+
+def _on_meal_change(event: str, meal_ids: Optional[tuple[int, ...]]) -> None:
+    # A deleted meal may be cached under its name only, so drop every meal;
+    # deletes are rare next to lookups. Stats are not part of a Meal.
+    if event in ("deleted", "cleared"):
+        meal_cache.clear()
+
+add_meal_listener(_on_meal_change)
+
+def _cache_meal(meal: Meal, generation: int) -> None:
+    meal_cache.put(("id", meal.id), meal, generation)
+    meal_cache.put(("name", meal.meal), meal, generation)
+
 def get_meal_by_id(meal_id: int) -> Meal:
+    meal = meal_cache.get(("id", meal_id))
+    if meal is not None:
+        return meal
+
+    generation = meal_cache.generation()
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -148,7 +554,9 @@ def get_meal_by_id(meal_id: int) -> Meal:
                 if row[5]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                _cache_meal(meal, generation)
+                return meal
             else:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
@@ -159,6 +567,11 @@ def get_meal_by_id(meal_id: int) -> Meal:
 
 
 def get_meal_by_name(meal_name: str) -> Meal:
+    meal = meal_cache.get(("name", meal_name))
+    if meal is not None:
+        return meal
+
+    generation = meal_cache.generation()
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -169,7 +582,9 @@ def get_meal_by_name(meal_name: str) -> Meal:
                 if row[5]:
                     logger.info("Meal with name %s has been deleted", meal_name)
                     raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                _cache_meal(meal, generation)
+                return meal
             else:
                 logger.info("Meal with name %s not found", meal_name)
                 raise ValueError(f"Meal with name {meal_name} not found")
@@ -179,6 +594,86 @@ def get_meal_by_name(meal_name: str) -> Meal:
         raise e
 
 
+def record_battle_result(winner_id: int, loser_id: int) -> None:
+    """
+    Records a battle's outcome for both meals in one transaction.
+
+    Each UPDATE only matches a meal that exists and is not deleted, so the
+    common case is two statements and one commit. If either meal is missing
+    or deleted, neither meal's stats change.
+
+    Raises:
+        ValueError: If the meals are the same, or either is missing or deleted.
+        sqlite3.Error: If any database error occurs.
+    """
+    if winner_id == loser_id:
+        raise ValueError(f"Meal with ID {winner_id} cannot battle itself")
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for meal_id, query in (
+                (winner_id, "UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ? AND deleted = FALSE"),
+                (loser_id, "UPDATE meals SET battles = battles + 1 WHERE id = ? AND deleted = FALSE"),
+            ):
+                cursor.execute(query, (meal_id,))
+                if cursor.rowcount == 1:
+                    continue
+
+                # Find out why the guarded UPDATE matched nothing, then undo the other meal's update
+                cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
+                row = cursor.fetchone()
+                conn.rollback()
+                if row is None:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                logger.info("Meal with ID %s has been deleted", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
+            conn.commit()
+            logger.info("Recorded battle result: meal %s beat meal %s", winner_id, loser_id)
+        _notify("stats", (winner_id, loser_id))
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def record_battle_results_bulk(results: Iterable[tuple[int, int, int]]) -> int:
+    """
+    Adds many meals' battles and wins in one transaction, e.g. a whole tournament.
+
+    As with record_battle_result(), the stats change for all meals or for
+    none: if any meal is missing or has been deleted, nothing is recorded.
+
+    Args:
+        results (Iterable[tuple[int, int, int]]): (meal_id, battles, wins) per meal.
+
+    Returns:
+        int: The number of meals updated.
+
+    Raises:
+        ValueError: If any meal is missing or deleted.
+        sqlite3.Error: If any database error occurs.
+    """
+    rows = [(battles, wins, meal_id) for meal_id, battles, wins in results]
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ? AND deleted = FALSE",
+                               rows)
+            if cursor.rowcount != len(rows):
+                conn.rollback()
+                logger.info("Recorded %d of %d meals' results, some are missing or deleted", cursor.rowcount, len(rows))
+                raise ValueError("Some meals in the results are missing or have been deleted")
+            conn.commit()
+            logger.info("Recorded battle results for %d meals", len(rows))
+        _notify("stats", tuple(meal_id for _, _, meal_id in rows))
+        return len(rows)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
 def update_meal_stats(meal_id: int, result: str) -> None:
     try:
         with get_db_connection() as conn:
@@ -201,6 +696,7 @@ def update_meal_stats(meal_id: int, result: str) -> None:
                 raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
 
             conn.commit()
+        _notify("stats", (meal_id,))
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
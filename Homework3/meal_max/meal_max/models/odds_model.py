@@ -0,0 +1,326 @@
+"""
+Win probabilities for battles, without playing them.
+
+BattleModel.battle() lets the first combatant win when the score delta,
+divided by 100, is greater than a random number with two decimals. The
+random number only takes the values k / 100, so the chance of a win is the
+total weight of those values below the delta:
+
+- random.org (the "random_org" and "buffered" sources) returns 0.00 to 0.99,
+  each with weight 1 / 100.
+- The "local" source rounds random() to two decimals, so 0.00 and 1.00 have
+  weight 1 / 200 and 0.01 to 0.99 have weight 1 / 100.
+
+That closed form is the default. Monte Carlo is available as a cross-check:
+it draws the random numbers the source would, and for large matrices the
+rows are spread over a process pool. Results are cached until one of their
+meals is deleted or the meals are cleared.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from meal_max.models.battle_model import DIFFICULTY_MODIFIER
+from meal_max.models.kitchen_model import Meal, add_meal_listener, get_meal_by_name
+from meal_max.models.tournament_model import MealTable, load_meal_table
+from meal_max.utils import random_utils
+from meal_max.utils.cache import LRUCache
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+ODDS_METHODS = ("analytic", "monte_carlo")
+
+# Random numbers drawn per meal (or per pair) by the Monte Carlo method
+ODDS_SAMPLES = int(os.getenv("ODDS_SAMPLES", "10000"))
+ODDS_MAX_SAMPLES = 1000000
+
+# The most meals in one matrix; the response grows with the square
+ODDS_MATRIX_MAX_MEALS = int(os.getenv("ODDS_MATRIX_MAX_MEALS", "500"))
+
+# Monte Carlo matrices drawing more random numbers than this in total use a process pool
+ODDS_PARALLEL_THRESHOLD = int(os.getenv("ODDS_PARALLEL_THRESHOLD", "20000000"))
+ODDS_WORKERS = int(os.getenv("ODDS_WORKERS", str(os.cpu_count() or 1)))
+
+ODDS_CACHE_SIZE = int(os.getenv("ODDS_CACHE_SIZE", "4096"))
+
+# The values a random number can take, and their weights under each source in units of
+# 1 / 200, kept as integers so that the probabilities add up without rounding errors
+RANDOM_GRID = np.arange(101) / 100
+RANDOM_WEIGHTS = {
+    "random_org": np.array([2] * 100 + [0]),
+    "local": np.array([1] + [2] * 99 + [1]),
+}
+
+
+def random_distribution(source_name: Optional[str] = None) -> str:
+    """Returns which distribution of random numbers a source draws from: "local" or "random_org"."""
+    source_name = random_utils.RANDOM_SOURCE if source_name is None else source_name
+    return "local" if source_name == "local" else "random_org"
+
+def battle_score(meal: Meal) -> float:
+    """The score BattleModel.get_battle_score() gives a meal, without the logging."""
+    return meal.price * len(meal.cuisine) - DIFFICULTY_MODIFIER[meal.difficulty]
+
+def win_probability(delta: np.ndarray, distribution: str) -> np.ndarray:
+    """
+    The exact chance that the first combatant wins, for each delta.
+
+    Args:
+        delta (np.ndarray): Score deltas divided by 100.
+        distribution (str): "local" or "random_org".
+
+    Returns:
+        np.ndarray: The probability that a random number is less than each delta.
+    """
+    cumulative = np.concatenate([[0], np.cumsum(RANDOM_WEIGHTS[distribution])])
+    # The number of grid values below delta, which is where the cumulative weight stops
+    return cumulative[np.searchsorted(RANDOM_GRID, delta, side="left")] / 200
+
+def draw_random_numbers(rng: np.random.Generator, size: int, distribution: str) -> np.ndarray:
+    """Draws random numbers the way the source would."""
+    if distribution == "local":
+        return np.round(rng.random(size), 2)
+    return rng.integers(0, 100, size) / 100
+
+def _monte_carlo_rows(scores: np.ndarray, rows: np.ndarray, samples: int, distribution: str,
+                      seeds: list[np.random.SeedSequence]) -> np.ndarray:
+    """
+    Estimates the upper triangle of the given matrix rows.
+
+    Each row draws its own random numbers, sorted once, so counting how many
+    fall below each of the row's deltas is a binary search per pair.
+    Module level so that a process pool can run it.
+    """
+    block = np.zeros((len(rows), len(scores)))
+    for index, (row, seed) in enumerate(zip(rows, seeds)):
+        random_numbers = np.sort(draw_random_numbers(np.random.default_rng(seed), samples, distribution))
+        delta = np.abs(scores[row + 1:] - scores[row]) / 100
+        block[index, row + 1:] = np.searchsorted(random_numbers, delta, side="left") / samples
+    return block
+
+
+class OddsCache:
+    """
+    Cached odds, dropped when one of their meals changes.
+
+    Keys hold the generation of each meal they depend on, plus an epoch for
+    clear_meals(), so a change only bumps counters and stale entries age out
+    of the LRU.
+    """
+
+    def __init__(self, maxsize: int = ODDS_CACHE_SIZE):
+        self.cache = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self._generations: dict[int, int] = {}
+        self._epoch = 0
+        self._changes = 0
+
+    def on_meal_change(self, event: str, meal_ids: Optional[tuple[int, ...]]) -> None:
+        # Scores do not depend on stats, and a new meal has no cached odds yet
+        if event not in ("deleted", "cleared"):
+            return
+        with self._lock:
+            self._changes += 1
+            if meal_ids is None:
+                # Ids start again from 1 after a clear, so every entry is stale
+                self._epoch += 1
+                self._generations.clear()
+                return
+            for meal_id in meal_ids:
+                self._generations[meal_id] = self._generations.get(meal_id, 0) + 1
+
+    def changes(self) -> int:
+        """A counter to read before loading meals and pass to put(), so odds computed from stale meals are not cached."""
+        with self._lock:
+            return self._changes
+
+    def key(self, meal_ids: tuple[int, ...], *params: Any) -> tuple:
+        with self._lock:
+            # Generations only go up, so their sum changes whenever any of them does
+            generation = sum(self._generations.get(meal_id, 0) for meal_id in meal_ids)
+            return (self._epoch, generation, meal_ids) + params
+
+    def get(self, key: tuple) -> Any:
+        return self.cache.get(key)
+
+    def put(self, key: tuple, value: Any, changes: int) -> None:
+        with self._lock:
+            if self._changes != changes:
+                return
+        self.cache.put(key, value)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+odds_cache = OddsCache()
+add_meal_listener(odds_cache.on_meal_change)
+
+
+def _check_params(method: str, samples: int) -> None:
+    if method not in ODDS_METHODS:
+        logger.error("Invalid odds method: %s", method)
+        raise ValueError(f"Invalid odds method: {method}. Must be 'analytic' or 'monte_carlo'.")
+    if not 1 <= samples <= ODDS_MAX_SAMPLES:
+        logger.error("Invalid number of samples: %s", samples)
+        raise ValueError(f"Invalid number of samples: {samples}. Must be between 1 and {ODDS_MAX_SAMPLES}.")
+
+def get_battle_odds(meal1_name: str, meal2_name: str, method: str = "analytic", samples: int = ODDS_SAMPLES,
+                    seed: Optional[int] = None) -> dict[str, Any]:
+    """
+    Computes each meal's chance of winning a battle, meal1 being prepped first.
+
+    Args:
+        meal1_name (str): The first combatant.
+        meal2_name (str): The second combatant.
+        method (str): "analytic" (exact) or "monte_carlo" (an estimate from samples random numbers).
+        samples (int): How many random numbers the Monte Carlo method draws.
+        seed (Optional[int]): Makes a Monte Carlo estimate reproducible when set.
+
+    Returns:
+        dict[str, Any]: Both meals with their scores and win probabilities, and the score delta.
+
+    Raises:
+        ValueError: If either meal is missing or deleted, the meals are the same,
+            or the method or number of samples is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    _check_params(method, samples)
+    changes = odds_cache.changes()
+    meal1, meal2 = get_meal_by_name(meal1_name), get_meal_by_name(meal2_name)
+    if meal1.id == meal2.id:
+        raise ValueError(f"Meal with ID {meal1.id} cannot battle itself")
+
+    distribution = random_distribution()
+    samples = samples if method == "monte_carlo" else None
+    key = odds_cache.key((meal1.id, meal2.id), "pair", method, samples, seed, distribution)
+    result = odds_cache.get(key)
+    if result is not None:
+        return {**result, 'cached': True}
+
+    score1, score2 = battle_score(meal1), battle_score(meal2)
+    delta = abs(score1 - score2) / 100
+    if method == "analytic":
+        probability = float(win_probability(np.array([delta]), distribution)[0])
+    else:
+        random_numbers = draw_random_numbers(np.random.default_rng(seed), samples, distribution)
+        probability = float(np.mean(random_numbers < delta))
+
+    result = {
+        'meal1': {'id': meal1.id, 'meal': meal1.meal, 'score': score1, 'win_probability': probability},
+        'meal2': {'id': meal2.id, 'meal': meal2.meal, 'score': score2, 'win_probability': 1 - probability},
+        'delta': delta,
+        'method': method,
+        'samples': samples,
+        'distribution': distribution,
+    }
+    odds_cache.put(key, result, changes)
+    logger.info("Odds of %s against %s: %.4f (%s)", meal1.meal, meal2.meal, probability, method)
+    return {**result, 'cached': False}
+
+def _select_meals(table: MealTable, names: list[str]) -> MealTable:
+    index = {name: i for i, name in enumerate(table.names)}
+    if len(set(names)) != len(names):
+        raise ValueError("Each meal may only appear once in the matrix.")
+    for name in names:
+        if name not in index:
+            logger.info("Meal with name %s not found", name)
+            raise ValueError(f"Meal with name {name} not found or has been deleted")
+    rows = np.array([index[name] for name in names], dtype=np.int64)
+    return MealTable(table.ids[rows], list(names), table.scores[rows])
+
+def simulate_matrix(scores: np.ndarray, samples: int, distribution: str, seed: Optional[int] = None,
+                    workers: int = ODDS_WORKERS, parallel_threshold: int = ODDS_PARALLEL_THRESHOLD) -> np.ndarray:
+    """
+    Estimates every pair's odds by Monte Carlo.
+
+    Every row gets its own child seed, so the result does not depend on how
+    the rows are split between workers.
+
+    Returns:
+        np.ndarray: matrix[i, j] is the chance that meal i wins when prepped before meal j.
+    """
+    count = len(scores)
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    rows = np.arange(count)
+    if workers > 1 and count * samples > parallel_threshold:
+        chunks = [chunk for chunk in np.array_split(rows, workers * 4) if len(chunk)]
+        logger.info("Simulating %d odds rows on %d processes", count, workers)
+        # Spawned, not forked, so the workers do not inherit the app's threads and connections
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            blocks = list(executor.map(_monte_carlo_rows, [scores] * len(chunks), chunks,
+                                       [samples] * len(chunks), [distribution] * len(chunks),
+                                       [[seeds[row] for row in chunk] for chunk in chunks]))
+        upper = np.concatenate(blocks)
+    else:
+        upper = _monte_carlo_rows(scores, rows, samples, distribution, seeds)
+    # The first combatant's odds only depend on the delta, so the matrix is symmetric
+    return upper + upper.T
+
+def get_odds_matrix(names: Optional[list[str]] = None, method: str = "analytic", samples: int = ODDS_SAMPLES,
+                    seed: Optional[int] = None) -> dict[str, Any]:
+    """
+    Computes the odds of every pair of meals.
+
+    Args:
+        names (Optional[list[str]]): The meals to include, by name; all active meals when None.
+        method (str): "analytic" or "monte_carlo".
+        samples (int): How many random numbers the Monte Carlo method draws per meal.
+        seed (Optional[int]): Makes a Monte Carlo estimate reproducible when set.
+
+    Returns:
+        dict[str, Any]: The meals, and a matrix where matrix[i][j] is the chance that
+            meals[i] wins when prepped before meals[j] (None on the diagonal).
+
+    Raises:
+        ValueError: If a meal is missing or deleted, there are too many or too few meals,
+            or the method or number of samples is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    _check_params(method, samples)
+    start = time.perf_counter()
+    changes = odds_cache.changes()
+    table = load_meal_table()
+    if names is not None:
+        table = _select_meals(table, names)
+    if len(table) < 2:
+        raise ValueError("An odds matrix needs at least two meals.")
+    if len(table) > ODDS_MATRIX_MAX_MEALS:
+        raise ValueError(f"An odds matrix can hold at most {ODDS_MATRIX_MAX_MEALS} meals, got {len(table)}.")
+
+    distribution = random_distribution()
+    samples = samples if method == "monte_carlo" else None
+    key = odds_cache.key(tuple(table.ids.tolist()), "matrix", method, samples, seed, distribution)
+    result = odds_cache.get(key)
+    if result is not None:
+        return {**result, 'cached': True, 'elapsed_sec': round(time.perf_counter() - start, 3)}
+
+    if method == "analytic":
+        matrix = win_probability(np.abs(table.scores[:, None] - table.scores[None, :]) / 100, distribution)
+    else:
+        matrix = simulate_matrix(table.scores, samples, distribution, seed)
+    rows = matrix.tolist()
+    for i, row in enumerate(rows):
+        row[i] = None
+
+    result = {
+        'meals': [{'id': int(meal_id), 'meal': name} for meal_id, name in zip(table.ids, table.names)],
+        'matrix': rows,
+        'method': method,
+        'samples': samples,
+        'distribution': distribution,
+    }
+    odds_cache.put(key, result, changes)
+    elapsed = time.perf_counter() - start
+    logger.info("Odds matrix of %d meals (%s) in %.3f s", len(table), method, elapsed)
+    return {**result, 'cached': False, 'elapsed_sec': round(elapsed, 3)}
@@ -0,0 +1,227 @@
+"""
+Whole tournaments simulated in bulk with NumPy.
+
+A match follows BattleModel.battle(): the first meal wins when the score
+delta, divided by 100, is greater than a random number with two decimals;
+otherwise the second meal wins. Instead of one prep/battle round trip per
+match, the meals are loaded once, scores and deltas are computed as arrays,
+the random numbers for a whole batch of matches are drawn at once from a
+local generator, and every meal's battles and wins are written in one
+transaction at the end.
+"""
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from meal_max.models.battle_model import DIFFICULTY_MODIFIER
+from meal_max.models.kitchen_model import record_battle_results_bulk
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TOURNAMENT_FORMATS = ("round_robin", "bracket")
+
+# Matches simulated per array batch in a round robin, which keeps memory use to about 100 MB
+TOURNAMENT_BATCH_SIZE = int(os.getenv("TOURNAMENT_BATCH_SIZE", "2000000"))
+
+# How many meals the result lists, by wins
+TOURNAMENT_STANDINGS = 10
+
+
+class MealTable:
+    """
+    The active meals as parallel arrays, in id order.
+
+    Attributes:
+        ids (np.ndarray): The meal ids.
+        names (list[str]): The meal names.
+        scores (np.ndarray): Each meal's battle score, as BattleModel.get_battle_score() computes it.
+    """
+
+    def __init__(self, ids: np.ndarray, names: list[str], scores: np.ndarray):
+        self.ids = ids
+        self.names = names
+        self.scores = scores
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def load_meal_table() -> MealTable:
+    """
+    Loads every meal that has not been deleted, with one query.
+
+    Returns:
+        MealTable: The meals and their battle scores.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, meal, cuisine, price, difficulty FROM meals WHERE deleted = FALSE ORDER BY id")
+            rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    prices = np.array([row[3] for row in rows], dtype=np.float64)
+    cuisine_lengths = np.array([len(row[2]) for row in rows], dtype=np.float64)
+    modifiers = np.array([DIFFICULTY_MODIFIER[row[4]] for row in rows], dtype=np.float64)
+    logger.info("Loaded %d meals for a tournament", len(rows))
+    return MealTable(ids, [row[1] for row in rows], prices * cuisine_lengths - modifiers)
+
+def play_matches(scores: np.ndarray, first: np.ndarray, second: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Plays a batch of matches at once.
+
+    Args:
+        scores (np.ndarray): The battle score of every meal.
+        first (np.ndarray): Each match's first meal, as an index into scores.
+        second (np.ndarray): Each match's second meal.
+        rng (np.random.Generator): Draws one random number per match.
+
+    Returns:
+        np.ndarray: The index of each match's winner.
+    """
+    delta = np.abs(scores[first] - scores[second]) / 100
+    # Two decimals, like the numbers from random.org
+    random_numbers = np.round(rng.random(len(first)), 2)
+    return np.where(delta > random_numbers, first, second)
+
+def simulate_round_robin(scores: np.ndarray, rng: np.random.Generator,
+                         batch_size: int = TOURNAMENT_BATCH_SIZE) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Plays every pair of meals once, the lower index as the first meal.
+
+    Args:
+        scores (np.ndarray): The battle score of every meal.
+        rng (np.random.Generator): The random number generator.
+        batch_size (int): About how many matches to play per batch.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The battles and wins of each meal.
+    """
+    count = len(scores)
+    battles = np.full(count, max(count - 1, 0), dtype=np.int64)
+    wins = np.zeros(count, dtype=np.int64)
+
+    # Meal i plays meals i+1..count-1; batches are runs of whole rows
+    opponents = np.arange(count - 1, -1, -1, dtype=np.int64)
+    ends = np.cumsum(opponents)
+    start = 0
+    while start < count - 1:
+        # At least one row per batch, however large
+        stop = max(int(np.searchsorted(ends, ends[start] - opponents[start] + batch_size, side="right")), start + 1)
+        rows = np.arange(start, stop, dtype=np.int64)
+        per_row = opponents[start:stop]
+        first = np.repeat(rows, per_row)
+        row_starts = np.repeat(np.cumsum(per_row) - per_row, per_row)
+        second = first + 1 + (np.arange(len(first), dtype=np.int64) - row_starts)
+
+        winners = play_matches(scores, first, second, rng)
+        wins += np.bincount(winners, minlength=count)
+        start = stop
+
+    return battles, wins
+
+def simulate_bracket(scores: np.ndarray, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Plays a single elimination bracket in a random seeding.
+
+    Each round pairs up the remaining meals in order; with an odd number left,
+    the last one gets a bye into the next round.
+
+    Args:
+        scores (np.ndarray): The battle score of every meal.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, int]: The battles and wins of each meal, and the champion's index.
+    """
+    count = len(scores)
+    battles = np.zeros(count, dtype=np.int64)
+    wins = np.zeros(count, dtype=np.int64)
+    remaining = rng.permutation(count)
+    while len(remaining) > 1:
+        paired = len(remaining) - len(remaining) % 2
+        first, second = remaining[0:paired:2], remaining[1:paired:2]
+        winners = play_matches(scores, first, second, rng)
+        battles[first] += 1
+        battles[second] += 1
+        wins[winners] += 1
+        remaining = np.concatenate([winners, remaining[paired:]])
+    return battles, wins, int(remaining[0])
+
+def run_tournament(fmt: str = "round_robin", seed: Optional[int] = None, record: bool = True,
+                   batch_size: int = TOURNAMENT_BATCH_SIZE) -> dict[str, Any]:
+    """
+    Runs a tournament between all active meals.
+
+    Args:
+        fmt (str): "round_robin" (every pair plays once) or "bracket" (single elimination).
+        seed (Optional[int]): Makes the outcome reproducible when set.
+        record (bool): Whether to add the battles and wins to the meals' stats.
+        batch_size (int): About how many round robin matches to play per batch.
+
+    Returns:
+        dict[str, Any]: The number of meals and matches, the champion, the top
+            meals by wins, the total time in seconds and the simulation rate in matches per second.
+
+    Raises:
+        ValueError: If the format is invalid, fewer than two meals are active,
+            or a meal was deleted before the results were recorded.
+        sqlite3.Error: If any database error occurs.
+    """
+    if fmt not in TOURNAMENT_FORMATS:
+        logger.error("Invalid tournament format: %s", fmt)
+        raise ValueError(f"Invalid tournament format: {fmt}. Must be 'round_robin' or 'bracket'.")
+
+    start = time.perf_counter()
+    meals = load_meal_table()
+    if len(meals) < 2:
+        logger.error("Not enough meals for a tournament: %d", len(meals))
+        raise ValueError("A tournament needs at least two meals.")
+
+    rng = np.random.default_rng(seed)
+    if fmt == "round_robin":
+        battles, wins = simulate_round_robin(meals.scores, rng, batch_size)
+        # Most wins, ties to the lowest id
+        champion = int(np.argmax(wins))
+    else:
+        battles, wins, champion = simulate_bracket(meals.scores, rng)
+    simulated = time.perf_counter() - start
+    matches = int(battles.sum()) // 2
+
+    if record:
+        played = np.flatnonzero(battles)
+        record_battle_results_bulk(zip(meals.ids[played].tolist(), battles[played].tolist(),
+                                       wins[played].tolist()))
+    elapsed = time.perf_counter() - start
+
+    standings = np.lexsort((meals.ids, -wins))[:TOURNAMENT_STANDINGS]
+    logger.info("%s tournament of %d meals: %d matches in %.3f s, champion %s",
+                fmt, len(meals), matches, elapsed, meals.names[champion])
+    return {
+        'format': fmt,
+        'meals': len(meals),
+        'matches': matches,
+        'champion': {'id': int(meals.ids[champion]), 'meal': meals.names[champion]},
+        'standings': [
+            {'id': int(meals.ids[i]), 'meal': meals.names[i], 'battles': int(battles[i]), 'wins': int(wins[i])}
+            for i in standings
+        ],
+        'recorded': record,
+        'elapsed_sec': round(elapsed, 3),
+        'matches_per_sec': round(matches / simulated, 1) if simulated > 0 else None,
+    }
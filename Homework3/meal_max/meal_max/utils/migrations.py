@@ -0,0 +1,197 @@
+"""
+Forward-only schema migrations.
+
+Migrations are the NNNN_name.sql files in MIGRATIONS_DIR, applied in version
+order. Each one runs in its own transaction together with its schema_version
+row, so a failed migration leaves neither partial schema nor a version behind.
+Data is never dropped: to change the schema, add a new file.
+
+Run from the meal_max directory to bring a database up to date:
+
+    python -m meal_max.utils.migrations
+    python -m meal_max.utils.migrations --status
+"""
+import argparse
+from dataclasses import dataclass
+import logging
+import os
+import re
+import sqlite3
+from typing import Optional
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+MIGRATIONS_DIR = os.getenv("MIGRATIONS_DIR", "/app/sql/migrations")
+# Apply pending migrations at startup; when off, startup fails on an outdated schema instead
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() == "true"
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> list[Migration]:
+    """
+    Reads the migration files in a directory.
+
+    Args:
+        directory (str): The directory holding NNNN_name.sql files; other files are ignored.
+
+    Returns:
+        list[Migration]: The migrations in version order.
+
+    Raises:
+        ValueError: If two files share a version number.
+    """
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename}")
+        with open(os.path.join(directory, filename), "r") as fh:
+            migrations[version] = Migration(version=version, name=match.group(2), sql=fh.read())
+    return [migrations[version] for version in sorted(migrations)]
+
+def _split_statements(script: str) -> list[str]:
+    statements = []
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            statements.append(statement.strip())
+            statement = ""
+    if statement.strip():
+        # Trailing comments, or an unterminated statement that will fail to execute
+        statements.append(statement.strip())
+    return statements
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Returns the version of the last applied migration, or 0 for an unversioned database.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    if cursor.fetchone() is None:
+        return 0
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+def apply_migrations(conn: sqlite3.Connection, migrations: list[Migration]) -> list[int]:
+    """
+    Applies the migrations newer than the database's schema version.
+
+    Each migration takes the write lock with BEGIN IMMEDIATE and re-reads the
+    version under it, so several processes starting at once apply each
+    migration exactly once. In WAL mode readers are not blocked while a
+    migration (e.g. CREATE INDEX) runs, and writers wait up to busy_timeout.
+
+    Args:
+        conn (sqlite3.Connection): The database connection.
+        migrations (list[Migration]): All known migrations, in version order.
+
+    Returns:
+        list[int]: The versions applied by this call.
+
+    Raises:
+        sqlite3.Error: If a migration fails; it is rolled back and later ones are not applied.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+    applied = []
+    for migration in migrations:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if migration.version <= get_schema_version(conn):
+                conn.rollback()
+                continue
+            logger.info("Applying migration %04d_%s", migration.version, migration.name)
+            for statement in _split_statements(migration.sql):
+                conn.execute(statement)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                         (migration.version, migration.name))
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error("Migration %04d_%s failed: %s", migration.version, migration.name, str(e))
+            raise e
+        applied.append(migration.version)
+
+    return applied
+
+def check_schema(directory: str = MIGRATIONS_DIR, auto_migrate: Optional[bool] = None) -> int:
+    """
+    Brings the database schema up to date at startup, or refuses to start on an outdated one.
+
+    Args:
+        directory (str): The migrations directory.
+        auto_migrate (Optional[bool]): Whether to apply pending migrations (default: AUTO_MIGRATE).
+
+    Returns:
+        int: The schema version of the database.
+
+    Raises:
+        RuntimeError: If migrations are pending and auto_migrate is off.
+        sqlite3.Error: If a migration fails.
+    """
+    if auto_migrate is None:
+        auto_migrate = AUTO_MIGRATE
+    migrations = load_migrations(directory)
+    latest = migrations[-1].version if migrations else 0
+
+    with get_db_connection() as conn:
+        version = get_schema_version(conn)
+        if version < latest:
+            if not auto_migrate:
+                logger.error("Database schema is at version %d, expected %d", version, latest)
+                raise RuntimeError(f"Database schema is at version {version}, expected {latest}. "
+                                   "Run python -m meal_max.utils.migrations to upgrade it.")
+            applied = apply_migrations(conn, migrations)
+            logger.info("Applied %d migrations", len(applied))
+            version = get_schema_version(conn)
+
+    logger.info("Database schema is at version %d", version)
+    return version
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="meal_max.utils.migrations", description="Apply schema migrations")
+    parser.add_argument("--dir", default=MIGRATIONS_DIR, help="The migrations directory")
+    parser.add_argument("--status", action="store_true", help="Print the schema version without migrating")
+    args = parser.parse_args(argv)
+
+    migrations = load_migrations(args.dir)
+    with get_db_connection() as conn:
+        if not args.status:
+            apply_migrations(conn, migrations)
+        version = get_schema_version(conn)
+
+    pending = [m for m in migrations if m.version > version]
+    print(f"Schema version: {version}")
+    for migration in pending:
+        print(f"Pending: {migration.version:04d}_{migration.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
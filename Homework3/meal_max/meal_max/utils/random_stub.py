@@ -0,0 +1,91 @@
+"""
+A local stand-in for random.org's plain-text decimal-fractions API.
+
+Point RANDOM_ORG_URL at it to run battles without network access:
+
+    python -m meal_max.utils.random_stub --port 8081 --seed 42
+    RANDOM_ORG_URL=http://localhost:8081 python app.py
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import random
+import threading
+from urllib.parse import parse_qs, urlparse
+
+
+class RandomStubServer(ThreadingHTTPServer):
+    """
+    Serves seeded random decimal fractions in random.org's response format.
+
+    Attributes:
+        requests_served (int): How many requests the server has answered.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, seed: int = 0):
+        super().__init__(("127.0.0.1", port), _RandomStubHandler)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests_served = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "RandomStubServer":
+        """Serves requests from a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _RandomStubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/decimal-fractions":
+            self.send_error(404)
+            return
+        params = parse_qs(url.query)
+        try:
+            num = int(params.get("num", ["1"])[0])
+            dec = int(params.get("dec", ["2"])[0])
+        except ValueError:
+            self.send_error(400)
+            return
+
+        with self.server.lock:
+            self.server.requests_served += 1
+            numbers = [f"{self.server.rng.random():.{dec}f}" for _ in range(num)]
+
+        body = ("\n".join(numbers) + "\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local random.org stub")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = RandomStubServer(port=args.port, seed=args.seed)
+    print(f"Serving random numbers on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
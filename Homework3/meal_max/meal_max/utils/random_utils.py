@@ -1,4 +1,12 @@
+from collections import deque
 import logging
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Callable, Optional
+
 import requests
 
 from meal_max.utils.logger import configure_logger
@@ -7,27 +15,41 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
-def get_random() -> float:
-    url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
+# Which source serves get_random(): "buffered" (bulk random.org fetches served from
+# memory, with a local fallback), "random_org" (one request per call) or "local".
+RANDOM_SOURCE = os.getenv("RANDOM_SOURCE", "buffered")
+RANDOM_ORG_URL = os.getenv("RANDOM_ORG_URL", "https://www.random.org")
+RANDOM_BATCH_SIZE = int(os.getenv("RANDOM_BATCH_SIZE", "1000"))
+RANDOM_LOW_WATERMARK = int(os.getenv("RANDOM_LOW_WATERMARK", "100"))
+# Seconds after a failed fetch during which the buffered source serves its fallback without fetching
+RANDOM_FETCH_BACKOFF = float(os.getenv("RANDOM_FETCH_BACKOFF", "30"))
+# Seeds the local source; when unset the local source draws from secrets.SystemRandom
+RANDOM_SEED = os.getenv("RANDOM_SEED")
+
+
+def fetch_random_fractions(num: int) -> list[float]:
+    url = f"{RANDOM_ORG_URL}/decimal-fractions/?num={num}&dec=2&col=1&format=plain&rnd=new"
 
     try:
         # Log the request to random.org
-        logger.info("Fetching random number from %s", url)
+        logger.info("Fetching %d random numbers from %s", num, url)
 
         response = requests.get(url, timeout=5)
 
         # Check if the request was successful
         response.raise_for_status()
 
-        random_number_str = response.text.strip()
+        random_numbers_str = response.text.split()
 
         try:
-            random_number = float(random_number_str)
+            random_numbers = [float(value) for value in random_numbers_str]
         except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
+            raise ValueError("Invalid response from random.org: %s" % response.text.strip())
+        if len(random_numbers) != num:
+            raise ValueError("Invalid response from random.org: expected %d numbers, got %d" % (num, len(random_numbers)))
 
-        logger.info("Received random number: %.3f", random_number)
-        return random_number
+        logger.info("Received %d random numbers", len(random_numbers))
+        return random_numbers
 
     except requests.exceptions.Timeout:
         logger.error("Request to random.org timed out.")
@@ -36,3 +58,196 @@ def get_random() -> float:
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+
+class RandomOrgSource:
+    """Fetches every number from random.org with its own request."""
+
+    def next(self) -> float:
+        return fetch_random_fractions(1)[0]
+
+    def stats(self) -> dict:
+        return {"source": "random_org"}
+
+
+class LocalRandomSource:
+    """
+    Draws numbers locally with the same two-decimal resolution as random.org.
+
+    Attributes:
+        seed (Optional[int]): Makes the sequence deterministic when set;
+            otherwise numbers come from the OS generator.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._rng = random.Random(seed) if seed is not None else secrets.SystemRandom()
+        self._lock = threading.Lock()
+
+    def next(self) -> float:
+        with self._lock:
+            return round(self._rng.random(), 2)
+
+    def stats(self) -> dict:
+        return {"source": "local", "seeded": self.seed is not None}
+
+
+class _BackingOff(RuntimeError):
+    """Raised instead of fetching while a buffered source waits out the backoff after a failed fetch."""
+
+
+class BufferedRandomSource:
+    """
+    Serves numbers from an in-memory buffer that is refilled in bulk.
+
+    When the buffer drops below the low watermark a background thread fetches
+    the next batch. If the buffer runs dry, one caller fetches while the others
+    wait for its batch. If that fetch fails, numbers come from the fallback
+    source instead of failing the caller, and for the next backoff seconds
+    every caller is served from the fallback without fetching again.
+
+    Attributes:
+        fetch (Callable[[int], list[float]]): Fetches a batch of numbers.
+        batch_size (int): How many numbers to fetch at a time.
+        low_watermark (int): The buffer size that triggers a background refill.
+        fallback (Optional[LocalRandomSource]): Serves numbers when fetching fails.
+        backoff (float): Seconds after a failed fetch before fetching again.
+    """
+
+    def __init__(self, fetch: Callable[[int], list[float]], batch_size: int = 1000,
+                 low_watermark: int = 100, fallback: Optional[LocalRandomSource] = None, backoff: float = 30.0):
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch size: {batch_size} (must be at least 1).")
+        self.fetch = fetch
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+        self.fallback = fallback
+        self.backoff = backoff
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        # Notified when a fetch ends, successful or not
+        self._fetched = threading.Condition(self._lock)
+        self._refilling = False
+        self._retry_at = 0.0
+        self._last_error: Optional[Exception] = None
+        self._stats = {"served": 0, "fetches": 0, "fetch_failures": 0, "fallbacks": 0}
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    def _fill(self) -> None:
+        """Fetches a batch; the caller has set _refilling, which this clears."""
+        try:
+            numbers = self.fetch(self.batch_size)
+        except (RuntimeError, ValueError) as e:
+            with self._lock:
+                self._stats["fetch_failures"] += 1
+                self._last_error = e
+                self._retry_at = time.monotonic() + self.backoff
+            raise
+        else:
+            with self._lock:
+                self._buffer.extend(numbers)
+                self._stats["fetches"] += 1
+        finally:
+            with self._lock:
+                self._refilling = False
+                self._fetched.notify_all()
+
+    def _fill_or_wait(self) -> None:
+        """Refills the dry buffer, or waits for the fetch another thread has under way."""
+        with self._lock:
+            while self._refilling and not self._buffer:
+                self._fetched.wait()
+            if self._buffer:
+                return
+            if self._backing_off():
+                raise _BackingOff(f"Not fetching random numbers for {self._retry_at - time.monotonic():.0f}s "
+                                  f"after a failed fetch: {self._last_error}")
+            self._refilling = True
+        self._fill()
+
+    def _refill_in_background(self) -> None:
+        try:
+            self._fill()
+        except (RuntimeError, ValueError) as e:
+            logger.warning("Background refill of random numbers failed: %s", e)
+
+    def _pop(self) -> Optional[float]:
+        with self._lock:
+            if not self._buffer:
+                return None
+            value = self._buffer.popleft()
+            self._stats["served"] += 1
+            if len(self._buffer) < self.low_watermark and not self._refilling and not self._backing_off():
+                self._refilling = True
+                threading.Thread(target=self._refill_in_background, daemon=True).start()
+            return value
+
+    def _fall_back(self, error: Exception) -> float:
+        if self.fallback is None:
+            raise error
+        # The failure itself was logged once; callers during the backoff are not
+        if not isinstance(error, _BackingOff):
+            logger.warning("Using local random numbers, fetch failed: %s", error)
+        with self._lock:
+            self._stats["fallbacks"] += 1
+        return self.fallback.next()
+
+    def next(self) -> float:
+        while True:
+            value = self._pop()
+            if value is not None:
+                return value
+            # The buffer ran dry: fetch synchronously, or fall back to local numbers
+            try:
+                self._fill_or_wait()
+            except (RuntimeError, ValueError) as e:
+                return self._fall_back(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"source": "buffered", "buffered": len(self._buffer), **self._stats}
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def create_random_source(name: str):
+    """
+    Builds a random source by name ("buffered", "random_org" or "local").
+
+    Raises:
+        ValueError: If the source name is unknown.
+    """
+    seed = int(RANDOM_SEED) if RANDOM_SEED is not None else None
+    if name == "buffered":
+        return BufferedRandomSource(fetch_random_fractions, batch_size=RANDOM_BATCH_SIZE,
+                                    low_watermark=RANDOM_LOW_WATERMARK, fallback=LocalRandomSource(seed),
+                                    backoff=RANDOM_FETCH_BACKOFF)
+    if name == "random_org":
+        return RandomOrgSource()
+    if name == "local":
+        return LocalRandomSource(seed)
+    raise ValueError(f"Invalid random source: {name}. Must be 'buffered', 'random_org' or 'local'.")
+
+def get_random_source():
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                _source = create_random_source(RANDOM_SOURCE)
+                logger.info("Using %s random source", RANDOM_SOURCE)
+    return _source
+
+def set_random_source(source) -> None:
+    """Replaces the process-wide random source, e.g. with a seeded local one."""
+    global _source
+    with _source_lock:
+        _source = source
+
+def get_random() -> float:
+    random_number = get_random_source().next()
+    logger.info("Received random number: %.3f", random_number)
+    return random_number
@@ -2,6 +2,9 @@ from contextlib import contextmanager
 import logging
 import os
 import sqlite3
+import threading
+import time
+from typing import Any, Optional
 
 from meal_max.utils.logger import configure_logger
 
@@ -13,14 +16,296 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# pool sizing and checkout behaviour, overridable from the environment
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# PRAGMA profiles applied once to every connection the pool opens.
+# "legacy" keeps SQLite's rollback journal and default caching.
+PRAGMA_PROFILES: dict[str, dict[str, Any]] = {
+    "legacy": {
+        "journal_mode": "DELETE",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,       # in KiB, i.e. 16 MiB per connection
+        "mmap_size": 134217728,     # 128 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,       # in milliseconds
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 10000,
+    },
+}
+DB_PRAGMA_PROFILE = os.getenv("DB_PRAGMA_PROFILE", "balanced")
+
+
+def get_pragma_profile(name: str) -> dict[str, Any]:
+    """
+    Looks up a PRAGMA profile by name.
+
+    Args:
+        name (str): The profile name, one of PRAGMA_PROFILES.
+
+    Returns:
+        dict[str, Any]: The PRAGMA names and values of the profile.
+
+    Raises:
+        ValueError: If the profile does not exist.
+    """
+    try:
+        return PRAGMA_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Invalid PRAGMA profile: {name}. Must be one of {sorted(PRAGMA_PROFILES)}.")
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: dict[str, Any]) -> None:
+    """
+    Applies PRAGMA settings to a connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to configure.
+        pragmas (dict[str, Any]): The PRAGMA names and values to set.
+
+    Raises:
+        ValueError: If a PRAGMA name or value is not a plain identifier or number.
+    """
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not str(value).lstrip("-").isalnum():
+            raise ValueError(f"Invalid PRAGMA setting: {name}={value}")
+        # PRAGMA does not accept bound parameters; names and values are validated above
+        conn.execute(f"PRAGMA {name} = {value};").fetchall()
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of SQLite connections.
+
+    A thread checks out at most one connection at a time: nested calls to
+    checkout() from the same thread reuse the connection it already holds.
+
+    Attributes:
+        db_path (str): The path of the SQLite database file.
+        max_size (int): The maximum number of open connections.
+        timeout (float): How long (in seconds) to wait for a free connection.
+        pragmas (dict[str, Any]): The PRAGMA settings applied to each new connection.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 5, timeout: float = 10.0,
+                 pragmas: Optional[dict[str, Any]] = None):
+        if max_size < 1:
+            raise ValueError(f"Invalid pool size: {max_size} (must be at least 1).")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+        self._idle: list[sqlite3.Connection] = []
+        self._open_count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._stats = {"opens": 0, "hits": 0, "waits": 0, "reuses": 0, "discards": 0, "timeouts": 0}
+
+    def _open(self) -> sqlite3.Connection:
+        """Opens a new connection that may be handed between threads."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            apply_pragmas(conn, self.pragmas)
+        except (sqlite3.Error, ValueError):
+            conn.close()
+            raise
+        logger.info("Opened new pooled database connection to %s", self.db_path)
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """Checks that a pooled connection is still usable."""
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _acquire(self) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            waited = False
+            while True:
+                if self._closed:
+                    raise sqlite3.OperationalError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._stats["hits"] += 1
+                    break
+                if self._open_count < self.max_size:
+                    # Reserve the slot now, open the connection outside the lock
+                    self._open_count += 1
+                    conn = None
+                    break
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    logger.error("Timed out waiting for a database connection")
+                    raise sqlite3.OperationalError("Timed out waiting for a database connection")
+                self._cond.wait(remaining)
+
+        if conn is not None and self._is_healthy(conn):
+            return conn
+
+        if conn is not None:
+            logger.warning("Discarding unhealthy pooled database connection")
+            self._discard(conn, release_slot=False)
+
+        try:
+            conn = self._open()
+        except (sqlite3.Error, ValueError):
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["opens"] += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        # Never hand an open transaction to the next borrower
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._open_count -= 1
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def _discard(self, conn: sqlite3.Connection, release_slot: bool = True) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._stats["discards"] += 1
+            if release_slot:
+                self._open_count -= 1
+                self._cond.notify()
+
+    @contextmanager
+    def checkout(self):
+        """
+        Context manager that lends a connection to the calling thread.
+
+        Yields:
+            sqlite3.Connection: A healthy connection from the pool.
+
+        Raises:
+            sqlite3.OperationalError: If no connection frees up before the timeout.
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            with self._cond:
+                self._stats["reuses"] += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool counters.
+
+        Returns:
+            dict: The size, number of open and idle connections, and the opens,
+                hits, waits, reuses, discards and timeouts counters.
+        """
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "open": self._open_count,
+                "idle": len(self._idle),
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        """
+        Closes every idle connection and refuses further checkouts.
+        Connections that are checked out are closed when they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open_count -= 1
+            self._cond.notify_all()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    Returns:
+        ConnectionPool: The pool serving DB_PATH.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                                       pragmas=get_pragma_profile(DB_PRAGMA_PROFILE))
+    return _pool
+
+def close_pool() -> None:
+    """Closes the process-wide connection pool so the next call to get_pool() starts fresh."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def get_pool_stats() -> dict:
+    """
+    Returns the counters of the process-wide connection pool.
+
+    Returns:
+        dict: See ConnectionPool.stats().
+    """
+    return get_pool().stats()
 
 def check_database_connection():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        # This ensures the connection is actually active
-        cursor.execute("SELECT 1;")
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # This ensures the connection is actually active
+            cursor.execute("SELECT 1;")
     except sqlite3.Error as e:
         error_message = f"Database connection error: {e}"
         logger.error(error_message)
@@ -28,10 +313,9 @@ def check_database_connection():
 
 def check_table_exists(tablename: str):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT 1 FROM {tablename} LIMIT 1;")
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT 1 FROM {tablename} LIMIT 1;")
     except sqlite3.Error as e:
         error_message = f"Table check error: {e}"
         logger.error(error_message)
@@ -45,14 +329,13 @@ def check_table_exists(tablename: str):
 ###################################################
 @contextmanager
 def get_db_connection():
-    conn = None
+    # Borrow a connection from the pool; it goes back (rolled back if a
+    # transaction was left open) when the block exits.
     try:
-        conn = sqlite3.connect(DB_PATH)
-        yield conn
+        with get_pool().checkout() as conn:
+            yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
     finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+        logger.debug("Database connection returned to pool.")
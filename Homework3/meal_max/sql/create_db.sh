@@ -1,14 +1,7 @@
 #!/bin/bash
 
-# Check if the database file already exists
-if [ -f "$DB_PATH" ]; then
-    echo "Recreating database at $DB_PATH."
-    # Drop and recreate the tables
-    sqlite3 "$DB_PATH" < /app/sql/create_meal_table.sql
-    echo "Database recreated successfully."
-else
-    echo "Creating database at $DB_PATH."
-    # Create the database for the first time
-    sqlite3 "$DB_PATH" < /app/sql/create_meal_table.sql
-    echo "Database created successfully."
-fi
\ No newline at end of file
+# Create the database if it does not exist yet and apply any pending schema
+# migrations. Existing data is kept; migrations only move the schema forward.
+echo "Migrating database at $DB_PATH."
+cd /app && python -m meal_max.utils.migrations
+echo "Database is up to date."
\ No newline at end of file
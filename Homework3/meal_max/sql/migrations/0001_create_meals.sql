@@ -1,5 +1,6 @@
-DROP TABLE IF EXISTS meals;
-CREATE TABLE meals (
+-- The original meals table. IF NOT EXISTS lets databases created before
+-- schema versioning adopt it without losing data.
+CREATE TABLE IF NOT EXISTS meals (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     meal TEXT NOT NULL UNIQUE,
     cuisine TEXT NOT NULL,
@@ -8,4 +9,4 @@ CREATE TABLE meals (
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+);
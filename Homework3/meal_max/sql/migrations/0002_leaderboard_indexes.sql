@@ -0,0 +1,8 @@
+-- Adds the win_pct generated column and the leaderboard indexes.
+--
+-- Queries must spell the filter exactly as "deleted = FALSE AND battles > 0"
+-- for SQLite to match these partial indexes.
+ALTER TABLE meals ADD COLUMN win_pct REAL GENERATED ALWAYS AS (CASE WHEN battles > 0 THEN wins * 1.0 / battles END) VIRTUAL;
+
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_wins ON meals (wins DESC) WHERE deleted = FALSE AND battles > 0;
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_win_pct ON meals (win_pct DESC) WHERE deleted = FALSE AND battles > 0;
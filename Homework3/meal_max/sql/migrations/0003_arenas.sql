@@ -0,0 +1,14 @@
+-- Arenas and their prepped combatants, shared by every worker process.
+--
+-- combatants is a JSON list of the prepped meals. lock_token and
+-- locked_until are a lease: while it lasts, only the request holding it
+-- uses the arena.
+CREATE TABLE IF NOT EXISTS arenas (
+    id TEXT PRIMARY KEY,
+    combatants TEXT NOT NULL DEFAULT '[]',
+    last_used REAL NOT NULL,
+    lock_token TEXT,
+    locked_until REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_arenas_last_used ON arenas (last_used);
@@ -0,0 +1,11 @@
+import pytest
+
+from meal_max.models import kitchen_model
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """Empties the leaderboard and meal caches, which outlive the databases each test creates."""
+    kitchen_model.leaderboard_cache.on_meal_change("cleared", None)
+    kitchen_model.meal_cache.clear()
+    yield
@@ -0,0 +1,264 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from meal_max.models.arena_registry import ArenaNotFoundError, ArenaRegistry
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils.migrations import apply_migrations, load_migrations
+from meal_max.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def arenas_db(tmp_path, mocker):
+    """Fixture for a real, empty arenas table."""
+    db_path = str(tmp_path / "meal_max.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+    pool = ConnectionPool(db_path, max_size=4)
+    mocker.patch("meal_max.models.arena_registry.get_db_connection", pool.checkout)
+    yield db_path
+    pool.close()
+
+@pytest.fixture
+def registry(arenas_db, clock):
+    return ArenaRegistry(idle_timeout=60, max_arenas=3, lock_wait=5, clock=clock)
+
+def meal(meal_id: int) -> Meal:
+    return Meal(id=meal_id, meal=f"Meal {meal_id}", cuisine="Italian", price=10.0, difficulty="LOW")
+
+
+def test_arenas_are_isolated(registry):
+    """Test that combatants prepped in one arena do not appear in another."""
+    registry.create_arena("alice")
+    registry.create_arena("bob")
+    with registry.checkout("alice") as battle_model:
+        battle_model.prep_combatant(meal(1))
+    with registry.checkout("bob") as battle_model:
+        battle_model.prep_combatant(meal(2))
+        battle_model.prep_combatant(meal(3))
+
+    with registry.checkout("alice") as battle_model:
+        assert battle_model.get_combatants() == [meal(1)]
+    assert registry.stats()["created"] == 2
+
+def test_unknown_arena_is_not_created(registry):
+    """Test that using an arena that was never opened is refused instead of creating it."""
+    with pytest.raises(ArenaNotFoundError, match="Arena alice not found"):
+        with registry.checkout("alice"):
+            pass
+    with pytest.raises(ArenaNotFoundError, match="Arena alice not found"):
+        registry.get_combatants("alice")
+
+    assert registry.stats()["active"] == 0
+
+def test_default_arena_is_created_on_first_use(registry):
+    """Test that the default arena needs no create_arena()."""
+    assert registry.get_combatants() == []
+    with registry.checkout() as battle_model:
+        battle_model.prep_combatant(meal(1))
+
+    assert registry.get_combatants() == [meal(1)]
+    assert registry.stats()["created"] == 1
+
+def test_create_arena_twice(registry):
+    """Test error when opening an arena under an id already in use."""
+    assert registry.create_arena("alice") == "alice"
+
+    with pytest.raises(ValueError, match="Arena alice already exists"):
+        registry.create_arena("alice")
+
+def test_create_arena_generates_id(registry):
+    """Test that an arena opened without an id gets a fresh, valid one."""
+    arena_id = registry.create_arena()
+
+    assert ArenaRegistry.validate_arena_id(arena_id) == arena_id
+    assert registry.get_combatants(arena_id) == []
+
+def test_get_combatants_takes_no_lease(registry):
+    """Test that reading an arena's combatants does not wait for a request holding it."""
+    registry.create_arena("alice")
+    with registry.checkout("alice") as battle_model:
+        battle_model.prep_combatant(meal(1))
+
+    with registry.checkout("alice") as battle_model:
+        battle_model.prep_combatant(meal(2))
+        # The change is not saved until the lease is given back
+        assert registry.get_combatants("alice") == [meal(1)]
+    assert registry.get_combatants("alice") == [meal(1), meal(2)]
+    assert registry.stats()["busy_waits"] == 0
+
+def test_idle_arena_expires(registry, clock):
+    """Test that an arena unused for the idle timeout is gone, and dropped when the next arena is opened."""
+    registry.create_arena("alice")
+    with registry.checkout("alice") as battle_model:
+        battle_model.prep_combatant(meal(1))
+    clock.now = 30
+    registry.create_arena("bob")
+
+    clock.now = 61
+    with pytest.raises(ArenaNotFoundError):
+        registry.get_combatants("alice")
+    assert registry.stats()["expired"] == 0
+
+    registry.create_arena("carol")
+    stats = registry.stats()
+    assert stats["expired"] == 1
+    assert stats["active"] == 2
+
+def test_default_arena_does_not_expire(registry, clock):
+    """Test that the default arena keeps its combatants however long it is idle."""
+    with registry.checkout() as battle_model:
+        battle_model.prep_combatant(meal(1))
+
+    clock.now = 1000
+    registry.create_arena("alice")
+
+    assert registry.get_combatants() == [meal(1)]
+    assert registry.stats()["expired"] == 0
+
+def test_least_recently_used_arena_is_evicted(registry, clock):
+    """Test that opening an arena beyond the limit drops the least recently used one."""
+    for arena_id in ("a", "b", "c"):
+        clock.now += 1
+        registry.create_arena(arena_id)
+    clock.now += 1
+    with registry.checkout("a"):
+        pass
+    clock.now += 1
+    registry.create_arena("d")
+
+    stats = registry.stats()
+    assert stats["active"] == 3
+    assert stats["evicted"] == 1
+    with pytest.raises(ArenaNotFoundError):
+        registry.get_combatants("b")
+    assert registry.get_combatants("a") == []
+
+def test_arena_in_use_is_not_dropped(arenas_db, clock):
+    """Test that an arena is kept while a request holds it, however long it has been idle."""
+    registry = ArenaRegistry(idle_timeout=60, max_arenas=3, lock_lease=3600, clock=clock)
+    registry.create_arena("alice")
+    with registry.checkout("alice") as battle_model:
+        battle_model.prep_combatant(meal(1))
+        clock.now = 1000
+        for arena_id in ("b", "c", "d"):
+            clock.now += 1
+            registry.create_arena(arena_id)
+        # The idle arenas go first, even though "alice" has been idle longer
+        assert registry.stats()["evicted"] == 1
+        assert registry.stats()["expired"] == 0
+
+    with registry.checkout("alice") as battle_model:
+        assert battle_model.get_combatants() == [meal(1)]
+
+def test_requests_to_one_arena_take_turns(registry):
+    """Test that a second request to a busy arena waits while other arenas stay available."""
+    registry.create_arena("alice")
+    registry.create_arena("bob")
+    entered = threading.Event()
+    release = threading.Event()
+    finished = threading.Event()
+
+    def hold():
+        with registry.checkout("alice"):
+            entered.set()
+            release.wait(5)
+
+    def wait_for_alice():
+        with registry.checkout("alice"):
+            finished.set()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait(5)
+    waiter = threading.Thread(target=wait_for_alice)
+    waiter.start()
+
+    with registry.checkout("bob"):
+        pass
+    assert not finished.wait(0.1)
+
+    release.set()
+    holder.join(5)
+    waiter.join(5)
+    assert finished.is_set()
+    assert registry.stats()["busy_waits"] > 0
+
+def test_busy_arena_times_out(arenas_db, clock):
+    """Test error when an arena stays busy for longer than the wait allows."""
+    registry = ArenaRegistry(lock_wait=0.05, clock=clock)
+    registry.create_arena("alice")
+    with registry.checkout("alice"):
+        with pytest.raises(RuntimeError, match="Arena alice is busy"):
+            with registry.checkout("alice"):
+                pass
+
+def test_expired_lease_is_taken_over(registry, clock):
+    """Test that a request that outlives its lease loses the arena, and its changes are dropped."""
+    registry.create_arena("alice")
+    with registry.checkout("alice") as stale:
+        clock.now = 31
+        with registry.checkout("alice") as battle_model:
+            battle_model.prep_combatant(meal(1))
+        stale.prep_combatant(meal(2))
+
+    with registry.checkout("alice") as battle_model:
+        assert battle_model.get_combatants() == [meal(1)]
+    assert registry.stats()["lost_leases"] == 1
+
+def test_arenas_are_shared_between_registries(arenas_db, clock):
+    """Test that a registry in another worker process sees the combatants prepped through this one."""
+    first = ArenaRegistry(clock=clock)
+    second = ArenaRegistry(clock=clock)
+    first.create_arena("alice")
+    with first.checkout("alice") as battle_model:
+        battle_model.prep_combatant(meal(1))
+        battle_model.prep_combatant(meal(2))
+
+    with second.checkout("alice") as battle_model:
+        assert battle_model.get_combatants() == [meal(1), meal(2)]
+        battle_model.clear_combatants()
+    with first.checkout("alice") as battle_model:
+        assert battle_model.get_combatants() == []
+
+def test_close_arena(registry):
+    """Test closing an arena drops it with its combatants."""
+    registry.create_arena("alice")
+    with registry.checkout("alice") as battle_model:
+        battle_model.prep_combatant(meal(1))
+
+    assert registry.close_arena("alice")
+    assert not registry.close_arena("alice")
+    with pytest.raises(ArenaNotFoundError):
+        with registry.checkout("alice"):
+            pass
+
+@pytest.mark.parametrize("arena_id", ["", "a" * 65, "has space", "../etc", 42])
+def test_invalid_arena_id(registry, arena_id):
+    """Test error when using an invalid arena id."""
+    with pytest.raises(ValueError, match="Invalid arena id"):
+        with registry.checkout(arena_id):
+            pass
+
+def test_new_arena_id_is_valid():
+    """Test that generated arena ids are valid and distinct."""
+    first, second = ArenaRegistry.new_arena_id(), ArenaRegistry.new_arena_id()
+    assert ArenaRegistry.validate_arena_id(first) == first
+    assert first != second
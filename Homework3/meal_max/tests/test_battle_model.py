@@ -0,0 +1,30 @@
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+
+
+@pytest.fixture
+def battle_model():
+    """Fixture to provide a new instance of BattleModel for each test."""
+    return BattleModel()
+
+@pytest.fixture
+def pizza():
+    return Meal(id=1, meal="Pizza", cuisine="Italian", price=12.5, difficulty="LOW")
+
+
+def test_prep_combatant(battle_model, pizza):
+    """Test adding a meal to the combatants list."""
+    battle_model.prep_combatant(pizza)
+
+    assert battle_model.get_combatants() == [pizza]
+
+def test_prep_combatant_twice(battle_model, pizza):
+    """Test error when the same meal is prepped as both combatants."""
+    battle_model.prep_combatant(pizza)
+
+    with pytest.raises(ValueError, match="Meal 'Pizza' is already a combatant."):
+        battle_model.prep_combatant(pizza)
+
+    assert len(battle_model.get_combatants()) == 1
@@ -0,0 +1,77 @@
+import pytest
+
+from meal_max.utils.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_and_put():
+    """Test that a stored value is returned and a missing one gives the default."""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b", "missing") == "missing"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_evicts_least_recently_used():
+    """Test that a full cache drops the entry read or written longest ago."""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl():
+    """Test that entries expire ttl seconds after they were stored."""
+    clock = FakeClock()
+    cache = LRUCache(maxsize=2, ttl=5, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+def test_invalidate_and_clear():
+    """Test dropping one entry, then all of them."""
+    cache = LRUCache()
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.invalidate("a")
+    assert not cache.invalidate("a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["invalidations"] == 2
+
+def test_put_after_clear_is_dropped():
+    """Test that a value loaded before a clear() is not stored after it."""
+    cache = LRUCache()
+    generation = cache.generation()
+
+    cache.clear()
+    cache.put("a", 1, generation)
+    assert cache.get("a") is None
+
+    cache.put("a", 1, cache.generation())
+    assert cache.get("a") == 1
+
+def test_invalid_size():
+    """Test error when creating a cache that cannot hold anything."""
+    with pytest.raises(ValueError, match="Invalid cache size: 0"):
+        LRUCache(maxsize=0)
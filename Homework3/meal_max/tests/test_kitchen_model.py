@@ -0,0 +1,400 @@
+from contextlib import contextmanager
+import re
+import sqlite3
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import (
+    create_meal,
+    create_meals_bulk,
+    delete_meal,
+    get_leaderboard,
+    get_leaderboard_page,
+    get_meal_by_id,
+    get_meal_by_name,
+    get_meal_rank,
+    iter_leaderboard,
+    record_battle_result,
+    record_battle_results_bulk,
+    update_meal_stats,
+    validate_meal
+)
+from meal_max.utils.cache import LRUCache
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+def normalize_whitespace(sql_query: str) -> str:
+    return re.sub(r'\s+', ' ', sql_query).strip()
+
+# Mocking the database connection for tests
+@pytest.fixture
+def mock_cursor(mocker):
+    mock_conn = mocker.Mock()
+    mock_cursor = mocker.Mock()
+
+    # Mock the connection's cursor
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.fetchone.return_value = None  # Default return for queries
+    mock_cursor.fetchall.return_value = []
+    mock_conn.commit.return_value = None
+
+    # Mock the get_db_connection context manager from sql_utils
+    @contextmanager
+    def mock_get_db_connection():
+        yield mock_conn  # Yield the mocked connection object
+
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", mock_get_db_connection)
+
+    return mock_cursor  # Return the mock cursor so we can set expectations per test
+
+######################################################
+#
+#    Bulk import
+#
+######################################################
+
+def test_create_meals_bulk(mock_cursor):
+    """Test inserting several meals with one executemany."""
+    result = create_meals_bulk([
+        {'meal': 'Pizza', 'cuisine': 'Italian', 'price': 10.5, 'difficulty': 'LOW'},
+        {'meal': 'Sushi', 'cuisine': 'Japanese', 'price': 20, 'difficulty': 'HIGH'},
+    ])
+
+    assert result == {'inserted': 2, 'duplicates': [], 'errors': []}
+
+    expected_query = normalize_whitespace("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)")
+    actual_query = normalize_whitespace(mock_cursor.executemany.call_args[0][0])
+    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.executemany.call_args[0][1] == [
+        ('Pizza', 'Italian', 10.5, 'LOW'),
+        ('Sushi', 'Japanese', 20.0, 'HIGH'),
+    ]
+    mock_cursor.executemany.assert_called_once()
+
+def test_create_meals_bulk_reports_duplicates(mock_cursor):
+    """Test that existing and repeated names are reported without aborting the batch."""
+    mock_cursor.fetchall.return_value = [('Pizza',)]
+
+    result = create_meals_bulk([
+        {'meal': 'Pizza', 'cuisine': 'Italian', 'price': 10.5, 'difficulty': 'LOW'},
+        {'meal': 'Sushi', 'cuisine': 'Japanese', 'price': 20, 'difficulty': 'HIGH'},
+        {'meal': 'Sushi', 'cuisine': 'Japanese', 'price': 20, 'difficulty': 'HIGH'},
+    ])
+
+    assert result['inserted'] == 1
+    assert result['duplicates'] == [{'index': 0, 'meal': 'Pizza'}, {'index': 2, 'meal': 'Sushi'}]
+    assert mock_cursor.executemany.call_args[0][1] == [('Sushi', 'Japanese', 20.0, 'HIGH')]
+
+def test_create_meals_bulk_reports_invalid_rows(mock_cursor):
+    """Test that rows failing validation are reported and skipped."""
+    result = create_meals_bulk([
+        {'meal': 'Pizza', 'cuisine': 'Italian', 'price': -1, 'difficulty': 'LOW'},
+        {'meal': 'Sushi', 'cuisine': 'Japanese', 'price': 20, 'difficulty': 'EASY'},
+        "not a meal",
+    ])
+
+    assert result['inserted'] == 0
+    assert [error['index'] for error in result['errors']] == [0, 1, 2]
+    assert "Invalid price: -1" in result['errors'][0]['error']
+    assert "Invalid difficulty level: EASY" in result['errors'][1]['error']
+
+def test_create_meals_bulk_accepts_numeric_string_price(mock_cursor):
+    """Test that the bulk import accepts the same string prices as /api/create-meal."""
+    result = create_meals_bulk([{'meal': 'Pizza', 'cuisine': 'Italian', 'price': "12.5", 'difficulty': 'LOW'}])
+
+    assert result['inserted'] == 1
+    assert mock_cursor.executemany.call_args[0][1] == [('Pizza', 'Italian', 12.5, 'LOW')]
+
+def test_validate_meal():
+    """Test that a numeric string price is converted to a float."""
+    assert validate_meal("Pizza", "Italian", "12.5", "LOW") == ("Pizza", "Italian", 12.5, "LOW")
+
+@pytest.mark.parametrize("price, message", [
+    (12.345, "Price must have at most two decimal places"),
+    ("free", "Price must be a positive number"),
+    (0, "Price must be a positive number"),
+    (True, "Price must be a positive number"),
+])
+def test_validate_meal_invalid_price(price, message):
+    """Test error when a price is not a positive number with at most two decimal places."""
+    with pytest.raises(ValueError, match=message):
+        validate_meal("Pizza", "Italian", price, "LOW")
+
+def test_create_meals_bulk_database_error(mock_cursor):
+    """Test that a database error aborts the whole batch."""
+    mock_cursor.executemany.side_effect = sqlite3.OperationalError("disk I/O error")
+
+    with pytest.raises(sqlite3.OperationalError, match="disk I/O error"):
+        create_meals_bulk([{'meal': 'Pizza', 'cuisine': 'Italian', 'price': 10.5, 'difficulty': 'LOW'}])
+
+######################################################
+#
+#    Meal lookups
+#
+######################################################
+
+MEAL_ROW = (1, 'Pizza', 'Italian', 10.5, 'LOW', False)
+
+def test_meal_lookups_cached(mock_cursor, mocker):
+    """Test that a meal read by name is then served by name and by id without a query."""
+    cache = mocker.patch.object(kitchen_model, "meal_cache", LRUCache())
+    mock_cursor.fetchone.return_value = MEAL_ROW
+
+    meal = get_meal_by_name("Pizza")
+    assert get_meal_by_name("Pizza") is meal
+    assert get_meal_by_id(1) is meal
+
+    mock_cursor.execute.assert_called_once()
+    assert cache.stats()["hit_ratio"] == round(2 / 3, 3)
+
+@pytest.mark.parametrize("write", [lambda: delete_meal(1), kitchen_model.clear_meals])
+def test_meal_lookups_invalidated(mock_cursor, write):
+    """Test that deleting or clearing meals drops the cached meals."""
+    mock_cursor.fetchone.return_value = MEAL_ROW
+    get_meal_by_id(1)
+
+    mock_cursor.fetchone.return_value = (False,)
+    write()
+    mock_cursor.fetchone.return_value = (1, 'Pizza', 'Italian', 10.5, 'LOW', True)
+    with pytest.raises(ValueError, match="Meal with name Pizza has been deleted"):
+        get_meal_by_name("Pizza")
+
+def test_meal_lookups_not_cached(mock_cursor):
+    """Test that missing and deleted meals are not cached."""
+    with pytest.raises(ValueError, match="not found"):
+        get_meal_by_id(1)
+    mock_cursor.fetchone.return_value = MEAL_ROW
+
+    assert get_meal_by_id(1).meal == "Pizza"
+
+######################################################
+#
+#    Leaderboard
+#
+######################################################
+
+LEADERBOARD_ROW = (1, 'Pizza', 'Italian', 10.5, 'LOW', 4, 3, 0.75)
+
+def test_get_leaderboard_cached(mock_cursor):
+    """Test that the leaderboard is read once per sort order until the stats change."""
+    mock_cursor.fetchall.return_value = [LEADERBOARD_ROW]
+
+    first = get_leaderboard("wins")
+    assert get_leaderboard("wins") is first
+    get_leaderboard("win_pct")
+    assert mock_cursor.execute.call_count == 2
+
+    mock_cursor.rowcount = 1
+    record_battle_result(1, 2)
+    mock_cursor.execute.reset_mock()
+    assert get_leaderboard("wins") == first
+    assert get_leaderboard("win_pct") == first
+    assert mock_cursor.execute.call_count == 2
+
+@pytest.mark.parametrize("write", [
+    lambda: update_meal_stats(1, 'win'),
+    lambda: record_battle_results_bulk([(1, 1, 1)]),
+    lambda: delete_meal(1),
+])
+def test_get_leaderboard_invalidated_by_writes(mock_cursor, write):
+    """Test that every write that can change the stats drops the cached leaderboard."""
+    get_leaderboard("wins")
+    mock_cursor.fetchone.return_value = (False,)
+    mock_cursor.rowcount = 1
+
+    write()
+    mock_cursor.execute.reset_mock()
+    get_leaderboard("wins")
+
+    mock_cursor.execute.assert_called_once()
+
+def test_get_leaderboard_kept_on_create(mock_cursor):
+    """Test that a new meal, which has no battles yet, leaves the cached leaderboard alone."""
+    get_leaderboard("wins")
+
+    create_meal("Tacos", "Mexican", 8.0, "MED")
+    mock_cursor.execute.reset_mock()
+    get_leaderboard("wins")
+
+    mock_cursor.execute.assert_not_called()
+
+def test_get_leaderboard_not_cached_across_write(mock_cursor):
+    """Test that a read which raced with a write does not cache what it read before the write."""
+    def write_during_read():
+        update_meal_stats(1, 'win')
+        return [LEADERBOARD_ROW]
+    mock_cursor.fetchone.return_value = (False,)
+    mock_cursor.fetchall.side_effect = write_during_read
+
+    get_leaderboard("wins")
+    mock_cursor.fetchall.side_effect = None
+    mock_cursor.execute.reset_mock()
+    get_leaderboard("wins")
+
+    mock_cursor.execute.assert_called_once()
+
+def test_get_leaderboard_cache_ttl(mock_cursor, mocker):
+    """Test that a cached leaderboard expires, covering writes from other processes."""
+    now = [0.0]
+    cache = mocker.patch("meal_max.models.kitchen_model.leaderboard_cache",
+                         kitchen_model._LeaderboardCache(ttl=5, clock=lambda: now[0]))
+    get_leaderboard("wins")
+
+    now[0] = 5.0
+    get_leaderboard("wins")
+
+    assert mock_cursor.execute.call_count == 2
+    assert cache.stats()["expirations"] == 1
+
+def leaderboard_rows(count: int) -> list[tuple]:
+    return [(i, f'Meal {i}', 'Fusion', 10.0, 'MED', 20, 21 - i, (21 - i) / 20) for i in range(1, count + 1)]
+
+def test_get_leaderboard_page_cached(mock_cursor):
+    """Test that a page is sliced from the cached ranking, each entry with its rank."""
+    mock_cursor.fetchall.return_value = leaderboard_rows(5)
+    get_leaderboard("wins")
+
+    page = get_leaderboard_page("wins", limit=2, offset=1)
+
+    assert [(entry['rank'], entry['id']) for entry in page['leaderboard']] == [(2, 2), (3, 3)]
+    assert page['total'] == 5
+    assert [entry['rank'] for entry in get_leaderboard_page("wins", offset=3)['leaderboard']] == [4, 5]
+    assert get_leaderboard_page("wins", limit=10, offset=7)['leaderboard'] == []
+    mock_cursor.execute.assert_called_once()
+
+def test_get_leaderboard_page_uncached(mock_cursor):
+    """Test that without a cached ranking only the page and the total are read."""
+    mock_cursor.fetchall.return_value = leaderboard_rows(5)[1:3]
+    mock_cursor.fetchone.return_value = (5,)
+
+    page = get_leaderboard_page("wins", limit=2, offset=1)
+
+    assert [(entry['rank'], entry['id']) for entry in page['leaderboard']] == [(2, 2), (3, 3)]
+    assert page['total'] == 5
+    queries = [normalize_whitespace(call[0][0]) for call in mock_cursor.execute.call_args_list]
+    assert queries[1].endswith("ORDER BY wins DESC, id LIMIT ? OFFSET ?")
+    assert mock_cursor.execute.call_args_list[1][0][1] == (2, 1)
+
+@pytest.mark.parametrize("limit, offset, message", [
+    (0, 0, "Invalid limit: 0"),
+    (None, -1, "Invalid offset: -1"),
+])
+def test_get_leaderboard_page_invalid(mock_cursor, limit, offset, message):
+    """Test error when asking for an empty page or a negative offset."""
+    with pytest.raises(ValueError, match=message):
+        get_leaderboard_page("wins", limit=limit, offset=offset)
+
+def test_get_meal_rank_cached(mock_cursor):
+    """Test that a meal's rank comes with its neighbours, cut off at either end of the leaderboard."""
+    mock_cursor.fetchall.return_value = leaderboard_rows(5)
+    get_leaderboard("wins")
+
+    rank = get_meal_rank(3)
+    assert rank['rank'] == 3
+    assert rank['total'] == 5
+    assert rank['meal']['id'] == 3
+    assert [entry['id'] for entry in rank['above']] == [1, 2]
+    assert [entry['id'] for entry in rank['below']] == [4, 5]
+
+    rank = get_meal_rank(1, neighbours=1)
+    assert (rank['above'], [entry['id'] for entry in rank['below']]) == ([], [2])
+    mock_cursor.execute.assert_called_once()
+
+@pytest.mark.parametrize("row, message", [
+    ((0, 0, False), "Meal with ID 6 has not battled yet"),
+    ((3, 4, True), "Meal with ID 6 has been deleted"),
+    (None, "Meal with ID 6 not found"),
+])
+def test_get_meal_rank_not_on_leaderboard(mock_cursor, row, message):
+    """Test error when the meal is not on the leaderboard, saying why."""
+    mock_cursor.fetchall.return_value = leaderboard_rows(5)
+    get_leaderboard("wins")
+    mock_cursor.fetchone.return_value = row
+
+    with pytest.raises(ValueError, match=message):
+        get_meal_rank(6)
+
+def test_iter_leaderboard(mock_cursor):
+    """Test streaming the leaderboard in batches with fetchmany."""
+    mock_cursor.fetchmany.side_effect = [
+        [(1, 'Pizza', 'Italian', 10.5, 'LOW', 4, 3, 0.75)],
+        [(2, 'Sushi', 'Japanese', 20.0, 'HIGH', 4, 1, 0.25)],
+        []
+    ]
+
+    leaderboard = list(iter_leaderboard("wins", batch_size=1))
+
+    assert leaderboard == [
+        {'id': 1, 'meal': 'Pizza', 'cuisine': 'Italian', 'price': 10.5, 'difficulty': 'LOW', 'battles': 4, 'wins': 3, 'win_pct': 75.0},
+        {'id': 2, 'meal': 'Sushi', 'cuisine': 'Japanese', 'price': 20.0, 'difficulty': 'HIGH', 'battles': 4, 'wins': 1, 'win_pct': 25.0},
+    ]
+    mock_cursor.fetchall.assert_not_called()
+
+def test_iter_leaderboard_invalid_sort(mock_cursor):
+    """Test that an invalid sort is rejected before any row is streamed."""
+    with pytest.raises(ValueError, match="Invalid sort_by parameter: bogus"):
+        iter_leaderboard("bogus")
+    mock_cursor.execute.assert_not_called()
+
+######################################################
+#
+#    Battle results
+#
+######################################################
+
+def test_record_battle_result(mock_cursor):
+    """Test that both meals are updated by guarded UPDATEs and committed once."""
+    mock_cursor.rowcount = 1
+
+    record_battle_result(1, 2)
+
+    expected_queries = [
+        normalize_whitespace("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ? AND deleted = FALSE"),
+        normalize_whitespace("UPDATE meals SET battles = battles + 1 WHERE id = ? AND deleted = FALSE"),
+    ]
+    actual_queries = [normalize_whitespace(call[0][0]) for call in mock_cursor.execute.call_args_list]
+    assert actual_queries == expected_queries, "The SQL queries did not match the expected structure."
+    assert [call[0][1] for call in mock_cursor.execute.call_args_list] == [(1,), (2,)]
+
+@pytest.mark.parametrize("row, message", [
+    (None, "Meal with ID 2 not found"),
+    ((True,), "Meal with ID 2 has been deleted"),
+])
+def test_record_battle_result_invalid_loser(mock_cursor, mocker, row, message):
+    """Test that a missing or deleted loser rolls back the winner's update."""
+    type(mock_cursor).rowcount = mocker.PropertyMock(side_effect=[1, 0])
+    mock_cursor.fetchone.return_value = row
+
+    with pytest.raises(ValueError, match=message):
+        record_battle_result(1, 2)
+
+    assert normalize_whitespace(mock_cursor.execute.call_args_list[2][0][0]) == "SELECT deleted FROM meals WHERE id = ?"
+
+def test_record_battle_result_same_meal(mock_cursor):
+    """Test that a meal cannot be recorded as beating itself."""
+    with pytest.raises(ValueError, match="Meal with ID 1 cannot battle itself"):
+        record_battle_result(1, 1)
+    mock_cursor.execute.assert_not_called()
+
+def test_record_battle_results_bulk(mock_cursor):
+    """Test that many meals' stats are added by one executemany."""
+    mock_cursor.rowcount = 2
+
+    assert record_battle_results_bulk([(1, 3, 2), (2, 3, 1)]) == 2
+
+    query, rows = mock_cursor.executemany.call_args[0]
+    assert normalize_whitespace(query) == normalize_whitespace(
+        "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ? AND deleted = FALSE")
+    assert rows == [(3, 2, 1), (3, 1, 2)]
+
+def test_record_battle_results_bulk_deleted_meal(mock_cursor):
+    """Test that nothing is recorded when a meal is missing or deleted."""
+    mock_cursor.rowcount = 1
+
+    with pytest.raises(ValueError, match="missing or have been deleted"):
+        record_battle_results_bulk([(1, 3, 2), (2, 3, 1)])
@@ -0,0 +1,148 @@
+import logging
+import queue
+
+import pytest
+
+from meal_max.utils import logger as log_setup
+from meal_max.utils.logger import (
+    SamplingFilter,
+    configure_logger,
+    flush_logging,
+    get_level,
+    get_logging_stats,
+    parse_module_settings,
+    skip_unused_record_fields
+)
+
+
+@pytest.fixture
+def fresh_logger(request):
+    """Fixture for a logger no other test has configured."""
+    logger = logging.getLogger(f"meal_max.tests.{request.node.name}")
+    yield logger
+    logger.handlers.clear()
+    logger.filters.clear()
+
+class Collector:
+    """A stream that keeps what is written to it."""
+
+    def __init__(self):
+        self.text = ""
+
+    def write(self, text: str) -> None:
+        self.text += text
+
+    def flush(self) -> None:
+        pass
+
+def record(message: str, level: int = logging.INFO, args: tuple = ()) -> logging.LogRecord:
+    return logging.LogRecord("meal_max.models.battle_model", level, __file__, 1, message, args, None)
+
+
+def test_parse_module_settings():
+    """Test parsing per-module settings, ignoring blanks and whitespace."""
+    assert parse_module_settings(" meal_max.utils=WARNING, ,meal_max.models.battle_model = 100") == {
+        "meal_max.utils": "WARNING", "meal_max.models.battle_model": "100"}
+
+def test_parse_module_settings_invalid():
+    """Test error when a setting has no module or value."""
+    with pytest.raises(ValueError, match="Invalid logging setting: WARNING"):
+        parse_module_settings("WARNING")
+
+def test_get_level(mocker):
+    """Test that the longest matching module setting wins, falling back to LOG_LEVEL."""
+    mocker.patch.object(log_setup, "LOG_LEVEL", "info")
+    mocker.patch.object(log_setup, "LOG_LEVELS", "meal_max.utils=WARNING,meal_max.utils.sql_utils=DEBUG")
+
+    assert get_level("meal_max.utils.sql_utils") == logging.DEBUG
+    assert get_level("meal_max.utils.random_utils") == logging.WARNING
+    assert get_level("meal_max.models.battle_model") == logging.INFO
+
+def test_get_level_invalid(mocker):
+    """Test error when a level is not a logging level name."""
+    mocker.patch.object(log_setup, "LOG_LEVELS", "meal_max=LOUD")
+
+    with pytest.raises(ValueError, match="Invalid log level: LOUD"):
+        get_level("meal_max.models.battle_model")
+
+def test_configure_logger_is_idempotent(fresh_logger, mocker):
+    """Test that configuring a logger again adds no second handler or filter."""
+    mocker.patch.object(log_setup, "LOG_SAMPLE_RATES", "meal_max.tests=10")
+
+    configure_logger(fresh_logger)
+    configure_logger(fresh_logger)
+
+    assert len(fresh_logger.handlers) == 1
+    assert len(fresh_logger.filters) == 1
+    assert fresh_logger.level == get_level(fresh_logger.name)
+
+def test_records_reach_the_writer(fresh_logger, mocker):
+    """Test that a record is written by the background writer with its arguments filled in."""
+    configure_logger(fresh_logger)
+    output = Collector()
+    mocker.patch.object(log_setup._listener.handlers[0], "stream", output)
+
+    fresh_logger.warning("Battle score for %s: %.3f", "Pizza", 12.5)
+    assert flush_logging()
+
+    assert "WARNING - Battle score for Pizza: 12.500" in output.text
+
+def test_full_queue_drops_records(fresh_logger, mocker):
+    """Test that logging to a full queue drops the record instead of blocking."""
+    configure_logger(fresh_logger)
+    handler = log_setup._get_queue_handler()
+    mocker.patch.object(handler, "queue", queue.Queue(1))
+    handler.queue.put_nowait(record("Already queued"))
+    dropped = get_logging_stats()["dropped"]
+
+    fresh_logger.warning("No room")
+
+    assert get_logging_stats()["dropped"] == dropped + 1
+
+def test_import_leaves_record_fields_alone():
+    """Test that importing the module does not change what other loggers collect."""
+    assert logging.logThreads
+    assert logging.logProcesses
+
+def test_skip_unused_record_fields(mocker):
+    """Test that opting in stops records collecting thread and process fields, and nothing else."""
+    for name in ("logThreads", "logProcesses", "logMultiprocessing"):
+        mocker.patch.object(logging, name, getattr(logging, name))
+
+    skip_unused_record_fields()
+    entry = logging.getLogger(__name__).makeRecord(__name__, logging.INFO, __file__, 7, "msg", (), None, "caller")
+
+    assert entry.thread is None
+    assert entry.process is None
+    assert (entry.lineno, entry.funcName) == (7, "caller")
+
+def test_sampling_filter():
+    """Test that 1 in rate records of each message passes, and warnings always do."""
+    sampler = SamplingFilter(3)
+
+    passed = [sampler.filter(record("Battle score for %s", args=(i,))) for i in range(7)]
+    other = sampler.filter(record("Clearing the combatants list."))
+    warnings = [sampler.filter(record("Slow query", logging.WARNING)) for _ in range(3)]
+
+    assert passed == [True, False, False, True, False, False, True]
+    assert other
+    assert all(warnings)
+
+def test_sampling_filter_forgets_least_recent_template():
+    """Test that the sampler counts at most max_templates templates, dropping the least recently seen."""
+    sampler = SamplingFilter(2, max_templates=2)
+
+    assert sampler.filter(record("First %s", args=(1,)))
+    assert sampler.filter(record("Second %s", args=(1,)))
+    assert not sampler.filter(record("First %s", args=(2,)))
+    assert sampler.filter(record("Third %s", args=(1,)))
+
+    assert len(sampler._counts) == 2
+    # "Second" was seen least recently, so it was forgotten and starts over
+    assert sampler.filter(record("Second %s", args=(2,)))
+    assert not sampler.filter(record("Third %s", args=(2,)))
+
+def test_sampling_filter_invalid_rate():
+    """Test error when creating a sampler that keeps nothing."""
+    with pytest.raises(ValueError, match="Invalid sample rate: 0"):
+        SamplingFilter(0)
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+
+import pytest
+
+from meal_max.utils.migrations import apply_migrations, check_schema, get_schema_version, load_migrations
+from meal_max.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """Fixture for a connection to an empty database file."""
+    conn = sqlite3.connect(str(tmp_path / "meal_max.db"))
+    yield conn
+    conn.close()
+
+def write_migrations(directory, migrations: dict[str, str]) -> str:
+    for filename, sql in migrations.items():
+        (directory / filename).write_text(sql)
+    return str(directory)
+
+
+def test_load_migrations_in_version_order():
+    """Test that the shipped migrations load in version order."""
+    migrations = load_migrations(MIGRATIONS_DIR)
+
+    assert [m.version for m in migrations] == list(range(1, len(migrations) + 1))
+    assert migrations[0].name == "create_meals"
+
+def test_load_migrations_duplicate_version(tmp_path):
+    """Test that two files with the same version are rejected."""
+    directory = write_migrations(tmp_path, {"0001_a.sql": "", "1_b.sql": "", "README.md": ""})
+
+    with pytest.raises(ValueError, match="Duplicate migration version 1"):
+        load_migrations(directory)
+
+def test_apply_migrations_fresh_database(conn):
+    """Test migrating an empty database, then that a second run has nothing to do."""
+    migrations = load_migrations(MIGRATIONS_DIR)
+
+    assert apply_migrations(conn, migrations) == [m.version for m in migrations]
+    assert get_schema_version(conn) == migrations[-1].version
+    assert apply_migrations(conn, migrations) == []
+
+def test_apply_migrations_keeps_existing_data(conn):
+    """Test that an unversioned database is upgraded in place without losing rows."""
+    conn.executescript("""
+        CREATE TABLE meals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meal TEXT NOT NULL UNIQUE,
+            cuisine TEXT NOT NULL,
+            price REAL NOT NULL,
+            difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+            battles INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            deleted BOOLEAN DEFAULT FALSE
+        );
+        INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES ('Pizza', 'Italian', 10.0, 'LOW', 4, 3);
+    """)
+
+    apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+
+    assert conn.execute("SELECT meal, win_pct FROM meals").fetchall() == [("Pizza", 0.75)]
+
+def test_apply_migrations_rolls_back_failed_migration(conn, tmp_path):
+    """Test that a failing migration leaves neither partial schema nor its version behind."""
+    directory = write_migrations(tmp_path, {
+        "0001_first.sql": "CREATE TABLE first (a INTEGER);",
+        "0002_broken.sql": "CREATE TABLE second (a INTEGER);\nINSERT INTO missing VALUES (1);",
+        "0003_never.sql": "CREATE TABLE third (a INTEGER);",
+    })
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table: missing"):
+        apply_migrations(conn, load_migrations(directory))
+
+    assert get_schema_version(conn) == 1
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "first" in tables
+    assert "second" not in tables
+    assert "third" not in tables
+
+def test_check_schema(tmp_path, mocker):
+    """Test that startup refuses an outdated schema unless it may migrate it."""
+    pool = ConnectionPool(str(tmp_path / "meal_max.db"), max_size=1)
+    mocker.patch("meal_max.utils.migrations.get_db_connection", pool.checkout)
+    latest = load_migrations(MIGRATIONS_DIR)[-1].version
+
+    with pytest.raises(RuntimeError, match=f"Database schema is at version 0, expected {latest}"):
+        check_schema(MIGRATIONS_DIR, auto_migrate=False)
+
+    assert check_schema(MIGRATIONS_DIR, auto_migrate=True) == latest
+    assert check_schema(MIGRATIONS_DIR, auto_migrate=False) == latest
+    pool.close()
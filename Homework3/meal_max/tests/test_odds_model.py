@@ -0,0 +1,170 @@
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.odds_model import (
+    OddsCache,
+    get_battle_odds,
+    get_odds_matrix,
+    simulate_matrix,
+    win_probability
+)
+from meal_max.utils.migrations import apply_migrations, load_migrations
+from meal_max.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+MEALS = [
+    ("Pizza", "Italian", 12.5, "LOW"),
+    ("Sushi", "Japanese", 20.0, "HIGH"),
+    ("Tacos", "Mexican", 8.0, "MED"),
+    ("Pho", "Vietnamese", 11.0, "MED"),
+]
+
+
+@pytest.fixture
+def meals_db(tmp_path, mocker):
+    """Fixture for a real meals table holding four meals, with an empty odds cache."""
+    db_path = str(tmp_path / "meal_max.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)", MEALS)
+    pool = ConnectionPool(db_path, max_size=2)
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", pool.checkout)
+    mocker.patch("meal_max.models.tournament_model.get_db_connection", pool.checkout)
+    cache = OddsCache()
+    mocker.patch("meal_max.models.odds_model.odds_cache", cache)
+    mocker.patch.object(kitchen_model, "_meal_listeners", kitchen_model._meal_listeners + [cache.on_meal_change])
+    mocker.patch("meal_max.utils.random_utils.RANDOM_SOURCE", "random_org")
+    yield db_path
+    pool.close()
+
+
+@pytest.mark.parametrize("distribution, random_numbers", [
+    ("random_org", [k / 100 for k in range(100)]),
+    # round(random(), 2) lands on 0.00 and 1.00 half as often as on the other values
+    ("local", [0.0] + [k / 100 for k in range(1, 100) for _ in (0, 1)] + [1.0]),
+])
+def test_win_probability_matches_enumeration(distribution, random_numbers):
+    """Test that the closed form equals the share of equally likely random numbers that battle() counts as a win."""
+    deltas = [0.0, 0.005, 0.01, 0.37, 0.375, 0.99, 0.995, 1.0, 1.5, abs(137.5 - 159.0) / 100]
+
+    probabilities = win_probability(np.array(deltas), distribution)
+
+    expected = [sum(delta > r for r in random_numbers) / len(random_numbers) for delta in deltas]
+    assert probabilities.tolist() == pytest.approx(expected)
+
+def test_battle_odds(meals_db):
+    """Test that the odds use the battle scores of both meals, in the order given."""
+    battle_model = BattleModel()
+    pizza = kitchen_model.get_meal_by_name("Pizza")
+    sushi = kitchen_model.get_meal_by_name("Sushi")
+    delta = abs(battle_model.get_battle_score(pizza) - battle_model.get_battle_score(sushi)) / 100
+
+    odds = get_battle_odds("Pizza", "Sushi")
+
+    assert odds["delta"] == delta
+    assert odds["meal1"]["meal"] == "Pizza"
+    assert odds["meal1"]["win_probability"] == pytest.approx(sum(delta > k / 100 for k in range(100)) / 100)
+    assert odds["meal1"]["win_probability"] + odds["meal2"]["win_probability"] == pytest.approx(1)
+    assert not odds["cached"]
+    assert get_battle_odds("Pizza", "Sushi")["cached"]
+
+def test_battle_odds_monte_carlo(meals_db):
+    """Test that a Monte Carlo estimate is close to the exact odds and reproducible with a seed."""
+    exact = get_battle_odds("Tacos", "Pho")["meal1"]["win_probability"]
+
+    estimate = get_battle_odds("Tacos", "Pho", method="monte_carlo", samples=200000, seed=1)
+
+    assert estimate["samples"] == 200000
+    assert estimate["meal1"]["win_probability"] == pytest.approx(exact, abs=0.01)
+    assert estimate == get_battle_odds("Tacos", "Pho", method="monte_carlo", samples=200000, seed=1) | {"cached": False}
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"method": "guess"}, "Invalid odds method: guess"),
+    ({"samples": 0}, "Invalid number of samples: 0"),
+])
+def test_battle_odds_invalid_params(meals_db, kwargs, message):
+    """Test error when asking for odds with an unknown method or no samples."""
+    with pytest.raises(ValueError, match=message):
+        get_battle_odds("Pizza", "Sushi", **kwargs)
+
+def test_battle_odds_same_meal(meals_db):
+    """Test error when asking for the odds of a meal against itself."""
+    with pytest.raises(ValueError, match="cannot battle itself"):
+        get_battle_odds("Pizza", "Pizza")
+
+def test_battle_odds_cache_dropped_on_delete(meals_db):
+    """Test that deleting a meal drops its cached odds, and clearing meals drops all of them."""
+    get_battle_odds("Pizza", "Sushi")
+    get_battle_odds("Tacos", "Pho")
+
+    kitchen_model.delete_meal(2)
+    with pytest.raises(ValueError, match="Sushi has been deleted"):
+        get_battle_odds("Pizza", "Sushi")
+    assert get_battle_odds("Tacos", "Pho")["cached"]
+
+    kitchen_model.clear_meals()
+    kitchen_model.create_meal("Tacos", "Thai", 30.0, "LOW")
+    kitchen_model.create_meal("Pho", "Vietnamese", 11.0, "MED")
+    odds = get_battle_odds("Tacos", "Pho")
+    assert not odds["cached"]
+    assert odds["meal1"]["score"] == 30.0 * len("Thai") - 3
+
+def test_odds_matrix(meals_db):
+    """Test that every cell of the matrix equals the odds of that pair."""
+    result = get_odds_matrix()
+
+    names = [meal["meal"] for meal in result["meals"]]
+    assert names == ["Pizza", "Sushi", "Tacos", "Pho"]
+    for i, first in enumerate(names):
+        assert result["matrix"][i][i] is None
+        for j, second in enumerate(names):
+            if i != j:
+                assert result["matrix"][i][j] == get_battle_odds(first, second)["meal1"]["win_probability"]
+    assert get_odds_matrix()["cached"]
+
+def test_odds_matrix_selected_meals(meals_db):
+    """Test a matrix of named meals, in the order given, and that it is recomputed once one of them is deleted."""
+    result = get_odds_matrix(["Pho", "Pizza"])
+    assert [meal["meal"] for meal in result["meals"]] == ["Pho", "Pizza"]
+
+    kitchen_model.delete_meal(4)
+    with pytest.raises(ValueError, match="Pho not found or has been deleted"):
+        get_odds_matrix(["Pho", "Pizza"])
+
+def test_odds_matrix_too_few_meals(meals_db):
+    """Test error when a matrix would hold fewer than two meals."""
+    with pytest.raises(ValueError, match="at least two meals"):
+        get_odds_matrix(["Pizza"])
+
+def test_odds_matrix_too_many_meals(meals_db, mocker):
+    """Test error when a matrix would hold more meals than allowed."""
+    mocker.patch("meal_max.models.odds_model.ODDS_MATRIX_MAX_MEALS", 3)
+    with pytest.raises(ValueError, match="at most 3 meals"):
+        get_odds_matrix()
+
+def test_simulate_matrix_close_to_exact():
+    """Test that the Monte Carlo matrix is symmetric and close to the exact odds."""
+    scores = np.random.default_rng(0).uniform(0, 150, size=12)
+    exact = win_probability(np.abs(scores[:, None] - scores[None, :]) / 100, "local")
+
+    estimate = simulate_matrix(scores, 100000, "local", seed=3, workers=1)
+
+    assert np.array_equal(estimate, estimate.T)
+    off_diagonal = ~np.eye(len(scores), dtype=bool)
+    assert np.abs(estimate - exact)[off_diagonal].max() < 0.01
+
+def test_simulate_matrix_process_pool():
+    """Test that spreading the rows over processes gives the same matrix as one process."""
+    scores = np.random.default_rng(1).uniform(0, 150, size=9)
+
+    serial = simulate_matrix(scores, 1000, "random_org", seed=5, workers=1)
+    parallel = simulate_matrix(scores, 1000, "random_org", seed=5, workers=2, parallel_threshold=0)
+
+    assert np.array_equal(serial, parallel)
@@ -0,0 +1,135 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import (
+    create_meal,
+    get_leaderboard,
+    get_leaderboard_page,
+    get_meal_by_name,
+    get_meal_rank,
+    update_meal_stats
+)
+from meal_max.utils.migrations import apply_migrations, load_migrations
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+# A meals table created before schema versioning
+BASELINE_MEAL_TABLE = """
+CREATE TABLE meals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meal TEXT NOT NULL UNIQUE,
+    cuisine TEXT NOT NULL,
+    price REAL NOT NULL,
+    difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+    battles INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    deleted BOOLEAN DEFAULT FALSE
+);
+"""
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture(params=["fresh", "upgrade"])
+def meals_db(request, mocker):
+    """Fixture for a meals table built by the migrations, both from scratch and over an unversioned database."""
+    conn = sqlite3.connect(":memory:")
+    if request.param == "upgrade":
+        conn.executescript(BASELINE_MEAL_TABLE)
+    apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+
+    # Record the SELECTs kitchen_model runs so their plans can be checked
+    selects = []
+    conn.set_trace_callback(lambda sql: selects.append(sql) if sql.lstrip().startswith("SELECT") else None)
+
+    @contextmanager
+    def mock_get_db_connection():
+        yield conn
+
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", mock_get_db_connection)
+    yield conn, selects
+    conn.close()
+
+def last_query_plan(db: tuple[sqlite3.Connection, list[str]]) -> str:
+    """Returns the EXPLAIN QUERY PLAN of the last SELECT kitchen_model ran, one step per line."""
+    conn, selects = db
+    sql = selects[-1]
+    conn.set_trace_callback(None)
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+    return "\n".join(row[3] for row in rows)
+
+######################################################
+#
+#    Query plans
+#
+######################################################
+
+@pytest.mark.parametrize("sort_by, index", [
+    ("wins", "idx_meals_leaderboard_wins"),
+    ("win_pct", "idx_meals_leaderboard_win_pct"),
+])
+def test_leaderboard_uses_partial_index(meals_db, sort_by, index):
+    """Test that the leaderboard is read in order from its partial index instead of a scan plus sort."""
+    get_leaderboard(sort_by)
+
+    plan = last_query_plan(meals_db)
+    assert f"USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_meal_by_name_uses_index(meals_db):
+    """Test that name lookups search the unique index on meal."""
+    create_meal("Pizza", "Italian", 10.0, "LOW")
+
+    get_meal_by_name("Pizza")
+
+    plan = last_query_plan(meals_db)
+    assert "SEARCH meals USING INDEX" in plan
+    assert "(meal=?)" in plan
+
+def test_leaderboard_generated_win_pct(meals_db):
+    """Test that win_pct is computed by the generated column and ranks meals."""
+    create_meal("Pizza", "Italian", 10.0, "LOW")
+    create_meal("Sushi", "Japanese", 20.0, "HIGH")
+    create_meal("Tacos", "Mexican", 8.0, "MED")
+    for result in ("win", "loss"):
+        update_meal_stats(1, result)
+    for result in ("win", "win", "loss", "loss"):
+        update_meal_stats(2, result)
+    update_meal_stats(3, "win")
+
+    leaderboard = get_leaderboard("win_pct")
+
+    assert [(meal["meal"], meal["win_pct"]) for meal in leaderboard] == [
+        ("Tacos", 100.0), ("Pizza", 50.0), ("Sushi", 50.0)
+    ]
+
+@pytest.mark.parametrize("sort_by, index", [
+    ("wins", "idx_meals_leaderboard_wins"),
+    ("win_pct", "idx_meals_leaderboard_win_pct"),
+])
+def test_uncached_rank_and_page_match_ranking(meals_db, sort_by, index):
+    """Test that pages and ranks read with index queries equal those taken from the cached ranking."""
+    conn, _ = meals_db
+    conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, deleted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     [(f"Meal {i}", "Fusion", 10.0, "MED", i % 4, i % 3 if i % 4 else 0, i % 7 == 0) for i in range(1, 41)])
+    conn.commit()
+    meal_ids = [row[0] for row in conn.execute("SELECT id FROM meals WHERE deleted = FALSE AND battles > 0")]
+
+    uncached_pages = [get_leaderboard_page(sort_by, limit=7, offset=offset) for offset in range(0, 30, 7)]
+    uncached_ranks = [get_meal_rank(meal_id, sort_by, neighbours=2) for meal_id in meal_ids]
+    plan = last_query_plan(meals_db)
+    assert f"USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
+
+    get_leaderboard(sort_by)
+    assert kitchen_model.leaderboard_cache.get(sort_by) is not None
+    assert [get_leaderboard_page(sort_by, limit=7, offset=offset) for offset in range(0, 30, 7)] == uncached_pages
+    assert [get_meal_rank(meal_id, sort_by, neighbours=2) for meal_id in meal_ids] == uncached_ranks
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from meal_max.utils import random_utils
+from meal_max.utils.random_stub import RandomStubServer
+from meal_max.utils.random_utils import (
+    BufferedRandomSource,
+    LocalRandomSource,
+    fetch_random_fractions,
+    get_random,
+    set_random_source
+)
+
+
+@pytest.fixture
+def mock_random_org(mocker):
+    # Patch the requests.get call
+    mock_response = mocker.Mock()
+    mock_response.text = "0.42\n0.17\n"
+    mocker.patch("requests.get", return_value=mock_response)
+    return mock_response
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """Fixture to point the random.org URL at a local stub server."""
+    server = RandomStubServer(seed=42).start()
+    monkeypatch.setattr(random_utils, "RANDOM_ORG_URL", server.url)
+    yield server
+    server.stop()
+
+@pytest.fixture(autouse=True)
+def reset_random_source():
+    yield
+    set_random_source(None)
+
+
+def test_fetch_random_fractions(mock_random_org):
+    """Test fetching a batch of random numbers from random.org."""
+    result = fetch_random_fractions(2)
+
+    assert result == [0.42, 0.17]
+    requests.get.assert_called_once_with(
+        "https://www.random.org/decimal-fractions/?num=2&dec=2&col=1&format=plain&rnd=new", timeout=5)
+
+def test_fetch_random_fractions_request_failure(mocker):
+    """Simulate a request failure."""
+    mocker.patch("requests.get", side_effect=requests.exceptions.RequestException("Connection error"))
+
+    with pytest.raises(RuntimeError, match="Request to random.org failed: Connection error"):
+        fetch_random_fractions(1)
+
+def test_fetch_random_fractions_timeout(mocker):
+    """Simulate a timeout."""
+    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+
+    with pytest.raises(RuntimeError, match="Request to random.org timed out."):
+        fetch_random_fractions(1)
+
+def test_fetch_random_fractions_invalid_response(mock_random_org):
+    """Simulate an invalid response (non-digit)."""
+    mock_random_org.text = "invalid_response"
+
+    with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
+        fetch_random_fractions(1)
+
+def test_buffered_source_fetches_in_bulk(stub_server):
+    """Test that the buffered source serves many numbers from a single request."""
+    source = BufferedRandomSource(fetch_random_fractions, batch_size=50, low_watermark=0)
+
+    numbers = [source.next() for _ in range(50)]
+
+    assert all(0 <= number < 1 for number in numbers)
+    assert stub_server.requests_served == 1
+    assert source.stats()["served"] == 50
+
+def test_buffered_source_refills_in_background(stub_server):
+    """Test that dropping below the low watermark triggers a refill."""
+    source = BufferedRandomSource(fetch_random_fractions, batch_size=10, low_watermark=5)
+
+    for _ in range(6):
+        source.next()
+
+    for _ in range(100):
+        if source.stats()["fetches"] == 2:
+            break
+        time.sleep(0.01)
+    assert source.stats()["fetches"] == 2
+    assert source.stats()["buffered"] == 14
+
+def test_buffered_source_falls_back_to_local(mocker):
+    """Test that a failed fetch is served from the local fallback instead of raising."""
+    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    source = BufferedRandomSource(fetch_random_fractions, fallback=LocalRandomSource(seed=1))
+
+    assert source.next() == LocalRandomSource(seed=1).next()
+    assert source.stats()["fallbacks"] == 1
+
+def test_buffered_source_without_fallback_raises(mocker):
+    """Test that a failed fetch is raised when there is no fallback."""
+    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    source = BufferedRandomSource(fetch_random_fractions)
+
+    with pytest.raises(RuntimeError, match="Request to random.org timed out."):
+        source.next()
+
+def test_buffered_source_shares_sync_fetch():
+    """Test that threads finding the buffer dry wait for one fetch instead of each fetching."""
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(num):
+        calls.append(num)
+        release.wait(5)
+        return [i / 100 for i in range(num)]
+
+    source = BufferedRandomSource(slow_fetch, batch_size=100, low_watermark=0)
+    numbers = []
+    threads = [threading.Thread(target=lambda: numbers.append(source.next())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(numbers) == [i / 100 for i in range(8)]
+
+def test_buffered_source_backs_off_after_failure():
+    """Test that after a failed fetch the fallback is served without fetching again until the backoff ends."""
+    calls = []
+
+    def failing_fetch(num):
+        calls.append(num)
+        raise RuntimeError("Request to random.org timed out.")
+
+    source = BufferedRandomSource(failing_fetch, fallback=LocalRandomSource(seed=1), backoff=0.1)
+
+    for _ in range(5):
+        source.next()
+    assert len(calls) == 1
+    assert source.stats()["fallbacks"] == 5
+
+    time.sleep(0.15)
+    source.next()
+    assert len(calls) == 2
+
+def test_local_source_is_deterministic_when_seeded():
+    """Test that two local sources with the same seed produce the same numbers."""
+    first = LocalRandomSource(seed=7)
+    second = LocalRandomSource(seed=7)
+
+    assert [first.next() for _ in range(5)] == [second.next() for _ in range(5)]
+
+def test_get_random_uses_configured_source():
+    """Test that get_random() draws from the process-wide source."""
+    set_random_source(LocalRandomSource(seed=3))
+
+    assert get_random() == LocalRandomSource(seed=3).next()
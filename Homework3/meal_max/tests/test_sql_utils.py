@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+
+import pytest
+
+from meal_max.utils.sql_utils import ConnectionPool, get_pragma_profile
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Fixture to provide a small pool over a temporary database."""
+    pool = ConnectionPool(str(tmp_path / "test.db"), max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+def test_checkout_reuses_idle_connection(pool):
+    """Test that a returned connection is handed out again instead of opening a new one."""
+    with pool.checkout() as conn1:
+        pass
+    with pool.checkout() as conn2:
+        pass
+
+    assert conn1 is conn2
+    stats = pool.stats()
+    assert stats["opens"] == 1
+    assert stats["hits"] == 1
+
+def test_nested_checkout_same_thread(pool):
+    """Test that nested checkouts on one thread share a single connection."""
+    with pool.checkout() as outer:
+        with pool.checkout() as inner:
+            assert inner is outer
+
+    stats = pool.stats()
+    assert stats["opens"] == 1
+    assert stats["reuses"] == 1
+
+def test_checkout_rolls_back_open_transaction(pool):
+    """Test that uncommitted work is rolled back when the connection is returned."""
+    with pool.checkout() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pool.checkout() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+def test_checkout_timeout_when_exhausted(pool):
+    """Test that a checkout waits and then times out when every connection is in use."""
+    release = threading.Event()
+    ready = threading.Barrier(3)
+
+    def hold():
+        with pool.checkout():
+            ready.wait()
+            release.wait()
+
+    holders = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in holders:
+        thread.start()
+    ready.wait()
+
+    with pytest.raises(sqlite3.OperationalError, match="Timed out waiting for a database connection"):
+        with pool.checkout():
+            pass
+
+    release.set()
+    for thread in holders:
+        thread.join()
+
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["open"] == 2
+
+def test_unhealthy_connection_is_replaced(pool):
+    """Test that a connection failing validation is discarded and replaced on checkout."""
+    with pool.checkout() as conn:
+        pass
+    conn.close()
+
+    with pool.checkout() as replacement:
+        assert replacement is not conn
+        replacement.execute("SELECT 1")
+
+    stats = pool.stats()
+    assert stats["discards"] == 1
+    assert stats["opens"] == 2
+    assert stats["open"] == 1
+
+def test_invalid_pool_size(tmp_path):
+    """Test error when creating a pool without room for a connection."""
+    with pytest.raises(ValueError, match="Invalid pool size: 0"):
+        ConnectionPool(str(tmp_path / "test.db"), max_size=0)
+
+def test_pragmas_applied_on_open(tmp_path):
+    """Test that the PRAGMA profile is applied to each new pooled connection."""
+    pool = ConnectionPool(str(tmp_path / "test.db"), max_size=1, pragmas=get_pragma_profile("balanced"))
+    with pool.checkout() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    pool.close()
+
+def test_invalid_pragma_profile():
+    """Test error when selecting an unknown PRAGMA profile."""
+    with pytest.raises(ValueError, match="Invalid PRAGMA profile: turbo"):
+        get_pragma_profile("turbo")
+
+def test_invalid_pragma_value(tmp_path):
+    """Test that PRAGMA values which are not plain identifiers or numbers are rejected."""
+    pool = ConnectionPool(str(tmp_path / "test.db"), max_size=1, pragmas={"journal_mode": "WAL; DROP TABLE meals"})
+    with pytest.raises(ValueError, match="Invalid PRAGMA setting"):
+        with pool.checkout():
+            pass
+    assert pool.stats()["open"] == 0
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.tournament_model import (
+    load_meal_table,
+    play_matches,
+    run_tournament,
+    simulate_bracket,
+    simulate_round_robin
+)
+from meal_max.utils.migrations import apply_migrations, load_migrations
+from meal_max.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+MEALS = [
+    ("Pizza", "Italian", 12.5, "LOW"),
+    ("Sushi", "Japanese", 20.0, "HIGH"),
+    ("Tacos", "Mexican", 8.0, "MED"),
+    ("Pho", "Vietnamese", 11.0, "MED"),
+    ("Curry", "Indian", 14.25, "HIGH"),
+]
+
+
+@pytest.fixture
+def meals_db(tmp_path, mocker):
+    """Fixture for a real meals table holding five meals, the last one deleted."""
+    db_path = str(tmp_path / "meal_max.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)", MEALS)
+        conn.execute("UPDATE meals SET deleted = TRUE WHERE meal = 'Curry'")
+    pool = ConnectionPool(db_path, max_size=2)
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", pool.checkout)
+    mocker.patch("meal_max.models.tournament_model.get_db_connection", pool.checkout)
+    yield db_path
+    pool.close()
+
+def stats_in_db(db_path: str) -> dict[str, tuple[int, int]]:
+    with sqlite3.connect(db_path) as conn:
+        return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT meal, battles, wins FROM meals")}
+
+
+def test_scores_match_battle_model(meals_db):
+    """Test that the vectorized scores equal BattleModel.get_battle_score() for every active meal."""
+    table = load_meal_table()
+    battle_model = BattleModel()
+
+    assert table.ids.tolist() == [1, 2, 3, 4]
+    assert table.names == ["Pizza", "Sushi", "Tacos", "Pho"]
+    expected = [battle_model.get_battle_score(Meal(i + 1, *MEALS[i])) for i in range(4)]
+    assert table.scores.tolist() == pytest.approx(expected)
+
+def test_play_matches_follows_battle_rule():
+    """Test that the first meal wins exactly when the score delta / 100 beats the random number."""
+    scores = np.array([0.0, 30.0, 95.0, 10.0])
+    first = np.array([0, 1, 2, 3, 0, 2])
+    second = np.array([1, 2, 3, 0, 2, 1])
+
+    winners = play_matches(scores, first, second, np.random.default_rng(3))
+
+    random_numbers = np.round(np.random.default_rng(3).random(len(first)), 2)
+    expected = [f if abs(scores[f] - scores[s]) / 100 > r else s
+                for f, s, r in zip(first, second, random_numbers)]
+    assert winners.tolist() == expected
+
+def test_round_robin_plays_every_pair_once():
+    """Test that each meal plays every other meal once, whatever the batch size."""
+    scores = np.random.default_rng(0).uniform(0, 300, size=57)
+
+    battles, wins = simulate_round_robin(scores, np.random.default_rng(1), batch_size=10 ** 6)
+    assert battles.tolist() == [56] * 57
+    assert wins.sum() == 57 * 56 // 2
+
+    # Batches draw their random numbers in order, so the outcome does not depend on the batch size
+    for batch_size in (1, 40, 500):
+        _, batched_wins = simulate_round_robin(scores, np.random.default_rng(1), batch_size=batch_size)
+        assert batched_wins.tolist() == wins.tolist()
+
+def test_round_robin_pairs(mocker):
+    """Test that the round robin pairs are every i < j, with the lower index first."""
+    play = mocker.patch("meal_max.models.tournament_model.play_matches",
+                        side_effect=lambda scores, first, second, rng: first)
+
+    simulate_round_robin(np.zeros(6), np.random.default_rng(0), batch_size=4)
+
+    pairs = [(f, s) for call in play.call_args_list for f, s in zip(call[0][1].tolist(), call[0][2].tolist())]
+    assert pairs == [(i, j) for i in range(6) for j in range(i + 1, 6)]
+
+@pytest.mark.parametrize("count", [2, 5, 8, 13])
+def test_bracket(count):
+    """Test that a bracket plays count - 1 matches, every other meal loses once, and the champion never loses."""
+    scores = np.random.default_rng(count).uniform(0, 300, size=count)
+
+    battles, wins, champion = simulate_bracket(scores, np.random.default_rng(7))
+
+    assert battles.sum() == 2 * (count - 1)
+    assert wins.sum() == count - 1
+    assert wins[champion] == battles[champion]
+    assert (battles - wins <= 1).all()
+
+def test_run_tournament_records_results(meals_db):
+    """Test that a round robin between the active meals is recorded in one batch."""
+    result = run_tournament("round_robin", seed=42)
+
+    assert result["meals"] == 4
+    assert result["matches"] == 6
+    assert result["recorded"]
+    stats = stats_in_db(meals_db)
+    assert stats["Curry"] == (0, 0)
+    assert {stats[meal][0] for meal in ("Pizza", "Sushi", "Tacos", "Pho")} == {3}
+    assert sum(wins for _, wins in stats.values()) == 6
+    champion = result["champion"]["meal"]
+    assert stats[champion][1] == max(wins for _, wins in stats.values())
+    assert [entry["meal"] for entry in result["standings"]][0] == champion
+
+def test_run_tournament_is_reproducible(meals_db):
+    """Test that the same seed gives the same bracket, and that a dry run records nothing."""
+    first = run_tournament("bracket", seed=5, record=False)
+    second = run_tournament("bracket", seed=5, record=False)
+
+    assert first["matches"] == 3
+    assert first["champion"] == second["champion"]
+    assert first["standings"] == second["standings"]
+    assert all(battles == 0 for battles, _ in stats_in_db(meals_db).values())
+
+def test_run_tournament_invalid_format(meals_db):
+    """Test error when running a tournament in an unknown format."""
+    with pytest.raises(ValueError, match="Invalid tournament format: swiss"):
+        run_tournament("swiss")
+
+def test_run_tournament_not_enough_meals(meals_db):
+    """Test error when fewer than two meals are active."""
+    with sqlite3.connect(meals_db) as conn:
+        conn.execute("UPDATE meals SET deleted = TRUE WHERE id > 1")
+
+    with pytest.raises(ValueError, match="at least two meals"):
+        run_tournament()
@@ -1,17 +1,67 @@
+import json
+import os
+from typing import Iterator
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, jsonify, make_response, Response, request, stream_with_context
+from flask.logging import default_handler
 
 from music_collection.models import song_model
-from music_collection.models.playlist_model import PlaylistModel
-from music_collection.utils.sql_utils import check_database_connection, check_table_exists
+from music_collection.models.play_counts import get_play_count_stats
+from music_collection.models.playlist_store import DEFAULT_PLAYLIST_ID, PlaylistStore
+from music_collection.utils.catalog_requests import (
+    BULK_FORMATS,
+    BULK_JSON_MAX_BYTES,
+    RequestError,
+    read_compound_key,
+    read_page,
+    read_song,
+    read_song_array,
+    read_sort_by_play_count
+)
+from music_collection.utils.ingest import iter_records
+from music_collection.utils.logger import configure_logger, get_logging_stats
+from music_collection.utils.migrations import check_schema
+from music_collection.utils.random_utils import get_random_source
+from music_collection.utils.sql_utils import check_database_connection, check_table_exists, get_pool_stats
 
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Apply any pending schema migrations, or refuse to start on an outdated schema
+check_schema()
+
 app = Flask(__name__)
+# Route logs through the shared background writer instead of Flask's own stderr handler
+app.logger.removeHandler(default_handler)
+configure_logger(app.logger)
+
+playlist_store = PlaylistStore()
+
+
+def _get_playlist_id() -> int:
+    """Returns the playlist a request acts on: ?playlist_id=, else playlist_id in the JSON body, else the default."""
+    playlist_id = request.args.get('playlist_id')
+    if playlist_id is None and request.is_json:
+        playlist_id = (request.get_json(silent=True) or {}).get('playlist_id')
+    if playlist_id is None:
+        return DEFAULT_PLAYLIST_ID
+    try:
+        return int(playlist_id)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid playlist id: {playlist_id}")
 
-playlist_model = PlaylistModel()
+def _ndjson_response(rows: Iterator[dict]) -> Response:
+    """Streams rows to the client as newline-delimited JSON while they are read from the database."""
+    def generate():
+        try:
+            for row in rows:
+                yield json.dumps(row) + '\n'
+        finally:
+            # Return the pooled connection even if the client disconnects mid-stream
+            rows.close()
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 
 ####################################################
@@ -53,6 +103,29 @@ def db_check() -> Response:
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Route to expose internal performance counters for monitoring.
+
+    Returns:
+        JSON response with the database connection pool, random source, play count, playlist, song cache and logging counters.
+    """
+    try:
+        app.logger.info("Collecting metrics")
+        return make_response(jsonify({
+            'status': 'success',
+            'db_pool': get_pool_stats(),
+            'random_source': get_random_source().stats(),
+            'play_counts': get_play_count_stats(),
+            'playlists': playlist_store.stats(),
+            'song_cache': song_model.song_cache.stats(),
+            'logging': get_logging_stats()
+        }), 200)
+    except Exception as e:
+        app.logger.error("Error collecting metrics: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 ##########################################################
 #
@@ -76,34 +149,66 @@ def add_song() -> Response:
         JSON response indicating the success of the song addition.
     Raises:
         400 error if input validation fails.
+        415 error if the body is not JSON.
         500 error if there is an issue adding the song to the playlist.
     """
     app.logger.info('Adding a new song to the catalog')
     try:
-        data = request.get_json()
-
-        artist = data.get('artist')
-        title = data.get('title')
-        year = data.get('year')
-        genre = data.get('genre')
-        duration = data.get('duration')
-
-        if not artist or not title or year is None or not genre or duration is None:
-            return make_response(jsonify({'error': 'Invalid input, all fields are required with valid values'}), 400)
+        song = read_song(request.mimetype, request.get_data())
 
         # Add the song to the playlist
-        app.logger.info('Adding song: %s - %s', artist, title)
-        song_model.create_song(artist=artist, title=title, year=year, genre=genre, duration=duration)
-        app.logger.info("Song added to playlist: %s - %s", artist, title)
-        return make_response(jsonify({'status': 'success', 'song': title}), 201)
+        app.logger.info('Adding song: %s - %s', song['artist'], song['title'])
+        song_model.create_song(**song)
+        app.logger.info("Song added to playlist: %s - %s", song['artist'], song['title'])
+        return make_response(jsonify({'status': 'success', 'song': song['title']}), 201)
+    except RequestError as e:
+        return make_response(jsonify({'error': str(e)}), e.status)
     except Exception as e:
         app.logger.error("Failed to add song: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/create-songs/bulk', methods=['POST'])
+def add_songs_bulk() -> Response:
+    """
+    Route to stream many songs into the catalog in chunked transactions.
+
+    Expected Input:
+        A CSV body (Content-Type text/csv) with a header row, NDJSON
+        (Content-Type application/x-ndjson) with one song object per line,
+        or a JSON array of song objects. Each song has the fields of /api/create-song.
+
+    Returns:
+        JSON response with the inserted, duplicate and invalid row counts and the throughput.
+    Raises:
+        400 error if the body format is not supported or cannot be parsed.
+        413 error if a JSON array body is over BULK_JSON_MAX_BYTES.
+        500 error if there is an issue adding the songs to the catalog.
+    """
+    app.logger.info('Importing songs in bulk')
+    try:
+        if request.mimetype in BULK_FORMATS:
+            records = iter_records(request.stream, BULK_FORMATS[request.mimetype])
+        else:
+            records = read_song_array(request.mimetype, request.stream.read(BULK_JSON_MAX_BYTES + 1))
+
+        result = song_model.create_songs_bulk(records)
+
+        app.logger.info("Bulk import added %d songs at %s rows/sec", result['inserted'], result['rows_per_sec'])
+        return make_response(jsonify({'status': 'success', **result}), 201)
+    except RequestError as e:
+        app.logger.error("Failed to parse bulk song import: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), e.status)
+    except ValueError as e:
+        app.logger.error("Failed to parse bulk song import: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to import songs: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/clear-catalog', methods=['DELETE'])
 def clear_catalog() -> Response:
     """
-    Route to clear the entire song catalog (recreates the table).
+    Route to clear the entire song catalog (deletes every song, keeping the schema).
 
     Returns:
         JSON response indicating success of the operation or error message.
@@ -113,7 +218,7 @@ def clear_catalog() -> Response:
         song_model.clear_catalog()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error clearing catalog: {e}")
+        app.logger.error("Error clearing catalog: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/delete-song/<int:song_id>', methods=['DELETE'])
@@ -128,11 +233,11 @@ def delete_song(song_id: int) -> Response:
         JSON response indicating success of the operation or error message.
     """
     try:
-        app.logger.info(f"Deleting song by ID: {song_id}")
+        app.logger.info("Deleting song by ID: %s", song_id)
         song_model.delete_song(song_id)
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error deleting song: {e}")
+        app.logger.error("Error deleting song: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -141,22 +246,47 @@ def get_all_songs() -> Response:
     """
     Route to retrieve all songs in the catalog (non-deleted), with an option to sort by play count.
 
+    Passing limit or cursor switches to keyset pagination: the response holds
+    at most limit songs plus a next_cursor to pass back for the following page
+    (null on the last page).
+
     Query Parameter:
         - sort_by_play_count (bool, optional): If true, sort songs by play count.
+        - limit (int, optional): The page size (default 100, at most 1000).
+        - cursor (str, optional): The next_cursor of the previous page.
+        - stream (str, optional): 'ndjson' to stream every song, one per line.
 
     Returns:
         JSON response with the list of songs or error message.
     """
     try:
         # Extract query parameter for sorting by play count
-        sort_by_play_count = request.args.get('sort_by_play_count', 'false').lower() == 'true'
+        sort_by_play_count = read_sort_by_play_count(request.args)
+
+        if request.args.get('stream') == 'ndjson':
+            app.logger.info("Streaming all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
+            return _ndjson_response(song_model.iter_all_songs(sort_by_play_count=sort_by_play_count))
+
+        page = read_page(request.args)
+        if page is not None:
+            try:
+                limit, cursor = page
+                app.logger.info("Retrieving a page of songs from the catalog, limit=%d, sort_by_play_count=%s",
+                                limit, sort_by_play_count)
+                songs, next_cursor = song_model.get_songs_page(limit=limit, cursor=cursor,
+                                                               sort_by_play_count=sort_by_play_count)
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+            return make_response(jsonify({'status': 'success', 'songs': songs, 'next_cursor': next_cursor}), 200)
 
         app.logger.info("Retrieving all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
         songs = song_model.get_all_songs(sort_by_play_count=sort_by_play_count)
 
         return make_response(jsonify({'status': 'success', 'songs': songs}), 200)
+    except RequestError as e:
+        return make_response(jsonify({'error': str(e)}), e.status)
     except Exception as e:
-        app.logger.error(f"Error retrieving songs: {e}")
+        app.logger.error("Error retrieving songs: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -172,11 +302,11 @@ def get_song_by_id(song_id: int) -> Response:
         JSON response with the song details or error message.
     """
     try:
-        app.logger.info(f"Retrieving song by ID: {song_id}")
+        app.logger.info("Retrieving song by ID: %s", song_id)
         song = song_model.get_song_by_id(song_id)
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving song by ID: {e}")
+        app.logger.error("Error retrieving song by ID: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-song-from-catalog-by-compound-key', methods=['GET'])
@@ -193,26 +323,16 @@ def get_song_by_compound_key() -> Response:
         JSON response with the song details or error message.
     """
     try:
-        # Extract query parameters from the request
-        artist = request.args.get('artist')
-        title = request.args.get('title')
-        year = request.args.get('year')
+        artist, title, year = read_compound_key(request.args)
 
-        if not artist or not title or not year:
-            return make_response(jsonify({'error': 'Missing required query parameters: artist, title, year'}), 400)
-
-        # Attempt to cast year to an integer
-        try:
-            year = int(year)
-        except ValueError:
-            return make_response(jsonify({'error': 'Year must be an integer'}), 400)
-
-        app.logger.info(f"Retrieving song by compound key: {artist}, {title}, {year}")
+        app.logger.info("Retrieving song by compound key: %s, %s, %s", artist, title, year)
         song = song_model.get_song_by_compound_key(artist, title, year)
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
 
+    except RequestError as e:
+        return make_response(jsonify({'error': str(e)}), e.status)
     except Exception as e:
-        app.logger.error(f"Error retrieving song by compound key: {e}")
+        app.logger.error("Error retrieving song by compound key: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-random-song', methods=['GET'])
@@ -228,7 +348,7 @@ def get_random_song() -> Response:
         song = song_model.get_random_song()
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving a random song: {e}")
+        app.logger.error("Error retrieving a random song: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -238,6 +358,63 @@ def get_random_song() -> Response:
 #
 ############################################################
 
+@app.route('/api/create-playlist', methods=['POST'])
+def create_playlist() -> Response:
+    """
+    Route to create a new, empty playlist.
+
+    Every playlist route acts on the playlist given by the playlist_id query
+    parameter or JSON field, and on the default playlist (ID 1) without one.
+
+    Expected JSON Input:
+        - name (str): The name of the playlist.
+
+    Returns:
+        JSON response with the ID of the new playlist or an error message.
+    Raises:
+        400 error if the name is missing.
+        500 error if there is an issue creating the playlist.
+    """
+    try:
+        data = request.get_json()
+        name = data.get('name')
+
+        app.logger.info("Creating playlist: %s", name)
+        playlist_id = playlist_store.create_playlist(name)
+
+        return make_response(jsonify({'status': 'success', 'playlist_id': playlist_id}), 201)
+    except ValueError as e:
+        app.logger.error("Error creating playlist: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Error creating playlist: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/delete-playlist/<int:playlist_id>', methods=['DELETE'])
+def delete_playlist(playlist_id: int) -> Response:
+    """
+    Route to delete a playlist and its entries. The default playlist cannot be deleted.
+
+    Path Parameter:
+        - playlist_id (int): The ID of the playlist to delete.
+
+    Returns:
+        JSON response indicating success of the deletion or an error message.
+    Raises:
+        400 error if the playlist does not exist or is the default playlist.
+        500 error if there is an issue deleting the playlist.
+    """
+    try:
+        app.logger.info("Deleting playlist by ID: %s", playlist_id)
+        playlist_store.delete_playlist(playlist_id)
+        return make_response(jsonify({'status': 'success', 'message': f'Playlist {playlist_id} deleted'}), 200)
+    except ValueError as e:
+        app.logger.error("Error deleting playlist: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Error deleting playlist: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/add-song-to-playlist', methods=['POST'])
 def add_song_to_playlist() -> Response:
     """
@@ -265,13 +442,14 @@ def add_song_to_playlist() -> Response:
         song = song_model.get_song_by_compound_key(artist, title, year)
 
         # Add song to playlist
-        playlist_model.add_song_to_playlist(song)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.add_song_to_playlist(song)
 
-        app.logger.info(f"Song added to playlist: {artist} - {title} ({year})")
+        app.logger.info("Song added to playlist: %s - %s (%s)", artist, title, year)
         return make_response(jsonify({'status': 'success', 'message': 'Song added to playlist'}), 201)
 
     except Exception as e:
-        app.logger.error(f"Error adding song to playlist: {e}")
+        app.logger.error("Error adding song to playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/remove-song-from-playlist', methods=['DELETE'])
@@ -301,13 +479,14 @@ def remove_song_by_song_id() -> Response:
         song = song_model.get_song_by_compound_key(artist, title, year)
 
         # Remove song from playlist
-        playlist_model.remove_song_by_song_id(song.id)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.remove_song_by_song_id(song.id)
 
-        app.logger.info(f"Song removed from playlist: {artist} - {title} ({year})")
+        app.logger.info("Song removed from playlist: %s - %s (%s)", artist, title, year)
         return make_response(jsonify({'status': 'success', 'message': 'Song removed from playlist'}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error removing song from playlist: {e}")
+        app.logger.error("Error removing song from playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/remove-song-from-playlist-by-track-number/<int:track_number>', methods=['DELETE'])
@@ -322,18 +501,19 @@ def remove_song_by_track_number(track_number: int) -> Response:
         JSON response indicating success of the removal or an error message.
     """
     try:
-        app.logger.info(f"Removing song from playlist by track number: {track_number}")
+        app.logger.info("Removing song from playlist by track number: %s", track_number)
 
         # Remove song by track number
-        playlist_model.remove_song_by_track_number(track_number)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.remove_song_by_track_number(track_number)
 
         return make_response(jsonify({'status': 'success', 'message': f'Song at track number {track_number} removed from playlist'}), 200)
 
     except ValueError as e:
-        app.logger.error(f"Error removing song by track number: {e}")
+        app.logger.error("Error removing song by track number: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 404)
     except Exception as e:
-        app.logger.error(f"Error removing song from playlist: {e}")
+        app.logger.error("Error removing song from playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/clear-playlist', methods=['POST'])
@@ -348,12 +528,13 @@ def clear_playlist() -> Response:
         app.logger.info('Clearing the playlist')
 
         # Clear the entire playlist
-        playlist_model.clear_playlist()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.clear_playlist()
 
         return make_response(jsonify({'status': 'success', 'message': 'Playlist cleared'}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error clearing the playlist: {e}")
+        app.logger.error("Error clearing the playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 ############################################################
@@ -374,8 +555,9 @@ def play_current_song() -> Response:
     """
     try:
         app.logger.info('Playing current song')
-        current_song = playlist_model.get_current_song()
-        playlist_model.play_current_song()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            current_song = playlist_model.get_current_song()
+            playlist_model.play_current_song()
 
         return make_response(jsonify({
             'status': 'success',
@@ -389,7 +571,7 @@ def play_current_song() -> Response:
             }
         }), 200)
     except Exception as e:
-        app.logger.error(f"Error playing current song: {e}")
+        app.logger.error("Error playing current song: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -405,10 +587,11 @@ def play_entire_playlist() -> Response:
     """
     try:
         app.logger.info('Playing entire playlist')
-        playlist_model.play_entire_playlist()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.play_entire_playlist()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error playing playlist: {e}")
+        app.logger.error("Error playing playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/play-rest-of-playlist', methods=['POST'])
@@ -423,10 +606,11 @@ def play_rest_of_playlist() -> Response:
     """
     try:
         app.logger.info('Playing rest of the playlist')
-        playlist_model.play_rest_of_playlist()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.play_rest_of_playlist()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error playing rest of the playlist: {e}")
+        app.logger.error("Error playing rest of the playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/rewind-playlist', methods=['POST'])
@@ -441,10 +625,11 @@ def rewind_playlist() -> Response:
     """
     try:
         app.logger.info('Rewinding playlist to the first song')
-        playlist_model.rewind_playlist()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.rewind_playlist()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error rewinding playlist: {e}")
+        app.logger.error("Error rewinding playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-all-songs-from-playlist', methods=['GET'])
@@ -459,12 +644,13 @@ def get_all_songs_from_playlist() -> Response:
         app.logger.info("Retrieving all songs from the playlist")
 
         # Get all songs from the playlist
-        songs = playlist_model.get_all_songs()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            songs = playlist_model.get_all_songs()
 
         return make_response(jsonify({'status': 'success', 'songs': songs}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error retrieving songs from playlist: {e}")
+        app.logger.error("Error retrieving songs from playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-song-from-playlist-by-track-number/<int:track_number>', methods=['GET'])
@@ -479,18 +665,19 @@ def get_song_by_track_number(track_number: int) -> Response:
         JSON response with the song details or error message.
     """
     try:
-        app.logger.info(f"Retrieving song from playlist by track number: {track_number}")
+        app.logger.info("Retrieving song from playlist by track number: %s", track_number)
 
         # Get the song by track number
-        song = playlist_model.get_song_by_track_number(track_number)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            song = playlist_model.get_song_by_track_number(track_number)
 
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
 
     except ValueError as e:
-        app.logger.error(f"Error retrieving song by track number: {e}")
+        app.logger.error("Error retrieving song by track number: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 404)
     except Exception as e:
-        app.logger.error(f"Error retrieving song from playlist: {e}")
+        app.logger.error("Error retrieving song from playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-current-song', methods=['GET'])
@@ -505,12 +692,13 @@ def get_current_song() -> Response:
         app.logger.info("Retrieving the current song from the playlist")
 
         # Get the current song
-        current_song = playlist_model.get_current_song()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            current_song = playlist_model.get_current_song()
 
         return make_response(jsonify({'status': 'success', 'current_song': current_song}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error retrieving current song: {e}")
+        app.logger.error("Error retrieving current song: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-playlist-length-duration', methods=['GET'])
@@ -525,8 +713,9 @@ def get_playlist_length_and_duration() -> Response:
         app.logger.info("Retrieving playlist length and total duration")
 
         # Get playlist length and duration
-        playlist_length = playlist_model.get_playlist_length()
-        playlist_duration = playlist_model.get_playlist_duration()
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_length = playlist_model.get_playlist_length()
+            playlist_duration = playlist_model.get_playlist_duration()
 
         return make_response(jsonify({
             'status': 'success',
@@ -535,7 +724,44 @@ def get_playlist_length_and_duration() -> Response:
         }), 200)
 
     except Exception as e:
-        app.logger.error(f"Error retrieving playlist length and duration: {e}")
+        app.logger.error("Error retrieving playlist length and duration: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/seek', methods=['GET'])
+def seek() -> Response:
+    """
+    Route to find which track is playing at a given time into the playlist.
+
+    Query Parameter:
+        - seconds (int): The playback time in seconds, counted from the start of the playlist.
+
+    Returns:
+        JSON response with the track number, the song and the offset into it in seconds.
+    Raises:
+        400 error if the time is missing, invalid or past the end of the playlist.
+        500 error if there is an issue seeking.
+    """
+    try:
+        seconds = request.args.get('seconds', type=int)
+        if seconds is None:
+            return make_response(jsonify({'error': 'seconds must be an integer'}), 400)
+
+        app.logger.info("Seeking to %s seconds into the playlist", seconds)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            track_number, offset = playlist_model.seek(seconds)
+            song = playlist_model.get_song_by_track_number(track_number)
+
+        return make_response(jsonify({
+            'status': 'success',
+            'track_number': track_number,
+            'song': song,
+            'offset': offset
+        }), 200)
+    except ValueError as e:
+        app.logger.error("Error seeking to %s seconds: %s", request.args.get('seconds'), str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Error seeking: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/go-to-track-number/<int:track_number>', methods=['POST'])
@@ -550,17 +776,18 @@ def go_to_track_number(track_number: int) -> Response:
         JSON response indicating success or an error message.
     """
     try:
-        app.logger.info(f"Going to track number: {track_number}")
+        app.logger.info("Going to track number: %s", track_number)
 
         # Set the playlist to start at the given track number
-        playlist_model.go_to_track_number(track_number)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.go_to_track_number(track_number)
 
         return make_response(jsonify({'status': 'success', 'track_number': track_number}), 200)
     except ValueError as e:
-        app.logger.error(f"Error going to track number {track_number}: {e}")
+        app.logger.error("Error going to track number %s: %s", track_number, str(e))
         return make_response(jsonify({'error': str(e)}), 400)
     except Exception as e:
-        app.logger.error(f"Error going to track number: {e}")
+        app.logger.error("Error going to track number: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 ############################################################
@@ -589,15 +816,16 @@ def move_song_to_beginning() -> Response:
         title = data.get('title')
         year = data.get('year')
 
-        app.logger.info(f"Moving song to beginning: {artist} - {title} ({year})")
+        app.logger.info("Moving song to beginning: %s - %s (%s)", artist, title, year)
 
         # Retrieve song by compound key and move it to the beginning
         song = song_model.get_song_by_compound_key(artist, title, year)
-        playlist_model.move_song_to_beginning(song.id)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.move_song_to_beginning(song.id)
 
         return make_response(jsonify({'status': 'success', 'song': f'{artist} - {title}'}), 200)
     except Exception as e:
-        app.logger.error(f"Error moving song to beginning: {e}")
+        app.logger.error("Error moving song to beginning: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/move-song-to-end', methods=['POST'])
@@ -620,15 +848,16 @@ def move_song_to_end() -> Response:
         title = data.get('title')
         year = data.get('year')
 
-        app.logger.info(f"Moving song to end: {artist} - {title} ({year})")
+        app.logger.info("Moving song to end: %s - %s (%s)", artist, title, year)
 
         # Retrieve song by compound key and move it to the end
         song = song_model.get_song_by_compound_key(artist, title, year)
-        playlist_model.move_song_to_end(song.id)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.move_song_to_end(song.id)
 
         return make_response(jsonify({'status': 'success', 'song': f'{artist} - {title}'}), 200)
     except Exception as e:
-        app.logger.error(f"Error moving song to end: {e}")
+        app.logger.error("Error moving song to end: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/move-song-to-track-number', methods=['POST'])
@@ -653,15 +882,16 @@ def move_song_to_track_number() -> Response:
         year = data.get('year')
         track_number = data.get('track_number')
 
-        app.logger.info(f"Moving song to track number {track_number}: {artist} - {title} ({year})")
+        app.logger.info("Moving song to track number %s: %s - %s (%s)", track_number, artist, title, year)
 
         # Retrieve song by compound key and move it to the specified track number
         song = song_model.get_song_by_compound_key(artist, title, year)
-        playlist_model.move_song_to_track_number(song.id, track_number)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            playlist_model.move_song_to_track_number(song.id, track_number)
 
         return make_response(jsonify({'status': 'success', 'song': f'{artist} - {title}', 'track_number': track_number}), 200)
     except Exception as e:
-        app.logger.error(f"Error moving song to track number: {e}")
+        app.logger.error("Error moving song to track number: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/swap-songs-in-playlist', methods=['POST'])
@@ -682,12 +912,13 @@ def swap_songs_in_playlist() -> Response:
         track_number_1 = data.get('track_number_1')
         track_number_2 = data.get('track_number_2')
 
-        app.logger.info(f"Swapping songs at track numbers {track_number_1} and {track_number_2}")
+        app.logger.info("Swapping songs at track numbers %s and %s", track_number_1, track_number_2)
 
         # Retrieve songs by track numbers and swap them
-        song_1 = playlist_model.get_song_by_track_number(track_number_1)
-        song_2 = playlist_model.get_song_by_track_number(track_number_2)
-        playlist_model.swap_songs_in_playlist(song_1.id, song_2.id)
+        with playlist_store.checkout(_get_playlist_id()) as playlist_model:
+            song_1 = playlist_model.get_song_by_track_number(track_number_1)
+            song_2 = playlist_model.get_song_by_track_number(track_number_2)
+            playlist_model.swap_songs_in_playlist(song_1.id, song_2.id)
 
         return make_response(jsonify({
             'status': 'success',
@@ -697,7 +928,7 @@ def swap_songs_in_playlist() -> Response:
             }
         }), 200)
     except Exception as e:
-        app.logger.error(f"Error swapping songs in playlist: {e}")
+        app.logger.error("Error swapping songs in playlist: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 ############################################################
@@ -721,9 +952,10 @@ def get_song_leaderboard() -> Response:
         leaderboard_data = song_model.get_all_songs(sort_by_play_count=True)
         return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
     except Exception as e:
-        app.logger.error(f"Error generating leaderboard: {e}")
+        app.logger.error("Error generating leaderboard: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
+    app.run(debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true', host='0.0.0.0', port=5000)
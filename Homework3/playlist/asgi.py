@@ -0,0 +1,324 @@
+"""
+The song catalog API as an asyncio (ASGI) app on Starlette, for many concurrent slow requests per process.
+
+Serve it with any ASGI server, e.g.:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 4
+
+The routes behave like the catalog routes of app.py and return the same JSON;
+both parse requests with music_collection.utils.catalog_requests. While a
+request waits on SQLite (on the database executor) or on random.org (with
+httpx), it holds no thread, so one process can keep thousands of requests in
+flight. The playlist routes are served by app.py only.
+"""
+from contextlib import asynccontextmanager
+from dataclasses import asdict, is_dataclass
+import json
+import logging
+from typing import Any, AsyncIterator
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from music_collection.models import async_song_model, song_model
+from music_collection.models.play_counts import get_play_count_stats
+from music_collection.utils.catalog_requests import (
+    BULK_FORMATS,
+    BULK_JSON_MAX_BYTES,
+    RequestError,
+    read_compound_key,
+    read_page,
+    read_song,
+    read_song_array,
+    read_sort_by_play_count
+)
+from music_collection.utils.db_executor import get_db_executor_stats, run_db, shutdown_db_executor
+from music_collection.utils.logger import configure_logger, get_logging_stats
+from music_collection.utils.migrations import check_schema
+from music_collection.utils.random_utils import close_async_client, get_random_source
+from music_collection.utils.sql_utils import check_database_connection, check_table_exists, close_pool, get_pool_stats
+
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Apply any pending schema migrations, or refuse to start on an outdated schema
+check_schema()
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+# Songs per database round trip when streaming the catalog as NDJSON
+STREAM_PAGE_SIZE = song_model.CATALOG_PAGE_MAX_LIMIT
+
+
+def _to_json(value: Any) -> Any:
+    if is_dataclass(value):
+        return asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FlaskJSONResponse(JSONResponse):
+    """Serializes the way Flask's jsonify() does outside debug mode: sorted keys, compact, dataclasses as objects."""
+
+    def render(self, content: Any) -> bytes:
+        return (json.dumps(content, default=_to_json, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+def jsonify(data: Any, status: int = 200) -> Response:
+    return FlaskJSONResponse(data, status)
+
+def _mimetype(request: Request) -> str:
+    """Returns the Content-Type without its parameters, like Flask's request.mimetype."""
+    return request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """Reads the body until it ends or is longer than limit bytes."""
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            break
+    return bytes(body)
+
+
+####################################################
+#
+# Healthchecks
+#
+####################################################
+
+async def healthcheck(request: Request) -> Response:
+    """Health check route to verify the service is running."""
+    logger.info('Health check')
+    return jsonify({'status': 'healthy'}, 200)
+
+async def db_check(request: Request) -> Response:
+    """Route to check if the database connection and songs table are functional."""
+    try:
+        logger.info("Checking database connection and songs table...")
+        await run_db(check_database_connection)
+        await run_db(check_table_exists, "songs")
+        return jsonify({'database_status': 'healthy'}, 200)
+    except Exception as e:
+        return jsonify({'error': str(e)}, 404)
+
+async def metrics(request: Request) -> Response:
+    """Route to expose the connection pool, database executor, random source, play count, song cache and logging counters."""
+    try:
+        logger.info("Collecting metrics")
+        return jsonify({
+            'status': 'success',
+            'db_pool': get_pool_stats(),
+            'db_executor': get_db_executor_stats(),
+            'random_source': get_random_source().stats(),
+            'play_counts': get_play_count_stats(),
+            'song_cache': song_model.song_cache.stats(),
+            'logging': get_logging_stats()
+        }, 200)
+    except Exception as e:
+        logger.error("Error collecting metrics: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+
+##########################################################
+#
+# Song Management
+#
+##########################################################
+
+async def add_song(request: Request) -> Response:
+    """Route to add a new song to the catalog; see app.add_song()."""
+    logger.info('Adding a new song to the catalog')
+    try:
+        song = read_song(_mimetype(request), await request.body())
+
+        logger.info('Adding song: %s - %s', song['artist'], song['title'])
+        await async_song_model.create_song(**song)
+        logger.info("Song added to catalog: %s - %s", song['artist'], song['title'])
+        return jsonify({'status': 'success', 'song': song['title']}, 201)
+    except RequestError as e:
+        return jsonify({'error': str(e)}, e.status)
+    except Exception as e:
+        logger.error("Failed to add song: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def add_songs_bulk(request: Request) -> Response:
+    """
+    Route to import many songs from CSV, NDJSON or a JSON array; see app.add_songs_bulk().
+
+    CSV and NDJSON are parsed and inserted on the database executor while the
+    body is still arriving, so the upload is never held whole.
+    """
+    logger.info('Importing songs in bulk')
+    try:
+        mimetype = _mimetype(request)
+        if mimetype in BULK_FORMATS:
+            result = await async_song_model.create_songs_bulk_from_stream(request.stream(), BULK_FORMATS[mimetype])
+        else:
+            records = read_song_array(mimetype, await _read_body(request, BULK_JSON_MAX_BYTES))
+            result = await async_song_model.create_songs_bulk(records)
+
+        logger.info("Bulk import added %d songs at %s rows/sec", result['inserted'], result['rows_per_sec'])
+        return jsonify({'status': 'success', **result}, 201)
+    except RequestError as e:
+        logger.error("Failed to parse bulk song import: %s", str(e))
+        return jsonify({'error': str(e)}, e.status)
+    except ValueError as e:
+        logger.error("Failed to parse bulk song import: %s", str(e))
+        return jsonify({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Failed to import songs: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def clear_catalog(request: Request) -> Response:
+    """Route to clear the entire song catalog."""
+    try:
+        logger.info("Clearing the song catalog")
+        await async_song_model.clear_catalog()
+        return jsonify({'status': 'success'}, 200)
+    except Exception as e:
+        logger.error("Error clearing catalog: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def delete_song(request: Request) -> Response:
+    """Route to delete a song by its ID (soft delete)."""
+    song_id = request.path_params['song_id']
+    try:
+        logger.info("Deleting song by ID: %s", song_id)
+        await async_song_model.delete_song(song_id)
+        return jsonify({'status': 'success'}, 200)
+    except Exception as e:
+        logger.error("Error deleting song: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def _stream_catalog(sort_by_play_count: bool) -> AsyncIterator[bytes]:
+    """Yields every song as NDJSON, one keyset page per database round trip."""
+    cursor = None
+    while True:
+        songs, cursor = await async_song_model.get_songs_page(limit=STREAM_PAGE_SIZE, cursor=cursor,
+                                                              sort_by_play_count=sort_by_play_count)
+        if songs:
+            yield "".join(json.dumps(song) + "\n" for song in songs).encode("utf-8")
+        if cursor is None:
+            return
+
+async def get_all_songs(request: Request) -> Response:
+    """
+    Route to retrieve all songs in the catalog, or one page with limit/cursor; see app.get_all_songs().
+
+    With stream=ndjson the songs are sent a page at a time, so no database
+    thread or connection is held while the client reads.
+    """
+    try:
+        sort_by_play_count = read_sort_by_play_count(request.query_params)
+
+        if request.query_params.get('stream') == 'ndjson':
+            logger.info("Streaming all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
+            return StreamingResponse(_stream_catalog(sort_by_play_count), 200, media_type='application/x-ndjson')
+
+        page = read_page(request.query_params)
+        if page is not None:
+            try:
+                limit, cursor = page
+                logger.info("Retrieving a page of songs from the catalog, limit=%d, sort_by_play_count=%s",
+                            limit, sort_by_play_count)
+                songs, next_cursor = await async_song_model.get_songs_page(limit=limit, cursor=cursor,
+                                                                           sort_by_play_count=sort_by_play_count)
+            except ValueError as e:
+                return jsonify({'error': str(e)}, 400)
+            return jsonify({'status': 'success', 'songs': songs, 'next_cursor': next_cursor}, 200)
+
+        logger.info("Retrieving all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
+        songs = await async_song_model.get_all_songs(sort_by_play_count=sort_by_play_count)
+        return jsonify({'status': 'success', 'songs': songs}, 200)
+    except RequestError as e:
+        return jsonify({'error': str(e)}, e.status)
+    except Exception as e:
+        logger.error("Error retrieving songs: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def get_song_by_id(request: Request) -> Response:
+    """Route to retrieve a song by its ID."""
+    song_id = request.path_params['song_id']
+    try:
+        logger.info("Retrieving song by ID: %s", song_id)
+        song = await async_song_model.get_song_by_id(song_id)
+        return jsonify({'status': 'success', 'song': song}, 200)
+    except Exception as e:
+        logger.error("Error retrieving song by ID: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def get_song_by_compound_key(request: Request) -> Response:
+    """Route to retrieve a song by its compound key (artist, title, year)."""
+    try:
+        artist, title, year = read_compound_key(request.query_params)
+
+        logger.info("Retrieving song by compound key: %s, %s, %s", artist, title, year)
+        song = await async_song_model.get_song_by_compound_key(artist, title, year)
+        return jsonify({'status': 'success', 'song': song}, 200)
+    except RequestError as e:
+        return jsonify({'error': str(e)}, e.status)
+    except Exception as e:
+        logger.error("Error retrieving song by compound key: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def get_random_song(request: Request) -> Response:
+    """Route to retrieve a random song from the catalog."""
+    try:
+        logger.info("Retrieving a random song from the catalog")
+        song = await async_song_model.get_random_song()
+        return jsonify({'status': 'success', 'song': song}, 200)
+    except Exception as e:
+        logger.error("Error retrieving a random song: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+async def get_song_leaderboard(request: Request) -> Response:
+    """Route to get a list of all songs sorted by play count."""
+    try:
+        logger.info("Generating song leaderboard sorted")
+        leaderboard_data = await async_song_model.get_all_songs(sort_by_play_count=True)
+        return jsonify({'status': 'success', 'leaderboard': leaderboard_data}, 200)
+    except Exception as e:
+        logger.error("Error generating leaderboard: %s", str(e))
+        return jsonify({'error': str(e)}, 500)
+
+
+############################################################
+#
+# App
+#
+############################################################
+
+async def http_error(request: Request, exc: HTTPException) -> Response:
+    """Answers unknown paths and methods with a JSON error, like the routes do."""
+    return jsonify({'error': exc.detail}, exc.status_code)
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    yield
+    await close_async_client()
+    # Let queued database calls finish, then close the pooled connections
+    shutdown_db_executor()
+    close_pool()
+
+app = Starlette(
+    routes=[
+        Route('/api/health', healthcheck, methods=['GET']),
+        Route('/api/db-check', db_check, methods=['GET']),
+        Route('/api/metrics', metrics, methods=['GET']),
+        Route('/api/create-song', add_song, methods=['POST']),
+        Route('/api/create-songs/bulk', add_songs_bulk, methods=['POST']),
+        Route('/api/clear-catalog', clear_catalog, methods=['DELETE']),
+        Route('/api/delete-song/{song_id:int}', delete_song, methods=['DELETE']),
+        Route('/api/get-all-songs-from-catalog', get_all_songs, methods=['GET']),
+        Route('/api/get-song-from-catalog-by-id/{song_id:int}', get_song_by_id, methods=['GET']),
+        Route('/api/get-song-from-catalog-by-compound-key', get_song_by_compound_key, methods=['GET']),
+        Route('/api/get-random-song', get_random_song, methods=['GET']),
+        Route('/api/song-leaderboard', get_song_leaderboard, methods=['GET']),
+    ],
+    exception_handlers={404: http_error, 405: http_error},
+    lifespan=lifespan,
+)
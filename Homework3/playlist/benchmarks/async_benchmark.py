@@ -0,0 +1,82 @@
+"""
+Benchmark concurrent random song requests against a slow random.org: worker threads versus asyncio.
+
+Run from the playlist directory:
+
+    python -m benchmarks.async_benchmark --requests 2000 --delay 0.05 --threads 32
+
+Every request picks a random song with the random_org source, so it waits
+--delay seconds on a local random.org stub. "threads" runs
+song_model.get_random_song() on --threads worker threads, the way a threaded
+WSGI worker does; "asyncio" runs async_song_model.get_random_song() for every
+request at once in one thread, with the database calls on the database
+executor.
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from unittest import mock
+
+from music_collection.models import async_song_model, song_model
+from music_collection.utils import random_utils
+from music_collection.utils.db_executor import shutdown_db_executor
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.random_stub import RandomStubServer
+from music_collection.utils.random_utils import RandomOrgSource, set_random_source
+from music_collection.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+def bench(mode: str, args: argparse.Namespace) -> dict:
+    start = time.perf_counter()
+    if mode == "threads":
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            songs = list(executor.map(lambda _: song_model.get_random_song(), range(args.requests)))
+    else:
+        async def run():
+            return await asyncio.gather(*(async_song_model.get_random_song() for _ in range(args.requests)))
+        songs = asyncio.run(run())
+        shutdown_db_executor()
+    elapsed = time.perf_counter() - start
+
+    assert len(songs) == args.requests
+    return {"mode": mode, "requests/s": args.requests / elapsed, "elapsed": elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--songs", type=int, default=1000)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds random.org takes to answer")
+    parser.add_argument("--threads", type=int, default=32, help="Worker threads in threads mode")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    stub = RandomStubServer(delay=args.delay).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "song_catalog.db")
+        with sqlite3.connect(db_path) as conn:
+            apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+            conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, ?, ?, ?, ?)",
+                             [("Artist", f"Song {i}", 2000, "Pop", 180) for i in range(args.songs)])
+        pool = ConnectionPool(db_path, max_size=args.threads)
+        set_random_source(RandomOrgSource())
+
+        print(f"{'mode':<8} {'requests/s':>12} {'elapsed s':>10}")
+        with mock.patch.object(song_model, "get_db_connection", pool.checkout), \
+                mock.patch.object(random_utils, "RANDOM_ORG_URL", stub.url):
+            for mode in ("threads", "asyncio"):
+                result = bench(mode, args)
+                print(f"{result['mode']:<8} {result['requests/s']:>12.0f} {result['elapsed']:>10.2f}")
+        pool.close()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark update_play_count() with immediate and buffered durability.
+
+Run from the playlist directory:
+
+    python -m benchmarks.play_count_benchmark --plays 20000 --songs 100 --threads 4
+
+Each thread plays random songs through song_model.update_play_count(), the
+way PlaylistModel does. In buffered mode the time includes the final flush.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from music_collection.models import play_counts, song_model
+from music_collection.models.play_counts import PLAY_COUNT_DURABILITY_MODES, PlayCountAggregator
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.sql_utils import PRAGMA_PROFILES, ConnectionPool, get_pragma_profile
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+def bench_mode(mode: str, profile: str, plays: int, songs: int, threads: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "song_catalog.db")
+        with sqlite3.connect(db_path) as conn:
+            apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+            conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, ?, ?, ?, ?)",
+                             [("Artist", f"Song {i}", 2000, "Pop", 180) for i in range(songs)])
+
+        pool = ConnectionPool(db_path, max_size=threads, pragmas=get_pragma_profile(profile))
+        aggregator = PlayCountAggregator(play_counts.PLAY_COUNT_FLUSH_SIZE, play_counts.PLAY_COUNT_FLUSH_INTERVAL)
+        per_thread = plays // threads
+
+        def play(index):
+            rng = random.Random(index)
+            for _ in range(per_thread):
+                song_model.update_play_count(rng.randint(1, songs))
+
+        with mock.patch.object(song_model, "get_db_connection", pool.checkout), \
+                mock.patch.object(play_counts, "get_db_connection", pool.checkout), \
+                mock.patch.object(song_model, "PLAY_COUNT_DURABILITY", mode), \
+                mock.patch.object(play_counts, "_aggregator", aggregator):
+            workers = [threading.Thread(target=play, args=(i,)) for i in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            aggregator.close()
+            elapsed = time.perf_counter() - start
+
+        with sqlite3.connect(db_path) as conn:
+            written = conn.execute("SELECT SUM(play_count) FROM songs").fetchone()[0]
+        pool.close()
+
+    return {
+        "mode": mode,
+        "plays/s": per_thread * threads / elapsed,
+        "commits": aggregator.stats()["flushes"] if mode == "buffered" else per_thread * threads,
+        "written": written,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plays", type=int, default=20000)
+    parser.add_argument("--songs", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--profile", default="durable", choices=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'mode':<10} {'plays/s':>12} {'commits':>10} {'written':>10}")
+    for mode in PLAY_COUNT_DURABILITY_MODES:
+        result = bench_mode(mode, args.profile, args.plays, args.songs, args.threads)
+        print(f"{result['mode']:<10} {result['plays/s']:>12.0f} {result['commits']:>10} {result['written']:>10}")
+
+
+if __name__ == "__main__":
+    main()
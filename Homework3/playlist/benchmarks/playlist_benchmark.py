@@ -0,0 +1,101 @@
+"""
+Benchmark PlaylistModel operations on large playlists.
+
+Run from the playlist directory:
+
+    python -m benchmarks.playlist_benchmark --sizes 1000 10000 100000
+
+Each operation runs on random songs (or track numbers) of a playlist of each
+size and is reported in microseconds per call. The "list" rows time the
+linear scans and list.remove + list.insert shifts PlaylistModel used on a
+plain list, and the sums it used for durations, before its tracks were
+kept in an indexed TrackList.
+"""
+import argparse
+import logging
+import random
+import time
+
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_model import Song
+
+
+def build_playlist(size: int) -> PlaylistModel:
+    playlist_model = PlaylistModel()
+    playlist_model.playlist.extend(
+        Song(id=i, artist=f"Artist {i % 100}", title=f"Song {i}", year=2000, genre="Pop", duration=120 + i % 240)
+        for i in range(1, size + 1)
+    )
+    return playlist_model
+
+def list_contains(songs: list[Song], song_id: int) -> bool:
+    return song_id in [song.id for song in songs]
+
+def list_get(songs: list[Song], song_id: int) -> Song:
+    return next(song for song in songs if song.id == song_id)
+
+def list_move(songs: list[Song], song_id: int) -> None:
+    # move_song_to_track_number() on a plain list, to track number song_id
+    song = list_get(songs, song_id)
+    songs.remove(song)
+    songs.insert(song_id - 1, song)
+
+OPERATIONS = {
+    "validate_song_id": lambda model, song_id: model.validate_song_id(song_id),
+    "get_song_by_song_id": lambda model, song_id: model.get_song_by_song_id(song_id),
+    "get_song_by_track": lambda model, track: model.get_song_by_track_number(track),
+    "move_to_track_number": lambda model, song_id: model.move_song_to_track_number(song_id, song_id),
+    "move_to_beginning": lambda model, song_id: model.move_song_to_beginning(song_id),
+    "remove_and_re_add": lambda model, track: model.add_song_to_playlist(model.playlist.pop(track - 1)),
+    "get_playlist_duration": lambda model, _: model.get_playlist_duration(),
+    "get_track_start_time": lambda model, track: model.get_track_start_time(track),
+    "seek": lambda model, track: model.seek(track * 120),
+}
+def list_start_time(songs: list[Song], track: int) -> int:
+    return sum(song.duration for song in songs[:track - 1])
+
+LIST_OPERATIONS = {
+    "list contains": list_contains,
+    "list get": list_get,
+    "list move": list_move,
+    "list duration": lambda songs, _: sum(song.duration for song in songs),
+    "list start time": list_start_time,
+}
+
+def bench(size: int, calls: int, seed: int = 0) -> dict[str, float]:
+    playlist_model = build_playlist(size)
+    rng = random.Random(seed)
+    song_ids = [rng.randint(1, size) for _ in range(calls)]
+
+    results = {}
+    for name, operation in OPERATIONS.items():
+        start = time.perf_counter()
+        for song_id in song_ids:
+            operation(playlist_model, song_id)
+        results[name] = (time.perf_counter() - start) / len(song_ids) * 1e6
+
+    # The list operations are slow on big playlists, so they get fewer calls
+    songs = list(playlist_model.playlist)
+    sample = song_ids[:max(1, calls // 100)]
+    for name, operation in LIST_OPERATIONS.items():
+        start = time.perf_counter()
+        for song_id in sample:
+            operation(songs, song_id)
+        results[name] = (time.perf_counter() - start) / len(sample) * 1e6
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = {size: bench(size, args.calls) for size in args.sizes}
+    print(f"{'operation (us/call)':<22}" + "".join(f"{size:>12}" for size in args.sizes))
+    for name in [*OPERATIONS, *LIST_OPERATIONS]:
+        print(f"{name:<22}" + "".join(f"{results[size][name]:>12.2f}" for size in args.sizes))
+
+
+if __name__ == "__main__":
+    main()
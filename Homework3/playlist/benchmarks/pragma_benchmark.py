@@ -0,0 +1,108 @@
+"""
+Benchmark read/write throughput on the songs table for each PRAGMA profile.
+
+Run from the playlist directory:
+
+    python -m benchmarks.pragma_benchmark --rows 5000 --threads 4
+
+Every write mirrors create_song()/update_play_count(): one statement and one
+commit per call, issued concurrently from several threads through the pool.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.sql_utils import PRAGMA_PROFILES, ConnectionPool, get_pragma_profile
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+def run_threads(threads: int, work) -> tuple[float, int]:
+    """Runs work(thread_index) on several threads and returns (elapsed seconds, error count)."""
+    errors = []
+
+    def target(index):
+        try:
+            work(index)
+        except sqlite3.OperationalError as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start, len(errors)
+
+def bench_profile(profile: str, rows: int, threads: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "song_catalog.db")
+        with sqlite3.connect(db_path) as conn:
+            apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+
+        pool = ConnectionPool(db_path, max_size=threads, pragmas=get_pragma_profile(profile))
+        per_thread = rows // threads
+
+        def insert(index):
+            for i in range(per_thread):
+                with pool.checkout() as conn:
+                    conn.execute(
+                        "INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, ?, ?, ?, ?)",
+                        (f"Artist {index}", f"Song {i}", 2000 + i % 20, "Pop", 180 + i % 60),
+                    )
+                    conn.commit()
+
+        def play(index):
+            rng = random.Random(index)
+            for _ in range(per_thread):
+                with pool.checkout() as conn:
+                    conn.execute("UPDATE songs SET play_count = play_count + 1 WHERE id = ?",
+                                 (rng.randint(1, per_thread * threads),))
+                    conn.commit()
+
+        def read(index):
+            rng = random.Random(index)
+            for _ in range(per_thread * 4):
+                with pool.checkout() as conn:
+                    conn.execute("SELECT id, artist, title, year, genre, duration, deleted FROM songs WHERE id = ?",
+                                 (rng.randint(1, per_thread * threads),)).fetchone()
+
+        insert_time, insert_errors = run_threads(threads, insert)
+        update_time, update_errors = run_threads(threads, play)
+        read_time, read_errors = run_threads(threads, read)
+        pool.close()
+
+    total = per_thread * threads
+    return {
+        "profile": profile,
+        "inserts/s": total / insert_time,
+        "updates/s": total / update_time,
+        "reads/s": total * 4 / read_time,
+        "errors": insert_errors + update_errors + read_errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--profiles", nargs="+", default=list(PRAGMA_PROFILES), choices=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'profile':<10} {'inserts/s':>12} {'updates/s':>12} {'reads/s':>12} {'errors':>8}")
+    for profile in args.profiles:
+        result = bench_profile(profile, args.rows, args.threads)
+        print(f"{result['profile']:<10} {result['inserts/s']:>12.0f} {result['updates/s']:>12.0f} "
+              f"{result['reads/s']:>12.0f} {result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for the production server, used by entrypoint.sh when APP_ENV=production.
+
+Each worker process imports app.py on its own, so it opens its own connection
+pool after the fork. Playlists live in the database and are version checked,
+so any worker can serve any request for any playlist.
+"""
+import multiprocessing
+import os
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+# Threads per worker, so requests waiting on SQLite or random.org do not hold up the rest
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# Seconds before a stuck worker is restarted
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+# Workers are forked from this process, so they inherit the setting
+from music_collection.utils.logger import LOG_LEAN_RECORDS, skip_unused_record_fields
+if LOG_LEAN_RECORDS:
+    skip_unused_record_fields()
+
+
+def worker_exit(server, worker):
+    # Write the worker's buffered play counts and close its pooled connections before it goes
+    from music_collection.models.play_counts import flush_play_counts
+    from music_collection.utils.sql_utils import close_pool
+    flush_play_counts()
+    close_pool()
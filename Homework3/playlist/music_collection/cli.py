@@ -0,0 +1,54 @@
+"""
+Command line tools for the song catalog.
+
+Run from the playlist directory with DB_PATH pointing at the catalog:
+
+    python -m music_collection.cli import-songs songs.csv
+    python -m music_collection.cli import-songs - --format ndjson < songs.ndjson
+"""
+import argparse
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+
+def import_songs(args: argparse.Namespace) -> int:
+    # Imported here so DB_PATH from .env is set before sql_utils reads it
+    from music_collection.models import song_model
+    from music_collection.utils.ingest import iter_records
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv"
+
+    if args.path == "-":
+        result = song_model.create_songs_bulk(iter_records(sys.stdin, fmt), chunk_size=args.chunk_size)
+    else:
+        with open(args.path, encoding="utf-8", newline="") as fh:
+            result = song_model.create_songs_bulk(iter_records(fh, fmt), chunk_size=args.chunk_size)
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+def main(argv=None) -> int:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(prog="music_collection.cli", description="Song catalog tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    importer = subcommands.add_parser("import-songs", help="Stream songs from a CSV or NDJSON file into the catalog")
+    importer.add_argument("path", help="The file to import, or - for stdin")
+    importer.add_argument("--format", choices=["csv", "ndjson"],
+                          help="The file format (default: from the file extension, else csv)")
+    importer.add_argument("--chunk-size", type=int, default=int(os.getenv("SONG_BULK_CHUNK_SIZE", "5000")),
+                          help="Rows per transaction")
+    importer.set_defaults(handler=import_songs)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
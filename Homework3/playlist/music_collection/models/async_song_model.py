@@ -0,0 +1,114 @@
+"""
+Awaitable versions of the song_model functions, for the asyncio app in asgi.py.
+
+Each one runs its song_model counterpart on the database executor, so the
+event loop never blocks on SQLite. get_random_song() also draws its random
+numbers with get_random_int_async(), between queries, so waiting for
+random.org holds neither a database thread nor a connection.
+"""
+import asyncio
+import io
+import logging
+from typing import Any, AsyncIterable, Optional
+
+from music_collection.models import song_model
+from music_collection.models.song_model import Song
+from music_collection.utils.db_executor import run_db
+from music_collection.utils.ingest import AsyncChunkReader, iter_records
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.random_utils import get_random_int_async
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+async def create_song(artist: str, title: str, year: int, genre: str, duration: int) -> None:
+    await run_db(song_model.create_song, artist=artist, title=title, year=year, genre=genre, duration=duration)
+
+async def create_songs_bulk(records: list[Any]) -> dict[str, Any]:
+    return await run_db(song_model.create_songs_bulk, records)
+
+async def create_songs_bulk_from_stream(chunks: AsyncIterable[bytes], fmt: str) -> dict[str, Any]:
+    """
+    Imports songs from a CSV or NDJSON upload while it is still being received.
+
+    The chunks are read on the event loop and handed through a bounded
+    AsyncChunkReader to song_model.create_songs_bulk() on the database
+    executor, which parses them as they arrive. Neither side holds more than
+    a few chunks and one batch of rows.
+
+    Args:
+        chunks (AsyncIterable[bytes]): The request body, e.g. Starlette's request.stream().
+        fmt (str): "csv" or "ndjson".
+
+    Raises:
+        ValueError: If the format is not supported or the CSV header is invalid.
+        Exception: Whatever reading the body raises, e.g. if the client disconnects.
+    """
+    reader = AsyncChunkReader(asyncio.get_running_loop())
+    records = iter_records(io.BufferedReader(reader), fmt)
+    feeding = asyncio.create_task(reader.feed(chunks))
+    try:
+        return await run_db(song_model.create_songs_bulk, records)
+    finally:
+        # The import may stop early, e.g. on a bad CSV header, before the body is read;
+        # if this task is cancelled instead, the import must not wait for more chunks
+        feeding.cancel()
+        reader.abort()
+
+async def clear_catalog() -> None:
+    await run_db(song_model.clear_catalog)
+
+async def delete_song(song_id: int) -> None:
+    await run_db(song_model.delete_song, song_id)
+
+async def get_song_by_id(song_id: int) -> Song:
+    # Cached songs are returned without a trip to the executor
+    song = song_model.song_cache.get(("id", song_id))
+    if song is not None:
+        return song
+    return await run_db(song_model.get_song_by_id, song_id)
+
+async def get_song_by_compound_key(artist: str, title: str, year: int) -> Song:
+    song = song_model.song_cache.get(("key", artist, title, year))
+    if song is not None:
+        return song
+    return await run_db(song_model.get_song_by_compound_key, artist, title, year)
+
+async def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
+    return await run_db(song_model.get_all_songs, sort_by_play_count=sort_by_play_count)
+
+async def get_songs_page(limit: int = song_model.CATALOG_PAGE_DEFAULT_LIMIT, cursor: Optional[str] = None,
+                         sort_by_play_count: bool = False) -> tuple[list[dict], Optional[str]]:
+    return await run_db(song_model.get_songs_page, limit=limit, cursor=cursor, sort_by_play_count=sort_by_play_count)
+
+async def get_random_song() -> Song:
+    """
+    Retrieves a random song from the catalog, the same way song_model.get_random_song() does.
+
+    Returns:
+        Song: A randomly selected Song object.
+
+    Raises:
+        ValueError: If the catalog is empty.
+    """
+    min_id, max_id = await run_db(song_model.get_song_id_range)
+    if min_id is not None:
+        for _ in range(song_model.RANDOM_SONG_ATTEMPTS):
+            song_id = min_id + await get_random_int_async(max_id - min_id + 1) - 1
+            song = await run_db(song_model.find_live_song, song_id)
+            if song is not None:
+                logger.info("Random song selected: ID %d", song_id)
+                return song
+
+        logger.info("No live song found in %d attempts, falling back to a random offset",
+                    song_model.RANDOM_SONG_ATTEMPTS)
+        total = await run_db(song_model.count_live_songs)
+        if total:
+            random_index = await get_random_int_async(total)
+            logger.info("Random index selected: %d (total songs: %d)", random_index, total)
+            return await run_db(song_model.get_live_song_by_index, random_index)
+
+    logger.info("Cannot retrieve random song because the song catalog is empty.")
+    raise ValueError("The song catalog is empty.")
@@ -0,0 +1,195 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# How update_play_count() persists plays: "immediate" commits every play,
+# "buffered" coalesces plays in memory and writes them in one transaction per
+# flush, trading up to PLAY_COUNT_FLUSH_INTERVAL seconds of plays on a crash.
+PLAY_COUNT_DURABILITY_MODES = ("immediate", "buffered")
+PLAY_COUNT_DURABILITY = os.getenv("PLAY_COUNT_DURABILITY", "immediate")
+if PLAY_COUNT_DURABILITY not in PLAY_COUNT_DURABILITY_MODES:
+    raise ValueError(f"Invalid PLAY_COUNT_DURABILITY: {PLAY_COUNT_DURABILITY}. Must be 'immediate' or 'buffered'.")
+# A flush starts once this many plays are pending, or after the interval (in seconds)
+PLAY_COUNT_FLUSH_SIZE = int(os.getenv("PLAY_COUNT_FLUSH_SIZE", "500"))
+PLAY_COUNT_FLUSH_INTERVAL = float(os.getenv("PLAY_COUNT_FLUSH_INTERVAL", "1.0"))
+
+
+class PlayCountAggregator:
+    """
+    Accumulates play count increments per song and writes them behind the caller.
+
+    A background thread flushes the pending increments in one transaction when
+    flush_size plays are pending or flush_interval seconds have passed. If a
+    flush fails, its increments are put back and retried on the next flush.
+
+    Attributes:
+        flush_size (int): The number of pending plays that triggers a flush.
+        flush_interval (float): The longest time, in seconds, a play stays pending.
+    """
+
+    def __init__(self, flush_size: int = 500, flush_interval: float = 1.0):
+        if flush_size < 1:
+            raise ValueError(f"Invalid flush size: {flush_size} (must be at least 1).")
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: dict[int, int] = {}
+        self._pending_plays = 0
+        self._lock = threading.Lock()
+        # Keeps flushes in order, so a retried batch is never overtaken
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"plays": 0, "flushes": 0, "songs_flushed": 0, "plays_flushed": 0,
+                       "flush_failures": 0, "discarded": 0}
+
+    def add(self, song_id: int, plays: int = 1) -> None:
+        """
+        Records plays of a song, to be written by a later flush.
+
+        Args:
+            song_id (int): The ID of the song that was played.
+            plays (int): How many times it was played.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Play count aggregator is closed")
+            self._pending[song_id] = self._pending.get(song_id, 0) + plays
+            self._pending_plays += plays
+            self._stats["plays"] += plays
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="play-count-flusher", daemon=True)
+                self._thread.start()
+            if self._pending_plays >= self.flush_size:
+                self._wake.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning("Flushing play counts failed, will retry: %s", e)
+
+    def flush(self) -> int:
+        """
+        Writes all pending increments in one transaction.
+
+        Songs deleted in the meantime are skipped.
+
+        Returns:
+            int: The number of plays written.
+
+        Raises:
+            sqlite3.Error: If the write fails; the increments stay pending.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                plays, self._pending_plays = self._pending_plays, 0
+            if not batch:
+                return 0
+
+            try:
+                with get_db_connection() as conn:
+                    conn.executemany("UPDATE songs SET play_count = play_count + ? WHERE id = ? AND deleted = FALSE",
+                                     [(count, song_id) for song_id, count in batch.items()])
+                    conn.commit()
+            except sqlite3.Error:
+                with self._lock:
+                    for song_id, count in batch.items():
+                        self._pending[song_id] = self._pending.get(song_id, 0) + count
+                    self._pending_plays += plays
+                    self._stats["flush_failures"] += 1
+                raise
+
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["songs_flushed"] += len(batch)
+                self._stats["plays_flushed"] += plays
+            logger.info("Flushed %d plays of %d songs", plays, len(batch))
+            return plays
+
+    def discard(self) -> int:
+        """
+        Drops the pending increments, e.g. when the catalog is cleared and song ids start over.
+
+        Returns:
+            int: The number of plays dropped.
+        """
+        with self._flush_lock, self._lock:
+            plays = self._pending_plays
+            self._pending = {}
+            self._pending_plays = 0
+            self._stats["discarded"] += plays
+            return plays
+
+    def close(self) -> None:
+        """Stops the background thread and writes whatever is still pending."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            logger.error("Final play count flush failed, %d plays lost: %s", self._pending_plays, e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": self._pending_plays, "pending_songs": len(self._pending), **self._stats}
+
+
+_aggregator: Optional[PlayCountAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_play_count_aggregator() -> PlayCountAggregator:
+    """Returns the process-wide aggregator, creating it on first use and flushing it at exit."""
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = PlayCountAggregator(PLAY_COUNT_FLUSH_SIZE, PLAY_COUNT_FLUSH_INTERVAL)
+                atexit.register(_aggregator.close)
+    return _aggregator
+
+def flush_play_counts() -> int:
+    """Writes any pending plays now. Returns the number of plays written."""
+    if _aggregator is None:
+        return 0
+    return _aggregator.flush()
+
+def discard_play_counts() -> int:
+    """Drops any pending plays. Returns the number of plays dropped."""
+    if _aggregator is None:
+        return 0
+    return _aggregator.discard()
+
+def get_play_count_stats() -> dict:
+    """
+    Returns the play count write counters for monitoring.
+
+    Returns:
+        dict: The durability mode, plus the aggregator counters once it is in use.
+    """
+    stats = {"durability": PLAY_COUNT_DURABILITY}
+    if _aggregator is not None:
+        stats.update(_aggregator.stats())
+    return stats
@@ -2,6 +2,7 @@ import logging
 from typing import List
 from music_collection.models.song_model import Song, update_play_count
 from music_collection.utils.logger import configure_logger
+from music_collection.utils.track_list import TrackList
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
@@ -13,7 +14,7 @@ class PlaylistModel:
 
     Attributes:
         current_track_number (int): The current track number being played.
-        playlist (List[Song]): The list of songs in the playlist.
+        playlist (TrackList): The songs in the playlist, indexed by song ID.
 
     """
 
@@ -22,7 +23,7 @@ class PlaylistModel:
         Initializes the PlaylistModel with an empty playlist and the current track set to 1.
         """
         self.current_track_number = 1
-        self.playlist: List[Song] = []
+        self.playlist: TrackList = TrackList()
 
     ##################################################
     # Song Management Functions
@@ -45,7 +46,7 @@ class PlaylistModel:
             raise TypeError("Song is not a valid song")
 
         song_id = self.validate_song_id(song.id, check_in_playlist=False)
-        if song_id in [song_in_playlist.id for song_in_playlist in self.playlist]:
+        if self.playlist.contains_id(song_id):
             logger.error("Song with ID %d already exists in the playlist", song.id)
             raise ValueError(f"Song with ID {song.id} already exists in the playlist")
 
@@ -64,7 +65,7 @@ class PlaylistModel:
         logger.info("Removing song with id %d from playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        self.playlist = [song_in_playlist for song_in_playlist in self.playlist if song_in_playlist.id != song_id]
+        self.playlist.remove_id(song_id)
         logger.info("Song with id %d has been removed", song_id)
 
     def remove_song_by_track_number(self, track_number: int) -> None:
@@ -103,7 +104,7 @@ class PlaylistModel:
         """
         self.check_if_empty()
         logger.info("Getting all songs in the playlist")
-        return self.playlist
+        return list(self.playlist)
 
     def get_song_by_song_id(self, song_id: int) -> Song:
         """
@@ -118,7 +119,7 @@ class PlaylistModel:
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
         logger.info("Getting song with id %d from playlist", song_id)
-        return next((song for song in self.playlist if song.id == song_id), None)
+        return self.playlist.get_by_id(song_id)
 
     def get_song_by_track_number(self, track_number: int) -> Song:
         """
@@ -153,7 +154,46 @@ class PlaylistModel:
         """
         Returns the total duration of the playlist in seconds.
         """
-        return sum(song.duration for song in self.playlist)
+        return self.playlist.total_duration
+
+    def get_track_start_time(self, track_number: int) -> int:
+        """
+        Returns how far into the playlist a track starts, i.e. the total duration of the tracks before it.
+
+        Args:
+            track_number (int): The track number (1-indexed).
+
+        Returns:
+            int: The elapsed time in seconds when the track starts.
+
+        Raises:
+            ValueError: If the playlist is empty or the track number is invalid.
+        """
+        self.check_if_empty()
+        track_number = self.validate_track_number(track_number)
+        return self.playlist.start_time(track_number - 1)
+
+    def seek(self, seconds: int) -> tuple[int, int]:
+        """
+        Finds the track playing at a given time into the playlist.
+
+        Args:
+            seconds (int): The playback time in seconds, counted from the start of the playlist.
+
+        Returns:
+            tuple[int, int]: The track number (1-indexed) and the offset into that track in seconds.
+
+        Raises:
+            ValueError: If the playlist is empty or the time is not within the playlist.
+        """
+        self.check_if_empty()
+        logger.info("Seeking to %s seconds into the playlist", seconds)
+        try:
+            playlist_index, offset = self.playlist.seek(seconds)
+        except ValueError as e:
+            logger.error("Invalid playback time %s", seconds)
+            raise e
+        return playlist_index + 1, offset
 
     ##################################################
     # Playlist Movement Functions
@@ -181,9 +221,7 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the beginning of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.insert(0, song)
+        self.playlist.move(song_id, 0)
         logger.info("Song with ID %d has been moved to the beginning", song_id)
 
     def move_song_to_end(self, song_id: int) -> None:
@@ -196,9 +234,7 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the end of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.append(song)
+        self.playlist.move(song_id, len(self.playlist) - 1)
         logger.info("Song with ID %d has been moved to the end", song_id)
 
     def move_song_to_track_number(self, song_id: int, track_number: int) -> None:
@@ -214,9 +250,7 @@ class PlaylistModel:
         song_id = self.validate_song_id(song_id)
         track_number = self.validate_track_number(track_number)
         playlist_index = track_number - 1
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.insert(playlist_index, song)
+        self.playlist.move(song_id, playlist_index)
         logger.info("Song with ID %d has been moved to track number %d", song_id, track_number)
 
     def swap_songs_in_playlist(self, song1_id: int, song2_id: int) -> None:
@@ -239,11 +273,7 @@ class PlaylistModel:
             logger.error("Cannot swap a song with itself, both song IDs are the same: %d", song1_id)
             raise ValueError(f"Cannot swap a song with itself, both song IDs are the same: {song1_id}")
 
-        song1 = self.get_song_by_song_id(song1_id)
-        song2 = self.get_song_by_song_id(song2_id)
-        index1 = self.playlist.index(song1)
-        index2 = self.playlist.index(song2)
-        self.playlist[index1], self.playlist[index2] = self.playlist[index2], self.playlist[index1]
+        self.playlist.swap(song1_id, song2_id)
         logger.info("Swapped songs with IDs %d and %d", song1_id, song2_id)
 
     ##################################################
@@ -333,7 +363,7 @@ class PlaylistModel:
             raise ValueError(f"Invalid song id: {song_id}")
 
         if check_in_playlist:
-            if song_id not in [song_in_playlist.id for song_in_playlist in self.playlist]:
+            if not self.playlist.contains_id(song_id):
                 logger.error("Song with id %d not found in playlist", song_id)
                 raise ValueError(f"Song with id {song_id} not found in playlist")
 
@@ -0,0 +1,391 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import logging
+import os
+import sqlite3
+import threading
+from typing import Iterator, Optional
+
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_model import Song
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# How many playlists each worker keeps loaded in memory
+PLAYLIST_CACHE_SIZE = int(os.getenv("PLAYLIST_CACHE_SIZE", "128"))
+
+# The playlist used by requests that do not name one, created by migration 0003
+DEFAULT_PLAYLIST_ID = 1
+
+# Spacing between the positions of consecutive entries; a song moved between
+# two neighbours takes the midpoint, so about 16 moves fit in one gap before
+# the playlist has to be renumbered
+POSITION_GAP = 1 << 16
+
+
+class StoredPlaylistModel(PlaylistModel):
+    """
+    A PlaylistModel backed by the playlists and playlist_entries tables.
+
+    Every change is written through when it is made, touching only the rows it
+    affects: adding or removing a song writes one entry, moving a song rewrites
+    its position alone (the playlist is renumbered only when two neighbouring
+    positions run out of room) and swapping two songs rewrites two.
+
+    Each write bumps the stored version, provided it still matches the version
+    this copy was loaded at. If another worker changed the playlist in the
+    meantime, the write is refused and the copy is marked stale rather than
+    overwriting that change.
+
+    Attributes:
+        playlist_id (int): The ID of the playlist.
+        name (str): The name of the playlist.
+        version (int): The stored version this copy matches.
+        stale (bool): Whether a write failed, leaving this copy out of step with the database.
+    """
+
+    def __init__(self, playlist_id: int, name: str, current_track_number: int = 1, version: int = 0):
+        super().__init__()
+        self.playlist_id = playlist_id
+        self.name = name
+        self.current_track_number = current_track_number
+        self.version = version
+        self.stale = False
+        self._saved_track_number = current_track_number
+        self._positions: dict[int, int] = {}
+
+    @classmethod
+    def load(cls, playlist_id: int) -> "StoredPlaylistModel":
+        """
+        Loads a playlist and its songs, in order.
+
+        Args:
+            playlist_id (int): The ID of the playlist.
+
+        Returns:
+            StoredPlaylistModel: The loaded playlist.
+
+        Raises:
+            ValueError: If the playlist does not exist.
+            sqlite3.Error: If any database error occurs.
+        """
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                # One read transaction, so the entries match the version
+                cursor.execute("BEGIN")
+                try:
+                    cursor.execute("SELECT name, current_track_number, version FROM playlists WHERE id = ?",
+                                   (playlist_id,))
+                    row = cursor.fetchone()
+                    if row is None:
+                        logger.info("Playlist with ID %s not found", playlist_id)
+                        raise ValueError(f"Playlist with ID {playlist_id} not found")
+                    cursor.execute("""
+                        SELECT e.position, s.id, s.artist, s.title, s.year, s.genre, s.duration
+                        FROM playlist_entries e
+                        JOIN songs s ON s.id = e.song_id
+                        WHERE e.playlist_id = ?
+                        ORDER BY e.position
+                    """, (playlist_id,))
+                    entries = cursor.fetchall()
+                finally:
+                    conn.rollback()
+        except sqlite3.Error as e:
+            logger.error("Database error while loading playlist %s: %s", playlist_id, str(e))
+            raise e
+
+        model = cls(playlist_id, name=row[0], current_track_number=row[1], version=row[2])
+        model.playlist.extend(Song(*entry[1:]) for entry in entries)
+        model._positions = {entry[1]: entry[0] for entry in entries}
+        logger.info("Loaded playlist %d (version %d) with %d songs", playlist_id, model.version, len(entries))
+        return model
+
+    def _write(self, statements: list[tuple[str, list[tuple]]]) -> None:
+        """
+        Writes changed rows, the current track number and the next version in one transaction.
+
+        Args:
+            statements (list[tuple[str, list[tuple]]]): Each SQL statement with the rows to execute it for.
+
+        Raises:
+            RuntimeError: If another worker changed the playlist since this copy was loaded.
+            sqlite3.Error: If any database error occurs.
+        """
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("""
+                        UPDATE playlists SET version = version + 1, current_track_number = ?
+                        WHERE id = ? AND version = ?
+                    """, (self.current_track_number, self.playlist_id, self.version))
+                    if cursor.rowcount != 1:
+                        raise RuntimeError(f"Playlist with ID {self.playlist_id} was changed by another request, "
+                                           "please retry")
+                    for sql, rows in statements:
+                        cursor.executemany(sql, rows)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except (RuntimeError, sqlite3.Error) as e:
+            self.stale = True
+            logger.error("Error saving playlist %d: %s", self.playlist_id, str(e))
+            raise e
+
+        self.version += 1
+        self._saved_track_number = self.current_track_number
+
+    def _renumber(self) -> None:
+        self._positions = {song.id: index * POSITION_GAP for index, song in enumerate(self.playlist)}
+        logger.info("Renumbering the %d entries of playlist %d", len(self._positions), self.playlist_id)
+        self._write([("UPDATE playlist_entries SET position = ? WHERE playlist_id = ? AND song_id = ?",
+                      [(position, self.playlist_id, song_id) for song_id, position in self._positions.items()])])
+
+    def _reposition(self, song_id: int) -> None:
+        # Gives a moved song a position between its new neighbours
+        index = self.playlist.index_of(song_id)
+        before = self._positions[self.playlist[index - 1].id] if index > 0 else None
+        after = self._positions[self.playlist[index + 1].id] if index + 1 < len(self.playlist) else None
+        position = self._positions[song_id]
+        if (before is None or before < position) and (after is None or position < after):
+            return
+
+        if before is None and after is None:
+            position = 0
+        elif before is None:
+            position = after - POSITION_GAP
+        elif after is None:
+            position = before + POSITION_GAP
+        elif after - before > 1:
+            position = (before + after) // 2
+        else:
+            self._renumber()
+            return
+
+        self._positions[song_id] = position
+        self._write([("UPDATE playlist_entries SET position = ? WHERE playlist_id = ? AND song_id = ?",
+                      [(position, self.playlist_id, song_id)])])
+
+    def save(self) -> None:
+        """
+        Writes the current track number if playback has moved it.
+
+        Raises:
+            RuntimeError: If another worker changed the playlist since this copy was loaded.
+            sqlite3.Error: If any database error occurs.
+        """
+        if self.current_track_number != self._saved_track_number:
+            self._write([])
+
+    def add_song_to_playlist(self, song: Song) -> None:
+        last_id = self.playlist[-1].id if self.playlist else None
+        super().add_song_to_playlist(song)
+        position = self._positions[last_id] + POSITION_GAP if last_id is not None else 0
+        self._positions[song.id] = position
+        self._write([("INSERT INTO playlist_entries (playlist_id, song_id, position) VALUES (?, ?, ?)",
+                      [(self.playlist_id, song.id, position)])])
+
+    def remove_song_by_song_id(self, song_id: int) -> None:
+        super().remove_song_by_song_id(song_id)
+        song_id = int(song_id)
+        del self._positions[song_id]
+        self._write([("DELETE FROM playlist_entries WHERE playlist_id = ? AND song_id = ?",
+                      [(self.playlist_id, song_id)])])
+
+    def remove_song_by_track_number(self, track_number: int) -> None:
+        song_id = self.get_song_by_track_number(track_number).id
+        super().remove_song_by_track_number(track_number)
+        del self._positions[song_id]
+        self._write([("DELETE FROM playlist_entries WHERE playlist_id = ? AND song_id = ?",
+                      [(self.playlist_id, song_id)])])
+
+    def clear_playlist(self) -> None:
+        super().clear_playlist()
+        self._positions.clear()
+        self._write([("DELETE FROM playlist_entries WHERE playlist_id = ?", [(self.playlist_id,)])])
+
+    def move_song_to_beginning(self, song_id: int) -> None:
+        super().move_song_to_beginning(song_id)
+        self._reposition(int(song_id))
+
+    def move_song_to_end(self, song_id: int) -> None:
+        super().move_song_to_end(song_id)
+        self._reposition(int(song_id))
+
+    def move_song_to_track_number(self, song_id: int, track_number: int) -> None:
+        super().move_song_to_track_number(song_id, track_number)
+        self._reposition(int(song_id))
+
+    def swap_songs_in_playlist(self, song1_id: int, song2_id: int) -> None:
+        super().swap_songs_in_playlist(song1_id, song2_id)
+        song1_id, song2_id = int(song1_id), int(song2_id)
+        positions = self._positions
+        positions[song1_id], positions[song2_id] = positions[song2_id], positions[song1_id]
+        self._write([("UPDATE playlist_entries SET position = ? WHERE playlist_id = ? AND song_id = ?",
+                      [(positions[song1_id], self.playlist_id, song1_id),
+                       (positions[song2_id], self.playlist_id, song2_id)])])
+
+
+class PlaylistStore:
+    """
+    Loads playlists on demand and keeps the most recently used ones in memory.
+
+    Up to capacity playlists are cached, least recently used first out. Each
+    checkout compares the cached copy's version with the stored one (a primary
+    key lookup) and reloads the playlist if another worker has changed it, so
+    any number of worker processes can serve the same playlists. Checkouts of
+    the same playlist are serialized by a lock striped on its ID.
+
+    Attributes:
+        capacity (int): The most playlists kept in memory.
+    """
+
+    def __init__(self, capacity: int = PLAYLIST_CACHE_SIZE, lock_stripes: int = 64):
+        if capacity < 1:
+            raise ValueError(f"Invalid playlist cache size: {capacity} (must be at least 1).")
+        self.capacity = capacity
+        self._cache: "OrderedDict[int, StoredPlaylistModel]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "evictions": 0}
+
+    def create_playlist(self, name: str) -> int:
+        """
+        Creates a new, empty playlist.
+
+        Args:
+            name (str): The name of the playlist.
+
+        Returns:
+            int: The ID of the new playlist.
+
+        Raises:
+            ValueError: If the name is empty.
+            sqlite3.Error: If any database error occurs.
+        """
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"Invalid playlist name: {name}")
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO playlists (name) VALUES (?)", (name,))
+                conn.commit()
+                playlist_id = cursor.lastrowid
+        except sqlite3.Error as e:
+            logger.error("Database error while creating playlist: %s", str(e))
+            raise e
+        logger.info("Playlist %s created with ID %d", name, playlist_id)
+        return playlist_id
+
+    def delete_playlist(self, playlist_id: int) -> None:
+        """
+        Deletes a playlist and its entries.
+
+        Args:
+            playlist_id (int): The ID of the playlist.
+
+        Raises:
+            ValueError: If the playlist does not exist or is the default playlist.
+            sqlite3.Error: If any database error occurs.
+        """
+        if playlist_id == DEFAULT_PLAYLIST_ID:
+            raise ValueError("Cannot delete the default playlist")
+        with self._lock_for(playlist_id):
+            try:
+                with get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("DELETE FROM playlist_entries WHERE playlist_id = ?", (playlist_id,))
+                    cursor.execute("DELETE FROM playlists WHERE id = ?", (playlist_id,))
+                    if cursor.rowcount == 0:
+                        conn.rollback()
+                        logger.info("Playlist with ID %s not found", playlist_id)
+                        raise ValueError(f"Playlist with ID {playlist_id} not found")
+                    conn.commit()
+            except sqlite3.Error as e:
+                logger.error("Database error while deleting playlist %s: %s", playlist_id, str(e))
+                raise e
+            with self._cache_lock:
+                self._cache.pop(playlist_id, None)
+        logger.info("Playlist with ID %d deleted", playlist_id)
+
+    def _lock_for(self, playlist_id: int) -> threading.Lock:
+        return self._locks[playlist_id % len(self._locks)]
+
+    def _get_version(self, playlist_id: int) -> Optional[int]:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM playlists WHERE id = ?", (playlist_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def _get(self, playlist_id: int) -> StoredPlaylistModel:
+        with self._cache_lock:
+            model = self._cache.get(playlist_id)
+            if model is not None:
+                self._cache.move_to_end(playlist_id)
+
+        if model is not None:
+            if self._get_version(playlist_id) == model.version:
+                with self._cache_lock:
+                    self._stats["hits"] += 1
+                return model
+            logger.info("Playlist %d changed since it was cached, reloading", playlist_id)
+
+        # Dropped before loading, so a deleted playlist does not linger in the cache
+        with self._cache_lock:
+            self._cache.pop(playlist_id, None)
+            self._stats["misses" if model is None else "reloads"] += 1
+        model = StoredPlaylistModel.load(playlist_id)
+
+        with self._cache_lock:
+            self._cache[playlist_id] = model
+            while len(self._cache) > self.capacity:
+                evicted, _ = self._cache.popitem(last=False)
+                self._stats["evictions"] += 1
+                logger.info("Evicted playlist %d from the cache", evicted)
+        return model
+
+    @contextmanager
+    def checkout(self, playlist_id: int) -> Iterator[StoredPlaylistModel]:
+        """
+        Lends out a playlist for the duration of one request.
+
+        Changes made through the playlist are written as they happen; a moved
+        current track is written when the checkout ends.
+
+        Args:
+            playlist_id (int): The ID of the playlist.
+
+        Yields:
+            StoredPlaylistModel: The up to date playlist, locked against other checkouts.
+
+        Raises:
+            ValueError: If the playlist does not exist.
+            sqlite3.Error: If any database error occurs.
+        """
+        with self._lock_for(playlist_id):
+            model = self._get(playlist_id)
+            try:
+                yield model
+            finally:
+                try:
+                    if not model.stale:
+                        # Playback moves the current track even when it stops on an error
+                        model.save()
+                finally:
+                    if model.stale:
+                        # Load it afresh next time rather than trust what the failed write left behind
+                        with self._cache_lock:
+                            if self._cache.get(playlist_id) is model:
+                                del self._cache[playlist_id]
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            return {"capacity": self.capacity, "cached": len(self._cache), **self._stats}
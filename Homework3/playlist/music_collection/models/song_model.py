@@ -1,10 +1,16 @@
+import base64
 from dataclasses import dataclass
+import json
 import logging
 import os
 import sqlite3
+import time
+from typing import Any, Iterable, Iterator, Optional
 
+from music_collection.models.play_counts import PLAY_COUNT_DURABILITY, discard_play_counts, get_play_count_aggregator
+from music_collection.utils.cache import LRUCache
 from music_collection.utils.logger import configure_logger
-from music_collection.utils.random_utils import get_random
+from music_collection.utils.random_utils import get_random_int
 from music_collection.utils.sql_utils import get_db_connection
 
 
@@ -12,6 +18,26 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# How many random ids get_random_song() probes before falling back to an offset scan
+RANDOM_SONG_ATTEMPTS = int(os.getenv("RANDOM_SONG_ATTEMPTS", "16"))
+
+# Rows per transaction for create_songs_bulk(), and how many row errors it reports
+SONG_BULK_CHUNK_SIZE = int(os.getenv("SONG_BULK_CHUNK_SIZE", "5000"))
+SONG_BULK_MAX_ERRORS = 100
+
+# Page sizes for get_songs_page()
+CATALOG_PAGE_DEFAULT_LIMIT = 100
+CATALOG_PAGE_MAX_LIMIT = 1000
+
+# Rows fetched per round trip when streaming the catalog
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+# Songs kept by get_song_by_id() and get_song_by_compound_key(). Deletes and clears
+# drop them; the TTL bounds how long another process's delete goes unnoticed.
+SONG_CACHE_SIZE = int(os.getenv("SONG_CACHE_SIZE", "4096"))
+SONG_CACHE_TTL = float(os.getenv("SONG_CACHE_TTL", "60"))
+
+
 @dataclass
 class Song:
     id: int
@@ -28,6 +54,13 @@ class Song:
             raise ValueError(f"Year must be greater than 1900, got {self.year}")
 
 
+song_cache = LRUCache(maxsize=SONG_CACHE_SIZE, ttl=SONG_CACHE_TTL)
+
+def _cache_song(song: Song, generation: int) -> None:
+    song_cache.put(("id", song.id), song, generation)
+    song_cache.put(("key", song.artist, song.title, song.year), song, generation)
+
+
 def create_song(artist: str, title: str, year: int, genre: str, duration: int) -> None:
     """
     Creates a new song in the songs table.
@@ -69,21 +102,132 @@ def create_song(artist: str, title: str, year: int, genre: str, duration: int) -
         logger.error("Database error while creating song: %s", str(e))
         raise sqlite3.Error(f"Database error: {str(e)}")
 
+def _parse_int(value: Any):
+    """Returns value as an int if it is one, or a string of digits (as read from CSV); otherwise None."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    return None
+
+def _validate_song_record(record: Any) -> tuple:
+    """
+    Converts a bulk import record into a songs row, applying the Song rules.
+
+    Raises:
+        ValueError: If the record is not an object or a field is missing or invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Invalid input, each song must be an object")
+    artist = record.get("artist")
+    title = record.get("title")
+    genre = record.get("genre")
+    if not artist or not title or not genre:
+        raise ValueError("Invalid input, artist, title and genre are required")
+    year = _parse_int(record.get("year"))
+    duration = _parse_int(record.get("duration"))
+    if year is None or duration is None:
+        raise ValueError(f"Invalid year or duration: {record.get('year')}, {record.get('duration')} (must be integers).")
+    song = Song(id=0, artist=str(artist), title=str(title), year=year, genre=str(genre), duration=duration)
+    return (song.artist, song.title, song.year, song.genre, song.duration)
+
+def create_songs_bulk(records: Iterable[Any], chunk_size: int = SONG_BULK_CHUNK_SIZE) -> dict[str, Any]:
+    """
+    Inserts songs from an iterable of records in chunked transactions.
+
+    Records are consumed lazily, so only one chunk is held in memory at a time.
+    Each chunk is parsed and validated without a connection, then inserted
+    with one executemany and committed, checking a connection out only for
+    that. Songs whose compound key (artist, title, year) already exists are
+    skipped; any other constraint failure is an error.
+
+    Args:
+        records (Iterable[Any]): Song records with artist, title, year, genre and duration.
+        chunk_size (int): How many valid rows to insert per transaction.
+
+    Returns:
+        dict[str, Any]: The inserted, duplicate and invalid row counts, the first
+            SONG_BULK_MAX_ERRORS row errors, the elapsed time and rows per second.
+
+    Raises:
+        sqlite3.Error: If a database error occurs. Chunks committed earlier are kept.
+    """
+    start = time.perf_counter()
+    inserted = duplicates = invalid = 0
+    errors = []
+
+    def flush(rows: list) -> None:
+        nonlocal inserted, duplicates
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            before = conn.total_changes
+            cursor.executemany("""
+                INSERT INTO songs (artist, title, year, genre, duration)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(artist, title, year) DO NOTHING
+            """, rows)
+            conn.commit()
+            added = conn.total_changes - before
+        inserted += added
+        duplicates += len(rows) - added
+        logger.info("Committed chunk of %d songs (%d inserted so far)", len(rows), inserted)
+
+    try:
+        rows = []
+        for index, record in enumerate(records):
+            try:
+                rows.append(_validate_song_record(record))
+            except ValueError as e:
+                invalid += 1
+                if len(errors) < SONG_BULK_MAX_ERRORS:
+                    errors.append({"index": index, "error": str(e)})
+                continue
+            if len(rows) >= chunk_size:
+                flush(rows)
+                rows = []
+        if rows:
+            flush(rows)
+
+    except sqlite3.Error as e:
+        logger.error("Database error during bulk song import: %s", str(e))
+        raise e
+
+    elapsed = time.perf_counter() - start
+    total = inserted + duplicates + invalid
+    logger.info("Bulk import processed %d rows in %.2fs", total, elapsed)
+    return {
+        "inserted": inserted,
+        "duplicates": duplicates,
+        "invalid": invalid,
+        "errors": errors,
+        "elapsed_sec": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+
 def clear_catalog() -> None:
     """
-    Recreates the songs table, effectively deleting all songs.
+    Deletes all songs, keeping the table, its indexes and the schema version.
+
+    Ids start again from 1, as they did when the table was recreated. Every
+    playlist is emptied too, since its entries would point at reused ids.
 
     Raises:
         sqlite3.Error: If any database error occurs.
     """
     try:
-        with open(os.getenv("SQL_CREATE_TABLE_PATH", "/app/sql/create_song_table.sql"), "r") as fh:
-            create_table_script = fh.read()
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.executescript(create_table_script)
+            cursor.execute("DELETE FROM playlist_entries")
+            # Bumping the versions makes every worker reload its cached playlists
+            cursor.execute("UPDATE playlists SET version = version + 1, current_track_number = 1")
+            cursor.execute("DELETE FROM songs")
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'songs'")
             conn.commit()
 
+            # Buffered plays belong to the old songs, whose ids are about to be reused
+            discard_play_counts()
+            song_cache.clear()
+
             logger.info("Catalog cleared successfully.")
 
     except sqlite3.Error as e:
@@ -119,6 +263,8 @@ def delete_song(song_id: int) -> None:
             # Perform the soft delete by setting 'deleted' to TRUE
             cursor.execute("UPDATE songs SET deleted = TRUE WHERE id = ?", (song_id,))
             conn.commit()
+            # The song may be cached under its compound key only, so drop every song
+            song_cache.clear()
 
             logger.info("Song with ID %s marked as deleted.", song_id)
 
@@ -139,6 +285,11 @@ def get_song_by_id(song_id: int) -> Song:
     Raises:
         ValueError: If the song is not found or is marked as deleted.
     """
+    song = song_cache.get(("id", song_id))
+    if song is not None:
+        return song
+
+    generation = song_cache.generation()
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -155,7 +306,9 @@ def get_song_by_id(song_id: int) -> Song:
                     logger.info("Song with ID %s has been deleted", song_id)
                     raise ValueError(f"Song with ID {song_id} has been deleted")
                 logger.info("Song with ID %s found", song_id)
-                return Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+                song = Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+                _cache_song(song, generation)
+                return song
             else:
                 logger.info("Song with ID %s not found", song_id)
                 raise ValueError(f"Song with ID {song_id} not found")
@@ -179,6 +332,11 @@ def get_song_by_compound_key(artist: str, title: str, year: int) -> Song:
     Raises:
         ValueError: If the song is not found or is marked as deleted.
     """
+    song = song_cache.get(("key", artist, title, year))
+    if song is not None:
+        return song
+
+    generation = song_cache.generation()
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -195,7 +353,9 @@ def get_song_by_compound_key(artist: str, title: str, year: int) -> Song:
                     logger.info("Song with artist '%s', title '%s', and year %d has been deleted", artist, title, year)
                     raise ValueError(f"Song with artist '{artist}', title '{title}', and year {year} has been deleted")
                 logger.info("Song with artist '%s', title '%s', and year %d found", artist, title, year)
-                return Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+                song = Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+                _cache_song(song, generation)
+                return song
             else:
                 logger.info("Song with artist '%s', title '%s', and year %d not found", artist, title, year)
                 raise ValueError(f"Song with artist '{artist}', title '{title}', and year {year} not found")
@@ -257,10 +417,164 @@ def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
         logger.error("Database error while retrieving all songs: %s", str(e))
         raise e
 
+def iter_all_songs(sort_by_play_count: bool = False, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Streams all songs that are not marked as deleted from the catalog.
+
+    Rows are read with fetchmany, so memory use does not grow with the catalog.
+    The pooled connection stays checked out until the generator is exhausted or closed.
+
+    Args:
+        sort_by_play_count (bool): If True, sort the songs by play count in descending order.
+        batch_size (int): How many rows to fetch at a time.
+
+    Yields:
+        dict: One non-deleted song with its play_count.
+    """
+    query = """
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE
+    """
+    if sort_by_play_count:
+        query += " ORDER BY play_count DESC"
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Streaming all non-deleted songs from the catalog")
+            cursor.execute(query)
+
+            count = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {
+                        "id": row[0],
+                        "artist": row[1],
+                        "title": row[2],
+                        "year": row[3],
+                        "genre": row[4],
+                        "duration": row[5],
+                        "play_count": row[6],
+                    }
+                count += len(rows)
+            logger.info("Streamed %d songs from the catalog", count)
+
+    except sqlite3.Error as e:
+        logger.error("Database error while streaming songs: %s", str(e))
+        raise e
+
+def _encode_cursor(position: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode()
+
+def _decode_cursor(cursor: str, keys: tuple) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(position, dict) or set(position) != set(keys) \
+                or not all(isinstance(position[key], int) for key in keys):
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return position
+
+def get_songs_page(limit: int = CATALOG_PAGE_DEFAULT_LIMIT, cursor: Optional[str] = None,
+                   sort_by_play_count: bool = False) -> tuple[list[dict], Optional[str]]:
+    """
+    Retrieves one page of non-deleted songs using keyset pagination.
+
+    Pages are ordered by id, or by play count (descending) then id when sorting.
+    Each page resumes strictly after the last row of the previous one, so the
+    cost of a page does not depend on how deep into the catalog it is.
+
+    Args:
+        limit (int): The maximum number of songs to return (1 to CATALOG_PAGE_MAX_LIMIT).
+        cursor (Optional[str]): The next_cursor returned with the previous page, or None for the first page.
+        sort_by_play_count (bool): If True, sort the songs by play count in descending order.
+
+    Returns:
+        tuple[list[dict], Optional[str]]: The songs on the page and the cursor of
+            the next page, which is None on the last page.
+
+    Raises:
+        ValueError: If the limit or the cursor is invalid (cursors are tied to the sort order).
+        sqlite3.Error: If any database error occurs.
+    """
+    if not isinstance(limit, int) or limit < 1 or limit > CATALOG_PAGE_MAX_LIMIT:
+        raise ValueError(f"Invalid limit: {limit} (must be between 1 and {CATALOG_PAGE_MAX_LIMIT}).")
+
+    query = """
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE
+    """
+    params: list = []
+    if sort_by_play_count:
+        if cursor is not None:
+            position = _decode_cursor(cursor, ("play_count", "id"))
+            query += " AND (play_count < ? OR (play_count = ? AND id > ?))"
+            params += [position["play_count"], position["play_count"], position["id"]]
+        query += " ORDER BY play_count DESC, id"
+    else:
+        if cursor is not None:
+            position = _decode_cursor(cursor, ("id",))
+            query += " AND id > ?"
+            params.append(position["id"])
+        query += " ORDER BY id"
+    # One extra row tells us whether there is a next page
+    query += " LIMIT ?"
+    params.append(limit + 1)
+
+    try:
+        with get_db_connection() as conn:
+            db_cursor = conn.cursor()
+            logger.info("Retrieving a page of up to %d songs from the catalog", limit)
+            db_cursor.execute(query, params)
+            rows = db_cursor.fetchall()
+
+        songs = [
+            {
+                "id": row[0],
+                "artist": row[1],
+                "title": row[2],
+                "year": row[3],
+                "genre": row[4],
+                "duration": row[5],
+                "play_count": row[6],
+            }
+            for row in rows[:limit]
+        ]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = songs[-1]
+            if sort_by_play_count:
+                next_cursor = _encode_cursor({"play_count": last["play_count"], "id": last["id"]})
+            else:
+                next_cursor = _encode_cursor({"id": last["id"]})
+
+        logger.info("Retrieved %d songs from the catalog", len(songs))
+        return songs, next_cursor
+
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving a page of songs: %s", str(e))
+        raise e
+
 def get_random_song() -> Song:
     """
     Retrieves a random song from the catalog.
 
+    Picks a random id between the smallest and largest song id and looks it up
+    by primary key, retrying when the id is missing or deleted. Every live song
+    is equally likely and the cost does not grow with the catalog size. If the
+    id range is too sparse to hit a live song, falls back to a random offset
+    over the non-deleted songs.
+
+    Each random number is drawn while no connection is checked out, as it may
+    wait on random.org, and each query checks one out only for itself.
+
     Returns:
         Song: A randomly selected Song object.
 
@@ -268,35 +582,94 @@ def get_random_song() -> Song:
         ValueError: If the catalog is empty.
     """
     try:
-        all_songs = get_all_songs()
-
-        if not all_songs:
-            logger.info("Cannot retrieve random song because the song catalog is empty.")
-            raise ValueError("The song catalog is empty.")
-
-        # Get a random index using the random.org API
-        random_index = get_random(len(all_songs))
-        logger.info("Random index selected: %d (total songs: %d)", random_index, len(all_songs))
-
-        # Return the song at the random index, adjust for 0-based indexing
-        song_data = all_songs[random_index - 1]
-        return Song(
-            id=song_data["id"],
-            artist=song_data["artist"],
-            title=song_data["title"],
-            year=song_data["year"],
-            genre=song_data["genre"],
-            duration=song_data["duration"]
-        )
+        min_id, max_id = get_song_id_range()
+
+        if min_id is not None:
+            for _ in range(RANDOM_SONG_ATTEMPTS):
+                song_id = min_id + get_random_int(max_id - min_id + 1) - 1
+                song = find_live_song(song_id)
+                if song is not None:
+                    logger.info("Random song selected: ID %d", song_id)
+                    return song
+
+            logger.info("No live song found in %d attempts, falling back to a random offset", RANDOM_SONG_ATTEMPTS)
+            total = count_live_songs()
+            if total:
+                random_index = get_random_int(total)
+                logger.info("Random index selected: %d (total songs: %d)", random_index, total)
+                return get_live_song_by_index(random_index)
+
+        logger.info("Cannot retrieve random song because the song catalog is empty.")
+        raise ValueError("The song catalog is empty.")
 
     except Exception as e:
         logger.error("Error while retrieving random song: %s", str(e))
         raise e
 
+# The steps of get_random_song(), one short query each, so callers draw the random
+# numbers between queries without holding a connection (see also async_song_model).
+
+def get_song_id_range() -> tuple[Optional[int], Optional[int]]:
+    """Returns the smallest and largest song id, deleted songs included, or (None, None) for an empty catalog."""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT (SELECT MIN(id) FROM songs), (SELECT MAX(id) FROM songs)")
+            return cursor.fetchone()
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving the song id range: %s", str(e))
+        raise e
+
+def find_live_song(song_id: int) -> Optional[Song]:
+    """Returns the song with this id, or None if there is none or it has been deleted."""
+    try:
+        return get_song_by_id(song_id)
+    except ValueError:
+        return None
+
+def count_live_songs() -> int:
+    """Returns the number of songs that have not been deleted."""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM songs WHERE deleted = FALSE")
+            return cursor.fetchone()[0]
+    except sqlite3.Error as e:
+        logger.error("Database error while counting songs: %s", str(e))
+        raise e
+
+def get_live_song_by_index(index: int) -> Song:
+    """
+    Returns the index-th non-deleted song in id order, counting from 1.
+
+    Raises:
+        ValueError: If there are fewer than index songs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, artist, title, year, genre, duration
+                FROM songs
+                WHERE deleted = FALSE
+                ORDER BY id
+                LIMIT 1 OFFSET ?
+            """, (index - 1,))
+            row = cursor.fetchone()
+    except sqlite3.Error as e:
+        logger.error("Database error while retrieving song number %d: %s", index, str(e))
+        raise e
+    if row is None:
+        raise ValueError(f"There is no song number {index}")
+    return Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+
 def update_play_count(song_id: int) -> None:
     """
     Increments the play count of a song by song ID.
 
+    With PLAY_COUNT_DURABILITY=buffered the song is still checked here, but the
+    increment is queued and written by the play count aggregator's next flush.
+
     Args:
         song_id (int): The ID of the song whose play count should be incremented.
 
@@ -320,6 +693,11 @@ def update_play_count(song_id: int) -> None:
                 logger.info("Song with ID %d not found", song_id)
                 raise ValueError(f"Song with ID {song_id} not found")
 
+            if PLAY_COUNT_DURABILITY == "buffered":
+                get_play_count_aggregator().add(song_id)
+                logger.info("Play count increment queued for song with ID: %d", song_id)
+                return
+
             # Increment the play count
             cursor.execute("UPDATE songs SET play_count = play_count + 1 WHERE id = ?", (song_id,))
             conn.commit()
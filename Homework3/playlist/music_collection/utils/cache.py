@@ -0,0 +1,89 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded cache that drops the least recently used entry first.
+
+    Attributes:
+        maxsize (int): The most entries kept.
+        ttl (Optional[float]): Seconds an entry stays valid after it is stored, or None to keep it until evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError(f"Invalid cache size: {maxsize} (must be at least 1).")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (expiry time or None, value), least recently used first
+        self._entries: "OrderedDict[Hashable, tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+        self._generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value for key, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and self._clock() >= entry[0]:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def generation(self) -> int:
+        """A counter that clear() bumps. Read it before loading a value and pass it to put()."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Stores a value, evicting the least recently used entry if the cache is full.
+
+        With a generation, the value is dropped if clear() ran since that
+        generation was read, as it may have been loaded before the change.
+        """
+        expires = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drops one entry. Returns whether it was cached."""
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self._stats["invalidations"] += 1
+            return True
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {"size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl, **self._stats,
+                    "hit_ratio": round(self._stats["hits"] / lookups, 3) if lookups else None}
@@ -0,0 +1,124 @@
+"""
+Request parsing shared by the catalog routes of app.py (Flask) and asgi.py (Starlette).
+
+Both apps pass in the request's content type, body and query parameters, so
+they accept and reject the same input with the same status and message.
+"""
+import json
+import os
+from typing import Any, Mapping, Optional
+
+from music_collection.models.song_model import CATALOG_PAGE_DEFAULT_LIMIT
+from music_collection.utils.ingest import SONG_FIELDS
+
+
+# Bodies the bulk import parses as a stream, by content type; anything else must be a JSON array
+BULK_FORMATS = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}
+
+# Largest bulk import body read as a JSON array, which is parsed whole; CSV and NDJSON are not limited
+BULK_JSON_MAX_BYTES = int(os.getenv("BULK_JSON_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+class RequestError(ValueError):
+    """
+    A request the route refuses.
+
+    Attributes:
+        status (int): The HTTP status to answer with.
+    """
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def is_json(mimetype: str) -> bool:
+    """Returns whether a content type is JSON, the way Flask's request.is_json decides."""
+    return mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))
+
+def _load_json(body: bytes) -> Any:
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+def read_song(mimetype: str, body: bytes) -> dict[str, Any]:
+    """
+    Reads the fields of a new song from a JSON object body.
+
+    Returns:
+        dict[str, Any]: The artist, title, year, genre and duration.
+
+    Raises:
+        RequestError: 415 if the body is not JSON; 400 if it is not an object
+            with every field set.
+    """
+    if not is_json(mimetype):
+        raise RequestError("Did not attempt to load JSON data because the request Content-Type was not "
+                           "'application/json'.", 415)
+    data = _load_json(body)
+    if not isinstance(data, dict):
+        raise RequestError('Invalid input, all fields are required with valid values')
+    song = {field: data.get(field) for field in SONG_FIELDS}
+    if (not song['artist'] or not song['title'] or song['year'] is None or not song['genre']
+            or song['duration'] is None):
+        raise RequestError('Invalid input, all fields are required with valid values')
+    return song
+
+def read_song_array(mimetype: str, body: bytes) -> list[Any]:
+    """
+    Reads the songs of a bulk import sent as a JSON array.
+
+    Callers read at most BULK_JSON_MAX_BYTES + 1 bytes of the body, so a
+    larger one is refused without being read whole.
+
+    Raises:
+        RequestError: 413 if the body is over BULK_JSON_MAX_BYTES; 400 if it
+            is not a JSON array.
+    """
+    if len(body) > BULK_JSON_MAX_BYTES:
+        raise RequestError(f'Request body too large, a JSON array may be at most {BULK_JSON_MAX_BYTES} bytes; '
+                           'send larger imports as CSV or NDJSON', 413)
+    records = _load_json(body) if is_json(mimetype) else None
+    if not isinstance(records, list):
+        raise RequestError('Invalid input, expected CSV, NDJSON or a JSON array of songs')
+    return records
+
+def read_compound_key(args: Mapping[str, str]) -> tuple[str, str, int]:
+    """
+    Reads the artist, title and year query parameters.
+
+    Raises:
+        RequestError: If one is missing or the year is not an integer.
+    """
+    artist = args.get('artist')
+    title = args.get('title')
+    year = args.get('year')
+    if not artist or not title or not year:
+        raise RequestError('Missing required query parameters: artist, title, year')
+    try:
+        return artist, title, int(year)
+    except ValueError:
+        raise RequestError('Year must be an integer')
+
+def read_sort_by_play_count(args: Mapping[str, str]) -> bool:
+    return args.get('sort_by_play_count', 'false').lower() == 'true'
+
+def read_page(args: Mapping[str, str]) -> Optional[tuple[int, Optional[str]]]:
+    """
+    Reads the limit and cursor query parameters of a catalog page.
+
+    Returns:
+        Optional[tuple[int, Optional[str]]]: The limit and cursor, or None if
+            neither was given and the whole catalog is wanted.
+
+    Raises:
+        RequestError: If the limit is not an integer.
+    """
+    if 'limit' not in args and 'cursor' not in args:
+        return None
+    try:
+        limit = int(args.get('limit', CATALOG_PAGE_DEFAULT_LIMIT))
+    except ValueError as e:
+        raise RequestError(str(e))
+    return limit, args.get('cursor')
@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_utils import DB_POOL_SIZE
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Threads that run database calls for asyncio code. Matching the connection pool
+# means a thread never waits for a connection; extra calls queue in the executor.
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", str(DB_POOL_SIZE)))
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats = {"calls": 0, "in_flight": 0}
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide database executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_THREADS, thread_name_prefix="db")
+                logger.info("Started database executor with %d threads", DB_EXECUTOR_THREADS)
+    return _executor
+
+def shutdown_db_executor() -> None:
+    """Waits for queued database calls, then stops the executor so the next call to get_db_executor() starts fresh."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking database call on the database executor and awaits its result.
+
+    The event loop keeps serving other requests while the call runs or waits
+    for a free thread.
+
+    Args:
+        func: The function to call, e.g. one of the song_model functions.
+        *args, **kwargs: Its arguments.
+
+    Returns:
+        Whatever func returns; exceptions it raises are raised here.
+    """
+    loop = asyncio.get_running_loop()
+    with _executor_lock:
+        _stats["calls"] += 1
+        _stats["in_flight"] += 1
+    try:
+        return await loop.run_in_executor(get_db_executor(), functools.partial(func, *args, **kwargs))
+    finally:
+        with _executor_lock:
+            _stats["in_flight"] -= 1
+
+def get_db_executor_stats() -> dict:
+    """Returns the executor size, calls made and calls queued or running."""
+    with _executor_lock:
+        return {"threads": DB_EXECUTOR_THREADS, **_stats}
@@ -0,0 +1,156 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+from typing import Any, AsyncIterable, IO, Iterable, Iterator, Optional
+
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+SONG_FIELDS = ("artist", "title", "year", "genre", "duration")
+
+# Request body chunks an upload may read ahead of the import, for AsyncChunkReader
+BULK_STREAM_QUEUE_CHUNKS = int(os.getenv("BULK_STREAM_QUEUE_CHUNKS", "16"))
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Parses CSV text one line at a time.
+
+    The first line must be a header naming at least the song fields.
+
+    Args:
+        lines (Iterable[str]): The CSV text, e.g. an open file.
+
+    Yields:
+        dict: One record per data row, with values as strings.
+
+    Raises:
+        ValueError: If the header is missing a song field.
+    """
+    reader = csv.DictReader(lines)
+    missing = [field for field in SONG_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing required columns: {', '.join(missing)}")
+    yield from reader
+
+def iter_ndjson_records(lines: Iterable[str]) -> Iterator[Any]:
+    """
+    Parses newline-delimited JSON one line at a time, skipping blank lines.
+
+    Args:
+        lines (Iterable[str]): The NDJSON text, e.g. an open file.
+
+    Yields:
+        Any: The parsed value of each line, or the raw line if it is not valid JSON
+            (so the caller can report it as an invalid row).
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+def iter_records(stream: IO, fmt: str) -> Iterator[Any]:
+    """
+    Parses a song catalog stream in the given format.
+
+    Args:
+        stream (IO): A text or binary stream; binary streams are decoded as UTF-8.
+        fmt (str): "csv" or "ndjson".
+
+    Yields:
+        Any: One record per row.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if fmt == "csv":
+        return iter_csv_records(text)
+    if fmt == "ndjson":
+        return iter_ndjson_records(text)
+    raise ValueError(f"Invalid format: {fmt}. Must be 'csv' or 'ndjson'.")
+
+
+class AsyncChunkReader(io.RawIOBase):
+    """
+    A blocking binary stream over chunks an event loop receives, for parsing an upload in a worker thread.
+
+    The loop runs feed(), which puts each chunk on a bounded queue, so at most
+    BULK_STREAM_QUEUE_CHUNKS chunks are held while the reader falls behind.
+    The reader must be read from a thread other than the loop's: each read
+    waits for the loop to hand over the next chunk.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_chunks: int = BULK_STREAM_QUEUE_CHUNKS):
+        super().__init__()
+        self._loop = loop
+        self._chunks: asyncio.Queue = asyncio.Queue(maxsize=max_chunks)
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._error: Optional[Exception] = None
+
+    async def feed(self, chunks: AsyncIterable[bytes]) -> None:
+        """
+        Puts every chunk on the queue, then the end of the stream.
+
+        An error reading the chunks, e.g. the client disconnecting, is raised
+        by the reader instead.
+        """
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    await self._chunks.put(chunk)
+        except Exception as e:
+            await self._chunks.put(e)
+            return
+        await self._chunks.put(b"")
+
+    def abort(self) -> None:
+        """
+        Makes the reader raise instead of waiting for chunks that will not come.
+
+        Call it on the loop once feed() is cancelled, so the thread reading
+        is never left blocked.
+        """
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+        self._chunks.put_nowait(ConnectionError("The upload ended before it was read"))
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            if self._eof:
+                return 0
+            chunk = self._next_chunk()
+            if not chunk:
+                self._eof = True
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def _next_chunk(self) -> bytes:
+        if self._error is None:
+            chunk = asyncio.run_coroutine_threadsafe(self._chunks.get(), self._loop).result()
+            if not isinstance(chunk, Exception):
+                return chunk
+            self._error = chunk
+        raise self._error
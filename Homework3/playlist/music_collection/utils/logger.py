@@ -1,26 +1,225 @@
+import atexit
+from collections import OrderedDict
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
 import sys
+import threading
+from typing import Optional
 
-from flask import current_app, has_request_context
 
+# The level of every logger set up by configure_logger()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Per-module overrides, e.g. "music_collection.utils.sql_utils=WARNING,music_collection.models=DEBUG";
+# a name also covers the modules under it, and the longest match wins
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# Keep 1 in N of each repeated DEBUG/INFO message from these modules, e.g.
+# "music_collection.models.playlist_model=100"; warnings and errors are always kept
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# Records waiting for the writer thread; beyond this, new records are dropped rather than waited on
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Message templates a SamplingFilter counts at once; the least recently seen is forgotten beyond this
+LOG_SAMPLE_MAX_TEMPLATES = 1000
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
+# Whether the server skips collecting the thread and process fields of every
+# record; see skip_unused_record_fields(). Off unless the server opts in.
+LOG_LEAN_RECORDS = os.getenv("LOG_LEAN_RECORDS", "false").lower() == "true"
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+def skip_unused_record_fields() -> None:
+    """
+    Stops every logger in the process from collecting the thread and process fields.
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+    LOG_FORMAT uses none of them, so this saves work on each record (see
+    "Optimization" in the logging HOWTO). It also applies to other libraries'
+    loggers, whose thread and process fields then stay empty, so the server
+    calls it only when LOG_LEAN_RECORDS is set. Only the documented switches
+    are used; records still look up their caller.
+    """
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+def parse_module_settings(spec: str) -> dict[str, str]:
+    """
+    Parses "module=value,module=value" into a dict.
+
+    Raises:
+        ValueError: If an entry has no "=".
+    """
+    settings = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, separator, value = entry.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid logging setting: {entry} (expected module=value)")
+        settings[name.strip()] = value.strip()
+    return settings
+
+def _lookup(settings: dict[str, str], name: str) -> Optional[str]:
+    """Returns the setting for a logger name or its nearest configured parent."""
+    while True:
+        if name in settings:
+            return settings[name]
+        if "." not in name:
+            return None
+        name = name.rsplit(".", 1)[0]
+
+def get_level(name: str) -> int:
+    """
+    Returns the level for a logger name from LOG_LEVELS, falling back to LOG_LEVEL.
+
+    Raises:
+        ValueError: If the level is not a logging level name.
+    """
+    level_name = (_lookup(parse_module_settings(LOG_LEVELS), name) or LOG_LEVEL).upper()
+    level = logging.getLevelName(level_name)
+    if not isinstance(level, int):
+        raise ValueError(f"Invalid log level: {level_name}")
+    return level
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through the first of every rate records with the same message template.
+
+    Records at WARNING and above always pass. Each template (the format string
+    before its arguments are filled in) is counted on its own, so a rare
+    message is not crowded out by a frequent one. Sampled call sites must pass
+    their values as arguments, not build the message with an f-string, or
+    every record is a template of its own.
+
+    At most max_templates templates are counted; the least recently seen one
+    is forgotten first, and starts again from its first record if it recurs.
+
+    Attributes:
+        rate (int): Keep 1 in rate records.
+        max_templates (int): The most templates counted at once.
+    """
+
+    def __init__(self, rate: int, max_templates: int = LOG_SAMPLE_MAX_TEMPLATES):
+        super().__init__()
+        if rate < 1:
+            raise ValueError(f"Invalid sample rate: {rate} (must be at least 1).")
+        self.rate = rate
+        self.max_templates = max_templates
+        self._counts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.pop(key, 0)
+            self._counts[key] = count + 1
+            if len(self._counts) > self.max_templates:
+                self._counts.popitem(last=False)
+        if count % self.rate == 0:
+            return True
+        _count("sampled_out")
+        return False
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """A QueueHandler that drops records when the queue is full instead of raising or blocking."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Fill in the arguments now, as they may change before the writer gets to them. The
+        # writer thread does the rest of the formatting, and the record is not copied.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _count("dropped")
+
+
+_lock = threading.Lock()
+_stats = {"dropped": 0, "sampled_out": 0}
+_queue: Optional[queue.Queue] = None
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+def _get_queue_handler() -> QueueHandler:
+    """Returns the shared queue handler, starting its writer thread on first use."""
+    global _queue, _queue_handler, _listener
+    if _queue_handler is None:
+        with _lock:
+            if _queue_handler is None:
+                _queue = queue.Queue(LOG_QUEUE_SIZE)
+                stream_handler = logging.StreamHandler(sys.stderr)
+                stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+                _listener = QueueListener(_queue, stream_handler, respect_handler_level=True)
+                _listener.start()
+                # Write out whatever is still queued when the process exits
+                atexit.register(flush_logging)
+                _queue_handler = _DroppingQueueHandler(_queue)
+    return _queue_handler
+
+def flush_logging(timeout: float = 5.0) -> bool:
+    """Waits up to timeout seconds for the writer thread to write every queued record. Returns whether it did."""
+    if _queue is None:
+        return True
+    with _queue.all_tasks_done:
+        return _queue.all_tasks_done.wait_for(lambda: not _queue.unfinished_tasks, timeout)
+
+def _restart_after_fork() -> None:
+    # The writer thread does not survive a fork, so the child gets its own
+    global _lock, _queue, _listener
+    _lock = threading.Lock()
+    if _queue_handler is not None:
+        _queue = queue.Queue(LOG_QUEUE_SIZE)
+        _listener = QueueListener(_queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+        _queue_handler.queue = _queue
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+def configure_logger(logger: logging.Logger) -> None:
+    """
+    Sends a logger's records to stderr through the shared background writer.
+
+    Callers only pay for putting a record on a queue; a single thread formats
+    and writes them. Safe to call any number of times on the same logger: the
+    handler and sampling filter are added once.
+
+    The level comes from LOG_LEVELS or LOG_LEVEL, and a LOG_SAMPLE_RATES entry
+    for the logger adds a SamplingFilter.
+
+    Args:
+        logger (logging.Logger): The logger to set up.
+
+    Raises:
+        ValueError: If a level or sample rate is invalid.
+    """
+    logger.setLevel(get_level(logger.name))
+
+    handler = _get_queue_handler()
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+
+    rate = _lookup(parse_module_settings(LOG_SAMPLE_RATES), logger.name)
+    if rate is not None and not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        try:
+            logger.addFilter(SamplingFilter(int(rate)))
+        except ValueError:
+            raise ValueError(f"Invalid sample rate for {logger.name}: {rate}")
+
+def get_logging_stats() -> dict:
+    """Returns the records waiting to be written, and how many were dropped on a full queue or sampled out."""
+    with _lock:
+        return {"pending": _queue.qsize() if _queue is not None else 0, "queue_size": LOG_QUEUE_SIZE, **_stats}
@@ -0,0 +1,100 @@
+"""
+A local stand-in for random.org's plain-text integers API.
+
+Point RANDOM_ORG_URL at it to pick random songs without network access:
+
+    python -m music_collection.utils.random_stub --port 8081 --seed 42
+    RANDOM_ORG_URL=http://localhost:8081 python app.py
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+
+class RandomStubServer(ThreadingHTTPServer):
+    """
+    Serves seeded random integers in random.org's response format.
+
+    Attributes:
+        delay (float): Seconds to wait before answering, to mimic a slow network.
+        requests_served (int): How many requests the server has answered.
+    """
+
+    daemon_threads = True
+    # Room for many clients connecting at once
+    request_queue_size = 1024
+
+    def __init__(self, port: int = 0, seed: int = 0, delay: float = 0):
+        super().__init__(("127.0.0.1", port), _RandomStubHandler)
+        self.delay = delay
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests_served = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "RandomStubServer":
+        """Serves requests from a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _RandomStubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/integers":
+            self.send_error(404)
+            return
+        params = parse_qs(url.query)
+        try:
+            num = int(params.get("num", ["1"])[0])
+            low = int(params["min"][0])
+            high = int(params["max"][0])
+        except (KeyError, ValueError):
+            self.send_error(400)
+            return
+
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.requests_served += 1
+            numbers = [str(self.server.rng.randint(low, high)) for _ in range(num)]
+
+        body = ("\n".join(numbers) + "\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local random.org stub")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--delay", type=float, default=0, help="Seconds to wait before each answer")
+    args = parser.parse_args()
+
+    server = RandomStubServer(port=args.port, seed=args.seed, delay=args.delay)
+    print(f"Serving random numbers on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
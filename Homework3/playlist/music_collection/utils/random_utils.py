@@ -1,4 +1,14 @@
+import asyncio
+from collections import deque
 import logging
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
 import requests
 
 from music_collection.utils.logger import configure_logger
@@ -7,6 +17,33 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Which source serves get_random_int(): "buffered" (bulk random.org fetches served
+# from memory, with a local fallback), "random_org" (one request per call) or "local".
+RANDOM_SOURCE = os.getenv("RANDOM_SOURCE", "buffered")
+RANDOM_ORG_URL = os.getenv("RANDOM_ORG_URL", "https://www.random.org")
+RANDOM_BATCH_SIZE = int(os.getenv("RANDOM_BATCH_SIZE", "1000"))
+RANDOM_LOW_WATERMARK = int(os.getenv("RANDOM_LOW_WATERMARK", "100"))
+# Seconds after a failed fetch during which the buffered source serves its fallback without fetching
+RANDOM_FETCH_BACKOFF = float(os.getenv("RANDOM_FETCH_BACKOFF", "30"))
+# Seeds the local source; when unset the local source draws from secrets.SystemRandom
+RANDOM_SEED = os.getenv("RANDOM_SEED")
+
+# Buffered integers are drawn uniformly from [0, RANDOM_INT_RANGE), random.org's widest range
+RANDOM_INT_RANGE = 1_000_000_000
+
+# Seconds to wait for random.org
+RANDOM_ORG_TIMEOUT = 5
+# Requests the async client sends to random.org at once; the rest wait their turn
+RANDOM_ORG_MAX_CONNECTIONS = int(os.getenv("RANDOM_ORG_MAX_CONNECTIONS", "100"))
+# Largest random.org response the async client reads; a batch of 1000 numbers is about 10 KB
+RANDOM_ORG_MAX_RESPONSE = 1024 * 1024
+
+# The async client of the event loop that created it, and its free request slots; see _get_async_client()
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_slots: Optional[asyncio.Semaphore] = None
+
+
 def get_random(num_songs: int) -> int:
     """
     Fetches a random int between 1 and the number of songs in the catalog from random.org.
@@ -18,13 +55,13 @@ def get_random(num_songs: int) -> int:
         RuntimeError: If the request to random.org fails or returns an invalid response.
         ValueError: If the response from random.org is not a valid float.
     """
-    url = f"https://www.random.org/integers/?num=1&min=1&max={num_songs}&col=1&base=10&format=plain&rnd=new"
+    url = f"{RANDOM_ORG_URL}/integers/?num=1&min=1&max={num_songs}&col=1&base=10&format=plain&rnd=new"
 
     try:
         # Log the request to random.org
         logger.info("Fetching random number from %s", url)
 
-        response = requests.get(url, timeout=5)
+        response = requests.get(url, timeout=RANDOM_ORG_TIMEOUT)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -46,3 +83,428 @@ def get_random(num_songs: int) -> int:
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+def _random_integers_url(num: int) -> str:
+    return (f"{RANDOM_ORG_URL}/integers/?num={num}&min=0&max={RANDOM_INT_RANGE - 1}"
+            f"&col=1&base=10&format=plain&rnd=new")
+
+def _parse_random_integers(text: str, num: int) -> list[int]:
+    try:
+        random_numbers = [int(value) for value in text.split()]
+    except ValueError:
+        raise ValueError("Invalid response from random.org: %s" % text.strip())
+    if len(random_numbers) != num:
+        raise ValueError("Invalid response from random.org: expected %d numbers, got %d" % (num, len(random_numbers)))
+    return random_numbers
+
+def fetch_random_integers(num: int) -> list[int]:
+    """
+    Fetches a batch of random ints in [0, RANDOM_INT_RANGE) from random.org.
+
+    Args:
+        num (int): How many numbers to fetch.
+
+    Returns:
+        list[int]: The random numbers fetched from random.org.
+
+    Raises:
+        RuntimeError: If the request to random.org fails.
+        ValueError: If the response from random.org is not a list of num integers.
+    """
+    url = _random_integers_url(num)
+
+    try:
+        logger.info("Fetching %d random numbers from %s", num, url)
+
+        response = requests.get(url, timeout=RANDOM_ORG_TIMEOUT)
+        response.raise_for_status()
+
+        random_numbers = _parse_random_integers(response.text, num)
+        logger.info("Received %d random numbers", len(random_numbers))
+        return random_numbers
+
+    except requests.exceptions.Timeout:
+        logger.error("Request to random.org timed out.")
+        raise RuntimeError("Request to random.org timed out.")
+
+    except requests.exceptions.RequestException as e:
+        logger.error("Request to random.org failed: %s", e)
+        raise RuntimeError("Request to random.org failed: %s" % e)
+
+def _get_async_client() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    """
+    Returns the HTTP client for the running event loop, so concurrent requests share its connections.
+
+    Requests hold one of the RANDOM_ORG_MAX_CONNECTIONS slots while they run.
+    Waiting on the semaphore rather than on httpx's connection pool keeps the
+    pool's bookkeeping small, which costs a lot of CPU once thousands of
+    requests are queued in it.
+    """
+    global _async_client, _async_client_loop, _async_slots
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        # Like requests, follow redirects and take proxies from the environment
+        _async_client = httpx.AsyncClient(
+            timeout=RANDOM_ORG_TIMEOUT, follow_redirects=True, trust_env=True,
+            limits=httpx.Limits(max_connections=RANDOM_ORG_MAX_CONNECTIONS, max_keepalive_connections=20))
+        _async_client_loop = loop
+        _async_slots = asyncio.Semaphore(RANDOM_ORG_MAX_CONNECTIONS)
+    return _async_client, _async_slots
+
+async def close_async_client() -> None:
+    """Closes the HTTP client of the running event loop, e.g. when the server shuts down."""
+    global _async_client, _async_client_loop, _async_slots
+    if _async_client is not None and _async_client_loop is asyncio.get_running_loop():
+        await _async_client.aclose()
+        _async_client = _async_client_loop = _async_slots = None
+
+async def _get_text_async(url: str) -> str:
+    """
+    GETs a random.org URL and returns the body, reading at most RANDOM_ORG_MAX_RESPONSE bytes.
+
+    Raises:
+        RuntimeError: If the request fails, times out or answers with an error status.
+        ValueError: If the response is larger than RANDOM_ORG_MAX_RESPONSE.
+    """
+    client, slots = _get_async_client()
+    try:
+        async with slots, client.stream("GET", url) as response:
+            response.raise_for_status()
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > RANDOM_ORG_MAX_RESPONSE:
+                    raise ValueError("Invalid response from random.org: more than %d bytes" % RANDOM_ORG_MAX_RESPONSE)
+            return body.decode(response.encoding or "utf-8")
+
+    except httpx.TimeoutException:
+        logger.error("Request to random.org timed out.")
+        raise RuntimeError("Request to random.org timed out.")
+
+    except httpx.HTTPError as e:
+        logger.error("Request to random.org failed: %s", e)
+        raise RuntimeError("Request to random.org failed: %s" % e)
+
+async def get_random_async(num_songs: int) -> int:
+    """
+    Like get_random(), but waits for random.org without blocking the event loop.
+
+    Raises:
+        RuntimeError: If the request to random.org fails or times out.
+        ValueError: If the response from random.org is not a valid int.
+    """
+    url = f"{RANDOM_ORG_URL}/integers/?num=1&min=1&max={num_songs}&col=1&base=10&format=plain&rnd=new"
+    logger.info("Fetching random number from %s", url)
+    text = await _get_text_async(url)
+
+    try:
+        random_number = int(text.strip())
+    except ValueError:
+        raise ValueError("Invalid response from random.org: %s" % text.strip())
+    logger.info("Received random number: %d", random_number)
+    return random_number
+
+async def fetch_random_integers_async(num: int) -> list[int]:
+    """
+    Like fetch_random_integers(), but waits for random.org without blocking the event loop.
+
+    Raises:
+        RuntimeError: If the request to random.org fails or times out.
+        ValueError: If the response from random.org is not a list of num integers.
+    """
+    url = _random_integers_url(num)
+    logger.info("Fetching %d random numbers from %s", num, url)
+    text = await _get_text_async(url)
+
+    random_numbers = _parse_random_integers(text, num)
+    logger.info("Received %d random numbers", len(random_numbers))
+    return random_numbers
+
+
+class RandomOrgSource:
+    """Asks random.org for every number with its own request."""
+
+    def randint(self, max_value: int) -> int:
+        return get_random(max_value)
+
+    async def arandint(self, max_value: int) -> int:
+        return await get_random_async(max_value)
+
+    def stats(self) -> dict:
+        return {"source": "random_org"}
+
+
+class LocalRandomSource:
+    """
+    Draws numbers locally.
+
+    Attributes:
+        seed (Optional[int]): Makes the sequence deterministic when set;
+            otherwise numbers come from the OS generator.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._rng = random.Random(seed) if seed is not None else secrets.SystemRandom()
+        self._lock = threading.Lock()
+
+    def randint(self, max_value: int) -> int:
+        with self._lock:
+            return self._rng.randint(1, max_value)
+
+    async def arandint(self, max_value: int) -> int:
+        return self.randint(max_value)
+
+    def stats(self) -> dict:
+        return {"source": "local", "seeded": self.seed is not None}
+
+
+class _BackingOff(RuntimeError):
+    """Raised instead of fetching while a buffered source waits out the backoff after a failed fetch."""
+
+
+class BufferedRandomSource:
+    """
+    Serves ints from an in-memory buffer of random.org numbers refilled in bulk.
+
+    The buffer holds uniform draws from [0, RANDOM_INT_RANGE) so it does not
+    depend on the catalog size; randint() maps them onto [1, max_value] by
+    rejection sampling, which keeps every value equally likely.
+
+    When the buffer drops below the low watermark a background thread fetches
+    the next batch. If the buffer runs dry, one caller fetches while the others
+    wait for its batch. If that fetch fails, numbers come from the fallback
+    source instead of failing the caller, and for the next backoff seconds
+    every caller is served from the fallback without fetching again.
+
+    arandint() is the asyncio flavour: when the buffer runs dry it awaits
+    afetch instead of blocking, and concurrent callers share one fetch.
+
+    Attributes:
+        fetch (Callable[[int], list[int]]): Fetches a batch of numbers.
+        batch_size (int): How many numbers to fetch at a time.
+        low_watermark (int): The buffer size that triggers a background refill.
+        fallback (Optional[LocalRandomSource]): Serves numbers when fetching fails.
+        afetch (Optional[Callable[[int], Awaitable[list[int]]]]): Fetches a batch for arandint();
+            without it arandint() fetches with fetch on a worker thread.
+        backoff (float): Seconds after a failed fetch before fetching again.
+    """
+
+    def __init__(self, fetch: Callable[[int], list[int]], batch_size: int = 1000,
+                 low_watermark: int = 100, fallback: Optional[LocalRandomSource] = None,
+                 afetch: Optional[Callable[[int], Awaitable[list[int]]]] = None, backoff: float = 30.0):
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch size: {batch_size} (must be at least 1).")
+        self.fetch = fetch
+        self.afetch = afetch
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+        self.fallback = fallback
+        self.backoff = backoff
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        # Notified when a synchronous or background fetch ends, successful or not
+        self._fetched = threading.Condition(self._lock)
+        self._refilling = False
+        self._retry_at = 0.0
+        self._last_error: Optional[Exception] = None
+        self._afill_task: Optional[asyncio.Future] = None
+        self._stats = {"served": 0, "rejected": 0, "fetches": 0, "fetch_failures": 0, "fallbacks": 0}
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    def _check_backoff(self) -> None:
+        if self._backing_off():
+            raise _BackingOff(f"Not fetching random numbers for {self._retry_at - time.monotonic():.0f}s "
+                              f"after a failed fetch: {self._last_error}")
+
+    def _fetch_failed(self, error: Exception) -> None:
+        with self._lock:
+            self._stats["fetch_failures"] += 1
+            self._last_error = error
+            self._retry_at = time.monotonic() + self.backoff
+
+    def _fill(self) -> None:
+        """Fetches a batch; the caller has set _refilling, which this clears."""
+        try:
+            numbers = self.fetch(self.batch_size)
+        except (RuntimeError, ValueError) as e:
+            self._fetch_failed(e)
+            raise
+        else:
+            with self._lock:
+                self._buffer.extend(numbers)
+                self._stats["fetches"] += 1
+        finally:
+            with self._lock:
+                self._refilling = False
+                self._fetched.notify_all()
+
+    def _fill_or_wait(self) -> None:
+        """Refills the dry buffer, or waits for the fetch another thread has under way."""
+        with self._lock:
+            while self._refilling and not self._buffer:
+                self._fetched.wait()
+            if self._buffer:
+                return
+            self._check_backoff()
+            self._refilling = True
+        self._fill()
+
+    async def _afill_once(self) -> None:
+        try:
+            if self.afetch is not None:
+                numbers = await self.afetch(self.batch_size)
+            else:
+                numbers = await asyncio.get_running_loop().run_in_executor(None, self.fetch, self.batch_size)
+        except (RuntimeError, ValueError) as e:
+            self._fetch_failed(e)
+            raise
+        with self._lock:
+            self._buffer.extend(numbers)
+            self._stats["fetches"] += 1
+
+    async def _afill(self) -> None:
+        with self._lock:
+            self._check_backoff()
+        # Callers that find the buffer dry while a fetch is under way wait for that fetch
+        task = self._afill_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._afill_task = asyncio.ensure_future(self._afill_once())
+        await asyncio.shield(task)
+
+    def _refill_in_background(self) -> None:
+        try:
+            self._fill()
+        except (RuntimeError, ValueError) as e:
+            logger.warning("Background refill of random numbers failed: %s", e)
+
+    def _pop(self) -> Optional[int]:
+        with self._lock:
+            if not self._buffer:
+                return None
+            value = self._buffer.popleft()
+            if len(self._buffer) < self.low_watermark and not self._refilling and not self._backing_off():
+                self._refilling = True
+                threading.Thread(target=self._refill_in_background, daemon=True).start()
+            return value
+
+    def _draw(self, max_value: int) -> Optional[int]:
+        """Maps buffered numbers onto [1, max_value]; returns None once the buffer runs dry."""
+        if max_value < 1 or max_value > RANDOM_INT_RANGE:
+            raise ValueError(f"Invalid range: 1 to {max_value}")
+
+        # Values at or above limit would make the low residues more likely
+        limit = RANDOM_INT_RANGE - RANDOM_INT_RANGE % max_value
+        while True:
+            value = self._pop()
+            if value is None:
+                return None
+            if value < limit:
+                with self._lock:
+                    self._stats["served"] += 1
+                return value % max_value + 1
+            with self._lock:
+                self._stats["rejected"] += 1
+
+    def _fall_back(self, max_value: int, error: Exception) -> int:
+        if self.fallback is None:
+            raise error
+        # The failure itself was logged once; callers during the backoff are not
+        if not isinstance(error, _BackingOff):
+            logger.warning("Using local random numbers, fetch failed: %s", error)
+        with self._lock:
+            self._stats["fallbacks"] += 1
+        return self.fallback.randint(max_value)
+
+    def randint(self, max_value: int) -> int:
+        while True:
+            value = self._draw(max_value)
+            if value is not None:
+                return value
+            # The buffer ran dry: fetch synchronously, or fall back to local numbers
+            try:
+                self._fill_or_wait()
+            except (RuntimeError, ValueError) as e:
+                return self._fall_back(max_value, e)
+
+    async def arandint(self, max_value: int) -> int:
+        while True:
+            value = self._draw(max_value)
+            if value is not None:
+                return value
+            try:
+                await self._afill()
+            except (RuntimeError, ValueError) as e:
+                return self._fall_back(max_value, e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"source": "buffered", "buffered": len(self._buffer), **self._stats}
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def create_random_source(name: str):
+    """
+    Builds a random source by name.
+
+    Args:
+        name (str): "buffered", "random_org" or "local".
+
+    Raises:
+        ValueError: If the source name is unknown.
+    """
+    seed = int(RANDOM_SEED) if RANDOM_SEED is not None else None
+    if name == "buffered":
+        return BufferedRandomSource(fetch_random_integers, batch_size=RANDOM_BATCH_SIZE,
+                                    low_watermark=RANDOM_LOW_WATERMARK, fallback=LocalRandomSource(seed),
+                                    afetch=fetch_random_integers_async, backoff=RANDOM_FETCH_BACKOFF)
+    if name == "random_org":
+        return RandomOrgSource()
+    if name == "local":
+        return LocalRandomSource(seed)
+    raise ValueError(f"Invalid random source: {name}. Must be 'buffered', 'random_org' or 'local'.")
+
+def get_random_source():
+    """Returns the process-wide random source, creating it from RANDOM_SOURCE on first use."""
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                _source = create_random_source(RANDOM_SOURCE)
+                logger.info("Using %s random source", RANDOM_SOURCE)
+    return _source
+
+def set_random_source(source) -> None:
+    """Replaces the process-wide random source, e.g. with a seeded local one."""
+    global _source
+    with _source_lock:
+        _source = source
+
+def get_random_int(max_value: int) -> int:
+    """
+    Draws a random int between 1 and max_value from the process-wide source.
+
+    Args:
+        max_value (int): The largest value to return.
+
+    Returns:
+        int: A uniformly distributed int in [1, max_value].
+    """
+    return get_random_source().randint(max_value)
+
+async def get_random_int_async(max_value: int) -> int:
+    """
+    Like get_random_int(), but any wait for random.org yields to the event loop.
+
+    Args:
+        max_value (int): The largest value to return.
+
+    Returns:
+        int: A uniformly distributed int in [1, max_value].
+    """
+    return await get_random_source().arandint(max_value)
@@ -0,0 +1,356 @@
+from collections.abc import MutableSequence
+import random
+from typing import Any, Iterable, Iterator, Optional, Protocol, Union
+
+
+class Track(Protocol):
+    id: int
+    duration: int  # in seconds
+
+
+class _Node:
+    __slots__ = ("track", "priority", "left", "right", "parent", "size", "total")
+
+    def __init__(self, track: Track, priority: float):
+        self.track = track
+        self.priority = priority
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.parent: Optional["_Node"] = None
+        self.size = 1
+        self.total = track.duration
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+def _total(node: Optional[_Node]) -> int:
+    return node.total if node is not None else 0
+
+def _update(node: _Node) -> None:
+    # Recomputes the subtree aggregates and re-parents the children
+    node.size = 1 + _size(node.left) + _size(node.right)
+    node.total = node.track.duration + _total(node.left) + _total(node.right)
+    if node.left is not None:
+        node.left.parent = node
+    if node.right is not None:
+        node.right.parent = node
+
+def _split(node: Optional[_Node], count: int) -> tuple[Optional[_Node], Optional[_Node]]:
+    # Splits a subtree into its first count nodes and the rest
+    if node is None:
+        return None, None
+    if _size(node.left) >= count:
+        left, node.left = _split(node.left, count)
+        _update(node)
+        return left, node
+    node.right, right = _split(node.right, count - _size(node.left) - 1)
+    _update(node)
+    return node, right
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    # Concatenates two subtrees, keeping the higher priority on top
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class TrackList(MutableSequence):
+    """
+    An ordered list of tracks with a unique-id index, for very long playlists.
+
+    Behaves like a list of tracks (indexing, slicing reads, len, iteration,
+    append/extend/insert/remove/del). Tracks are stored in an implicit treap,
+    a randomized balanced tree ordered by position, so reading, inserting,
+    removing and moving a track by position or by id take O(log n) time
+    instead of the O(n) shifts and scans of a list. An id -> node index makes
+    membership and lookup by id constant time, and parent pointers give a
+    track's position by walking up to the root.
+
+    Each node also sums the durations in its subtree, so the total duration
+    is O(1), and the time at which a track starts, or the track playing at a
+    given time, are O(log n).
+
+    Every track must have an ``id`` that is unique within the list, and a
+    ``duration`` in seconds.
+    """
+
+    def __init__(self, tracks: Iterable[Track] = (), seed: Optional[int] = None):
+        self._root: Optional[_Node] = None
+        self._by_id: dict[int, _Node] = {}
+        self._random = random.Random(seed).random
+        self.extend(tracks)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __iter__(self) -> Iterator[Track]:
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.track
+            node = node.right
+
+    def _position(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("TrackList index out of range")
+        return index
+
+    def _node_at(self, index: int) -> _Node:
+        index = self._position(index)
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def _rank(self, node: _Node) -> int:
+        rank = _size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                rank += _size(node.parent.left) + 1
+            node = node.parent
+        return rank
+
+    def _refresh(self, node: _Node) -> None:
+        # Recomputes the aggregates from a changed node up to the root
+        while node is not None:
+            _update(node)
+            node = node.parent
+
+    def _insert_node(self, index: int, node: _Node) -> None:
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, node), right)
+        self._root.parent = None
+
+    def _delete_at(self, index: int) -> _Node:
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        if self._root is not None:
+            self._root.parent = None
+        node.parent = None
+        return node
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self._node_at(i).track for i in range(len(self))[index]]
+        return self._node_at(index).track
+
+    def __setitem__(self, index: int, track: Track) -> None:
+        if isinstance(index, slice):
+            raise TypeError("TrackList does not support slice assignment")
+        node = self._node_at(index)
+        if track.id != node.track.id and track.id in self._by_id:
+            raise ValueError(f"Track with id {track.id} is already in the list")
+        del self._by_id[node.track.id]
+        node.track = track
+        self._by_id[track.id] = node
+        self._refresh(node)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        if isinstance(index, slice):
+            # Delete from the back so earlier positions stay put
+            for position in sorted(range(len(self))[index], reverse=True):
+                del self[position]
+            return
+        node = self._delete_at(self._position(index))
+        del self._by_id[node.track.id]
+
+    def insert(self, index: int, track: Track) -> None:
+        if track.id in self._by_id:
+            raise ValueError(f"Track with id {track.id} is already in the list")
+        # Clamp like list.insert
+        length = len(self)
+        if index < 0:
+            index = max(0, index + length)
+        node = _Node(track, self._random())
+        self._insert_node(min(index, length), node)
+        self._by_id[track.id] = node
+
+    def extend(self, tracks: Iterable[Track]) -> None:
+        """Appends tracks, building them into a treap in linear time."""
+        tracks = list(tracks)
+        new_ids = set()
+        for track in tracks:
+            if track.id in self._by_id or track.id in new_ids:
+                raise ValueError(f"Track with id {track.id} is already in the list")
+            new_ids.add(track.id)
+
+        # The stack holds the right spine of the treap built so far
+        stack: list[_Node] = []
+        for track in tracks:
+            node = _Node(track, self._random())
+            self._by_id[track.id] = node
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+                _update(last)
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        if not stack:
+            return
+        built = stack[0]
+        while stack:
+            _update(stack.pop())
+
+        built.parent = None
+        self._root = _merge(self._root, built)
+        self._root.parent = None
+
+    def clear(self) -> None:
+        self._root = None
+        self._by_id.clear()
+
+    def __contains__(self, track: object) -> bool:
+        node = self._by_id.get(getattr(track, "id", None))
+        return node is not None and node.track == track
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TrackList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TrackList({list(self)!r})"
+
+    def contains_id(self, track_id: int) -> bool:
+        """Returns whether a track with this id is in the list."""
+        return track_id in self._by_id
+
+    def get_by_id(self, track_id: int) -> Track:
+        """
+        Returns the track with this id.
+
+        Raises:
+            KeyError: If no track has this id.
+        """
+        return self._by_id[track_id].track
+
+    def index_of(self, track_id: int) -> int:
+        """
+        Returns the 0-based position of the track with this id.
+
+        Raises:
+            KeyError: If no track has this id.
+        """
+        return self._rank(self._by_id[track_id])
+
+    def remove_id(self, track_id: int) -> Track:
+        """
+        Removes the track with this id and returns it.
+
+        Raises:
+            KeyError: If no track has this id.
+        """
+        node = self._delete_at(self._rank(self._by_id[track_id]))
+        del self._by_id[track_id]
+        return node.track
+
+    def move(self, track_id: int, index: int) -> None:
+        """
+        Moves the track with this id to a 0-based position, shifting the tracks in between.
+
+        Raises:
+            KeyError: If no track has this id.
+            IndexError: If the position is out of range.
+        """
+        node = self._by_id[track_id]
+        if not 0 <= index < len(self):
+            raise IndexError(f"Track position out of range: {index}")
+        self._delete_at(self._rank(node))
+        node.left = node.right = None
+        _update(node)
+        self._insert_node(index, node)
+
+    def swap(self, track_id_1: int, track_id_2: int) -> None:
+        """
+        Swaps the positions of two tracks.
+
+        Raises:
+            KeyError: If either id is not in the list.
+        """
+        node_1 = self._by_id[track_id_1]
+        node_2 = self._by_id[track_id_2]
+        node_1.track, node_2.track = node_2.track, node_1.track
+        self._by_id[track_id_1], self._by_id[track_id_2] = node_2, node_1
+        self._refresh(node_1)
+        self._refresh(node_2)
+
+    @property
+    def total_duration(self) -> int:
+        """The sum of all track durations, in seconds."""
+        return _total(self._root)
+
+    def start_time(self, index: int) -> int:
+        """
+        Returns when the track at a 0-based position starts, i.e. the total
+        duration of the tracks before it. Position len() gives the total duration.
+
+        Raises:
+            IndexError: If the position is out of range.
+        """
+        if not 0 <= index <= len(self):
+            raise IndexError(f"Track position out of range: {index}")
+        elapsed = 0
+        node = self._root
+        while node is not None:
+            left_size = _size(node.left)
+            if index <= left_size:
+                node = node.left
+            else:
+                elapsed += _total(node.left) + node.track.duration
+                index -= left_size + 1
+                node = node.right
+        return elapsed
+
+    def seek(self, seconds: int) -> tuple[int, int]:
+        """
+        Finds the track playing at a time, counted from the start of the list.
+
+        Args:
+            seconds (int): The playback time, from 0 up to (not including) the total duration.
+
+        Returns:
+            tuple[int, int]: The 0-based position of the track and the offset into it, in seconds.
+
+        Raises:
+            ValueError: If the time is negative or not before the end of the list.
+        """
+        if not 0 <= seconds < self.total_duration:
+            raise ValueError(f"Invalid playback time: {seconds} (must be between 0 and {self.total_duration - 1}).")
+        index = 0
+        node = self._root
+        while True:
+            if seconds < _total(node.left):
+                node = node.left
+                continue
+            seconds -= _total(node.left)
+            index += _size(node.left)
+            if seconds < node.track.duration:
+                return index, seconds
+            seconds -= node.track.duration
+            index += 1
+            node = node.right
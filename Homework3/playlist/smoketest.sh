@@ -25,7 +25,7 @@ done
 # Function to check the health of the service
 check_health() {
   echo "Checking health status..."
-  curl -s -X GET "$BASE_URL/health" | grep -q '"status": "healthy"'
+  curl -s -X GET "$BASE_URL/health" | grep -q '"status": *"healthy"'
   if [ $? -eq 0 ]; then
     echo "Service is healthy."
   else
@@ -37,7 +37,7 @@ check_health() {
 # Function to check the database connection
 check_db() {
   echo "Checking database connection..."
-  curl -s -X GET "$BASE_URL/db-check" | grep -q '"database_status": "healthy"'
+  curl -s -X GET "$BASE_URL/db-check" | grep -q '"database_status": *"healthy"'
   if [ $? -eq 0 ]; then
     echo "Database connection is healthy."
   else
@@ -55,7 +55,7 @@ check_db() {
 
 clear_catalog() {
   echo "Clearing the playlist..."
-  curl -s -X DELETE "$BASE_URL/clear-catalog" | grep -q '"status": "success"'
+  curl -s -X DELETE "$BASE_URL/clear-catalog" | grep -q '"status": *"success"'
 }
 
 create_song() {
@@ -67,7 +67,7 @@ create_song() {
 
   echo "Adding song ($artist - $title, $year) to the playlist..."
   curl -s -X POST "$BASE_URL/create-song" -H "Content-Type: application/json" \
-    -d "{\"artist\":\"$artist\", \"title\":\"$title\", \"year\":$year, \"genre\":\"$genre\", \"duration\":$duration}" | grep -q '"status": "success"'
+    -d "{\"artist\":\"$artist\", \"title\":\"$title\", \"year\":$year, \"genre\":\"$genre\", \"duration\":$duration}" | grep -q '"status": *"success"'
 
   if [ $? -eq 0 ]; then
     echo "Song added successfully."
@@ -82,7 +82,7 @@ delete_song_by_id() {
 
   echo "Deleting song by ID ($song_id)..."
   response=$(curl -s -X DELETE "$BASE_URL/delete-song/$song_id")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song deleted successfully by ID ($song_id)."
   else
     echo "Failed to delete song by ID ($song_id)."
@@ -93,7 +93,7 @@ delete_song_by_id() {
 get_all_songs() {
   echo "Getting all songs in the playlist..."
   response=$(curl -s -X GET "$BASE_URL/get-all-songs-from-catalog")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "All songs retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Songs JSON:"
@@ -110,7 +110,7 @@ get_song_by_id() {
 
   echo "Getting song by ID ($song_id)..."
   response=$(curl -s -X GET "$BASE_URL/get-song-from-catalog-by-id/$song_id")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song retrieved successfully by ID ($song_id)."
     if [ "$ECHO_JSON" = true ]; then
       echo "Song JSON (ID $song_id):"
@@ -129,7 +129,7 @@ get_song_by_compound_key() {
 
   echo "Getting song by compound key (Artist: '$artist', Title: '$title', Year: $year)..."
   response=$(curl -s -X GET "$BASE_URL/get-song-from-catalog-by-compound-key?artist=$(echo $artist | sed 's/ /%20/g')&title=$(echo $title | sed 's/ /%20/g')&year=$year")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song retrieved successfully by compound key."
     if [ "$ECHO_JSON" = true ]; then
       echo "Song JSON (by compound key):"
@@ -144,7 +144,7 @@ get_song_by_compound_key() {
 get_random_song() {
   echo "Getting a random song from the catalog..."
   response=$(curl -s -X GET "$BASE_URL/get-random-song")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Random song retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Random Song JSON:"
@@ -173,7 +173,7 @@ add_song_to_playlist() {
     -H "Content-Type: application/json" \
     -d "{\"artist\":\"$artist\", \"title\":\"$title\", \"year\":$year}")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song added to playlist successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Song JSON:"
@@ -195,7 +195,7 @@ remove_song_from_playlist() {
     -H "Content-Type: application/json" \
     -d "{\"artist\":\"$artist\", \"title\":\"$title\", \"year\":$year}")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song removed from playlist successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Song JSON:"
@@ -221,11 +221,58 @@ remove_song_by_track_number() {
   fi
 }
 
+create_playlist() {
+  name=$1
+  echo "Creating playlist ($name)..."
+  response=$(curl -s -X POST "$BASE_URL/create-playlist" -H "Content-Type: application/json" \
+    -d "{\"name\":\"$name\"}")
+
+  if echo "$response" | grep -q '"status": *"success"'; then
+    playlist_id=$(echo "$response" | sed -n 's/.*"playlist_id": *\([0-9]*\).*/\1/p')
+    echo "Playlist created successfully with ID $playlist_id."
+  else
+    echo "Failed to create playlist."
+    exit 1
+  fi
+}
+
+add_song_to_named_playlist() {
+  playlist_id=$1
+  artist=$2
+  title=$3
+  year=$4
+
+  echo "Adding song ($artist - $title, $year) to playlist $playlist_id..."
+  response=$(curl -s -X POST "$BASE_URL/add-song-to-playlist?playlist_id=$playlist_id" \
+    -H "Content-Type: application/json" \
+    -d "{\"artist\":\"$artist\", \"title\":\"$title\", \"year\":$year}")
+
+  if echo "$response" | grep -q '"status": *"success"'; then
+    echo "Song added to playlist $playlist_id successfully."
+  else
+    echo "Failed to add song to playlist $playlist_id."
+    exit 1
+  fi
+}
+
+delete_playlist() {
+  playlist_id=$1
+  echo "Deleting playlist ($playlist_id)..."
+  response=$(curl -s -X DELETE "$BASE_URL/delete-playlist/$playlist_id")
+
+  if echo "$response" | grep -q '"status": *"success"'; then
+    echo "Playlist deleted successfully."
+  else
+    echo "Failed to delete playlist."
+    exit 1
+  fi
+}
+
 clear_playlist() {
   echo "Clearing playlist..."
   response=$(curl -s -X POST "$BASE_URL/clear-playlist")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Playlist cleared successfully."
   else
     echo "Failed to clear playlist."
@@ -244,7 +291,7 @@ play_current_song() {
   echo "Playing current song..."
   response=$(curl -s -X POST "$BASE_URL/play-current-song")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Current song is now playing."
   else
     echo "Failed to play current song."
@@ -256,7 +303,7 @@ rewind_playlist() {
   echo "Rewinding playlist..."
   response=$(curl -s -X POST "$BASE_URL/rewind-playlist")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Playlist rewound successfully."
   else
     echo "Failed to rewind playlist."
@@ -268,7 +315,7 @@ get_all_songs_from_playlist() {
   echo "Retrieving all songs from playlist..."
   response=$(curl -s -X GET "$BASE_URL/get-all-songs-from-playlist")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "All songs retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Songs JSON:"
@@ -285,7 +332,7 @@ get_song_from_playlist_by_track_number() {
   echo "Retrieving song by track number ($track_number)..."
   response=$(curl -s -X GET "$BASE_URL/get-song-from-playlist-by-track-number/$track_number")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song retrieved successfully by track number."
     if [ "$ECHO_JSON" = true ]; then
       echo "Song JSON:"
@@ -301,7 +348,7 @@ get_current_song() {
   echo "Retrieving current song..."
   response=$(curl -s -X GET "$BASE_URL/get-current-song")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Current song retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Current Song JSON:"
@@ -317,7 +364,7 @@ get_playlist_length_duration() {
   echo "Retrieving playlist length and duration..."
   response=$(curl -s -X GET "$BASE_URL/get-playlist-length-duration")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Playlist length and duration retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Playlist Info JSON:"
@@ -329,12 +376,29 @@ get_playlist_length_duration() {
   fi
 }
 
+seek() {
+  seconds=$1
+  echo "Seeking to $seconds seconds into the playlist..."
+  response=$(curl -s -X GET "$BASE_URL/seek?seconds=$seconds")
+
+  if echo "$response" | grep -q '"status": *"success"'; then
+    echo "Seek successful."
+    if [ "$ECHO_JSON" = true ]; then
+      echo "Seek JSON:"
+      echo "$response" | jq .
+    fi
+  else
+    echo "Failed to seek."
+    exit 1
+  fi
+}
+
 go_to_track_number() {
   track_number=$1
   echo "Going to track number ($track_number)..."
   response=$(curl -s -X POST "$BASE_URL/go-to-track-number/$track_number")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Moved to track number ($track_number) successfully."
   else
     echo "Failed to move to track number ($track_number)."
@@ -344,7 +408,7 @@ go_to_track_number() {
 
 play_entire_playlist() {
   echo "Playing entire playlist..."
-  curl -s -X POST "$BASE_URL/play-entire-playlist" | grep -q '"status": "success"'
+  curl -s -X POST "$BASE_URL/play-entire-playlist" | grep -q '"status": *"success"'
   if [ $? -eq 0 ]; then
     echo "Entire playlist played successfully."
   else
@@ -356,7 +420,7 @@ play_entire_playlist() {
 # Function to play the rest of the playlist
 play_rest_of_playlist() {
   echo "Playing rest of the playlist..."
-  curl -s -X POST "$BASE_URL/play-rest-of-playlist" | grep -q '"status": "success"'
+  curl -s -X POST "$BASE_URL/play-rest-of-playlist" | grep -q '"status": *"success"'
   if [ $? -eq 0 ]; then
     echo "Rest of playlist played successfully."
   else
@@ -381,7 +445,7 @@ move_song_to_beginning() {
     -H "Content-Type: application/json" \
     -d "{\"artist\": \"$artist\", \"title\": \"$title\", \"year\": $year}")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song moved to the beginning successfully."
   else
     echo "Failed to move song to the beginning."
@@ -399,7 +463,7 @@ move_song_to_end() {
     -H "Content-Type: application/json" \
     -d "{\"artist\": \"$artist\", \"title\": \"$title\", \"year\": $year}")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song moved to the end successfully."
   else
     echo "Failed to move song to the end."
@@ -418,7 +482,7 @@ move_song_to_track_number() {
     -H "Content-Type: application/json" \
     -d "{\"artist\": \"$artist\", \"title\": \"$title\", \"year\": $year, \"track_number\": $track_number}")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song moved to track number ($track_number) successfully."
   else
     echo "Failed to move song to track number ($track_number)."
@@ -435,7 +499,7 @@ swap_songs_in_playlist() {
     -H "Content-Type: application/json" \
     -d "{\"track_number_1\": $track_number1, \"track_number_2\": $track_number2}")
 
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Songs swapped successfully between track numbers ($track_number1) and ($track_number2)."
   else
     echo "Failed to swap songs."
@@ -453,7 +517,7 @@ swap_songs_in_playlist() {
 get_song_leaderboard() {
   echo "Getting song leaderboard sorted by play count..."
   response=$(curl -s -X GET "$BASE_URL/song-leaderboard?sort=play_count")
-  if echo "$response" | grep -q '"status": "success"'; then
+  if echo "$response" | grep -q '"status": *"success"'; then
     echo "Song leaderboard retrieved successfully."
     if [ "$ECHO_JSON" = true ]; then
       echo "Leaderboard JSON (sorted by play count):"
@@ -511,6 +575,7 @@ get_all_songs_from_playlist
 get_song_from_playlist_by_track_number 1
 
 get_playlist_length_duration
+seek 200
 
 play_current_song
 rewind_playlist
@@ -519,6 +584,10 @@ play_entire_playlist
 play_current_song
 play_rest_of_playlist
 
+create_playlist "Road Trip"
+add_song_to_named_playlist "$playlist_id" "Queen" "Bohemian Rhapsody" 1975
+delete_playlist "$playlist_id"
+
 get_song_leaderboard
 
 echo "All tests passed successfully!"
@@ -1,5 +1,6 @@
-DROP TABLE IF EXISTS songs;
-CREATE TABLE songs (
+-- The original songs table. IF NOT EXISTS lets databases created before
+-- schema versioning adopt it without losing data.
+CREATE TABLE IF NOT EXISTS songs (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     artist TEXT NOT NULL,
     title TEXT NOT NULL,
@@ -9,4 +10,4 @@ CREATE TABLE songs (
     play_count INTEGER DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE,
     UNIQUE(artist, title, year)
-);
\ No newline at end of file
+);
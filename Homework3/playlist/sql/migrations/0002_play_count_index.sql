@@ -0,0 +1,5 @@
+-- Adds the index for catalog listings sorted by play count.
+--
+-- Queries must filter on exactly "deleted = FALSE" for SQLite to match
+-- this partial index.
+CREATE INDEX IF NOT EXISTS idx_songs_play_count ON songs (play_count DESC, id) WHERE deleted = FALSE;
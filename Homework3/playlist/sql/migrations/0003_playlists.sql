@@ -0,0 +1,24 @@
+-- Stores playlists, so they survive restarts and are shared by every worker.
+--
+-- Entries are ordered by position. Positions are spaced apart, so moving a
+-- song rewrites only its own row. version goes up with every change to a
+-- playlist, which lets a worker tell that its cached copy is out of date.
+CREATE TABLE IF NOT EXISTS playlists (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    current_track_number INTEGER NOT NULL DEFAULT 1,
+    version INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS playlist_entries (
+    playlist_id INTEGER NOT NULL REFERENCES playlists (id),
+    song_id INTEGER NOT NULL REFERENCES songs (id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (playlist_id, song_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_playlist_entries_position ON playlist_entries (playlist_id, position);
+
+-- The playlist used by requests that do not name one
+INSERT OR IGNORE INTO playlists (id, name) VALUES (1, 'default');
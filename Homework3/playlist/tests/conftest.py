@@ -0,0 +1,10 @@
+import pytest
+
+from music_collection.models import song_model
+
+
+@pytest.fixture(autouse=True)
+def empty_song_cache():
+    """Empties the song cache, which outlives the databases each test creates."""
+    song_model.song_cache.clear()
+    yield
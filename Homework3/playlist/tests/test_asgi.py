@@ -0,0 +1,195 @@
+import asyncio
+import importlib
+import json
+import os
+import sqlite3
+from typing import Union
+
+import pytest
+
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.random_utils import LocalRandomSource, set_random_source
+from music_collection.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+@pytest.fixture
+def asgi_app(tmp_path, mocker):
+    """Fixture for the ASGI app over a real database holding three songs, with a seeded local random source."""
+    db_path = str(tmp_path / "song_catalog.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, ?, ?, ?, ?)",
+                         [("Artist", f"Song {i}", 2020, "Pop", 100 + i) for i in range(1, 4)])
+    pool = ConnectionPool(db_path, max_size=2)
+    mocker.patch("music_collection.models.song_model.get_db_connection", pool.checkout)
+    set_random_source(LocalRandomSource(seed=7))
+
+    # Importing asgi loads .env and checks the schema of the configured database
+    mocker.patch("dotenv.load_dotenv")
+    mocker.patch("music_collection.utils.migrations.check_schema")
+    yield importlib.import_module("asgi").app
+
+    set_random_source(None)
+    pool.close()
+
+def call(app, method: str, path: str, query: str = "", body: Union[bytes, list[bytes]] = b"",
+         content_type: str = "application/json") -> tuple[int, dict, bytes]:
+    """
+    Sends one request through the app's ASGI interface and returns the status, headers and body.
+
+    A list body is sent as one message per chunk, as a chunked upload arrives.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "raw_path": path.encode("ascii"), "root_path": "",
+        "query_string": query.encode("ascii"), "headers": [(b"content-type", content_type.encode("ascii"))],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    sent = []
+
+    async def run():
+        chunks = body if isinstance(body, list) else [body]
+        requests = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+                    for i, chunk in enumerate(chunks)]
+
+        async def receive():
+            if requests:
+                return requests.pop(0)
+            # The client stays connected until the response is complete
+            await asyncio.Event().wait()
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    start = sent[0]
+    headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in start["headers"]}
+    return start["status"], headers, b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def test_health(asgi_app):
+    """Test the health check route."""
+    status, headers, body = call(asgi_app, "GET", "/api/health")
+
+    assert status == 200
+    assert headers["content-type"] == "application/json"
+    assert body == b'{"status":"healthy"}\n'
+
+def test_create_song(asgi_app):
+    """Test adding a song, then reading it back by id."""
+    song = {"artist": "Artist", "title": "Song 4", "year": 2021, "genre": "Rock", "duration": 200}
+    status, _, body = call(asgi_app, "POST", "/api/create-song", body=json.dumps(song).encode())
+
+    assert status == 201
+    assert json.loads(body) == {"status": "success", "song": "Song 4"}
+
+    status, _, body = call(asgi_app, "GET", "/api/get-song-from-catalog-by-id/4")
+    assert status == 200
+    assert json.loads(body)["song"] == {"id": 4, **song}
+
+def test_create_song_not_json(asgi_app):
+    """Test that a body that is not JSON is refused with 415, as Flask does."""
+    status, _, body = call(asgi_app, "POST", "/api/create-song", body=b"artist=Artist", content_type="text/plain")
+
+    assert status == 415
+    assert "Content-Type was not 'application/json'" in json.loads(body)["error"]
+
+@pytest.mark.parametrize("payload", [b'["Artist"]', b'{"artist": "Artist"}', b'{bad'])
+def test_create_song_invalid(asgi_app, payload):
+    """Test that a JSON body that is not a complete song is refused with 400."""
+    status, _, body = call(asgi_app, "POST", "/api/create-song", body=payload)
+
+    assert status == 400
+    assert json.loads(body) == {"error": "Invalid input, all fields are required with valid values"}
+
+def test_add_songs_bulk_chunked_csv(asgi_app):
+    """Test a CSV upload that arrives in chunks split mid-row."""
+    csv_body = "artist,title,year,genre,duration\n" + "".join(f"Band,Track {i},1999,Rock,{100 + i}\n" for i in range(50))
+    chunks = [csv_body[i:i + 64].encode() for i in range(0, len(csv_body), 64)]
+
+    status, _, body = call(asgi_app, "POST", "/api/create-songs/bulk", body=chunks, content_type="text/csv")
+
+    assert status == 201
+    assert json.loads(body)["inserted"] == 50
+    status, _, body = call(asgi_app, "GET", "/api/get-song-from-catalog-by-compound-key",
+                           query="artist=Band&title=Track+49&year=1999")
+    assert json.loads(body)["song"]["duration"] == 149
+
+def test_add_songs_bulk_bad_csv_header(asgi_app):
+    """Test that an upload refused on its header is answered without reading the rest of the body."""
+    chunks = [b"artist,title\n"] + [b"Band,Track\n"] * 100
+
+    status, _, body = call(asgi_app, "POST", "/api/create-songs/bulk", body=chunks, content_type="text/csv")
+
+    assert status == 400
+    assert json.loads(body) == {"error": "CSV header is missing required columns: year, genre, duration"}
+
+def test_add_songs_bulk_json_too_large(asgi_app, mocker):
+    """Test that a JSON array body over the size limit is refused with 413."""
+    mocker.patch("asgi.BULK_JSON_MAX_BYTES", 100)
+    mocker.patch("music_collection.utils.catalog_requests.BULK_JSON_MAX_BYTES", 100)
+    songs = [{"artist": "Band", "title": f"Track {i}", "year": 1999, "genre": "Rock", "duration": 100} for i in range(5)]
+
+    status, _, body = call(asgi_app, "POST", "/api/create-songs/bulk", body=[json.dumps(songs).encode()])
+
+    assert status == 413
+    assert "at most 100 bytes" in json.loads(body)["error"]
+
+def test_get_song_by_id(asgi_app):
+    """Test retrieving a song by its id."""
+    status, _, body = call(asgi_app, "GET", "/api/get-song-from-catalog-by-id/2")
+
+    assert status == 200
+    assert json.loads(body) == {"status": "success", "song": {
+        "id": 2, "artist": "Artist", "title": "Song 2", "year": 2020, "genre": "Pop", "duration": 102}}
+
+def test_get_song_by_id_not_found(asgi_app):
+    """Test error when retrieving a song that does not exist."""
+    status, _, body = call(asgi_app, "GET", "/api/get-song-from-catalog-by-id/99")
+
+    assert status == 500
+    assert json.loads(body) == {"error": "Song with ID 99 not found"}
+
+def test_get_random_song(asgi_app):
+    """Test retrieving a random song from the catalog."""
+    status, _, body = call(asgi_app, "GET", "/api/get-random-song")
+
+    assert status == 200
+    assert json.loads(body)["song"]["title"] in {"Song 1", "Song 2", "Song 3"}
+
+def test_stream_catalog_ndjson(asgi_app, mocker):
+    """Test streaming the catalog as NDJSON over several pages."""
+    mocker.patch("asgi.STREAM_PAGE_SIZE", 2)
+
+    status, headers, body = call(asgi_app, "GET", "/api/get-all-songs-from-catalog", query="stream=ndjson")
+
+    assert status == 200
+    assert headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["title"] for line in body.decode().splitlines()] == ["Song 1", "Song 2", "Song 3"]
+
+def test_compound_key_invalid_year(asgi_app):
+    """Test that the query parameters are checked the same way as in app.py."""
+    status, _, body = call(asgi_app, "GET", "/api/get-song-from-catalog-by-compound-key",
+                           query="artist=Artist&title=Song+1&year=new")
+
+    assert status == 400
+    assert json.loads(body) == {"error": "Year must be an integer"}
+
+def test_unknown_path(asgi_app):
+    """Test that an unknown path is answered with a JSON 404."""
+    status, _, body = call(asgi_app, "GET", "/api/nothing-here")
+
+    assert status == 404
+    assert json.loads(body) == {"error": "Not Found"}
+
+def test_wrong_method(asgi_app):
+    """Test that a known path with the wrong method is answered with a JSON 405."""
+    status, _, body = call(asgi_app, "DELETE", "/api/get-random-song")
+
+    assert status == 405
+    assert json.loads(body) == {"error": "Method Not Allowed"}
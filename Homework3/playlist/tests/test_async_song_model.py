@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from music_collection.models import async_song_model
+from music_collection.utils.db_executor import get_db_executor_stats
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.random_utils import LocalRandomSource, set_random_source
+from music_collection.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+@pytest.fixture
+def songs_db(tmp_path, mocker):
+    """Fixture for a real database holding ten songs, with a seeded local random source."""
+    db_path = str(tmp_path / "song_catalog.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, ?, ?, ?, ?)",
+                         [("Artist", f"Song {i}", 2020, "Pop", 100 + i) for i in range(1, 11)])
+    pool = ConnectionPool(db_path, max_size=2)
+    mocker.patch("music_collection.models.song_model.get_db_connection", pool.checkout)
+    set_random_source(LocalRandomSource(seed=7))
+    yield db_path
+    set_random_source(None)
+    pool.close()
+
+
+def test_concurrent_lookups(songs_db):
+    """Test that many lookups in flight at once all complete, on more requests than database threads."""
+    async def lookup_all():
+        return await asyncio.gather(*(async_song_model.get_song_by_id(song_id % 10 + 1) for song_id in range(50)))
+
+    songs = asyncio.run(lookup_all())
+
+    assert [song.id for song in songs] == [song_id % 10 + 1 for song_id in range(50)]
+
+def test_cached_song_skips_the_executor(songs_db):
+    """Test that a cached song is returned without running a database call."""
+    asyncio.run(async_song_model.get_song_by_id(3))
+    calls = get_db_executor_stats()["calls"]
+
+    song = asyncio.run(async_song_model.get_song_by_id(3))
+
+    assert song.title == "Song 3"
+    assert get_db_executor_stats()["calls"] == calls
+
+def test_errors_propagate(songs_db):
+    """Test that an error raised on the executor is raised to the awaiting coroutine."""
+    with pytest.raises(ValueError, match="Song with ID 99 not found"):
+        asyncio.run(async_song_model.get_song_by_id(99))
+
+def test_get_random_song_skips_deleted(songs_db):
+    """Test that the random song is always a live one, falling back to an offset when ids keep missing."""
+    asyncio.run(async_song_model.create_song("Artist", "Song 11", 2020, "Pop", 111))
+    for song_id in range(1, 11):
+        asyncio.run(async_song_model.delete_song(song_id))
+
+    song = asyncio.run(async_song_model.get_random_song())
+
+    assert song.title == "Song 11"
+
+def test_get_random_song_empty_catalog(songs_db):
+    """Test error when picking a random song from an empty catalog."""
+    asyncio.run(async_song_model.clear_catalog())
+
+    with pytest.raises(ValueError, match="The song catalog is empty"):
+        asyncio.run(async_song_model.get_random_song())
@@ -0,0 +1,164 @@
+import asyncio
+from contextlib import contextmanager
+import io
+import os
+import sqlite3
+
+import pytest
+
+from music_collection.models import song_model
+from music_collection.models.song_model import create_songs_bulk
+from music_collection.utils.ingest import AsyncChunkReader, iter_csv_records, iter_ndjson_records, iter_records
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+@pytest.fixture
+def songs_db(tmp_path, mocker):
+    """Fixture to run song_model against a real, empty songs table."""
+    db_path = str(tmp_path / "song_catalog.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+    pool = ConnectionPool(db_path, max_size=1)
+    mocker.patch("music_collection.models.song_model.get_db_connection", pool.checkout)
+    yield db_path
+    pool.close()
+
+def count_songs(db_path: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+
+##################################################
+# Parsing Test Cases
+##################################################
+
+def test_iter_csv_records():
+    """Test parsing CSV rows into records keyed by the header."""
+    records = list(iter_csv_records(io.StringIO("artist,title,year,genre,duration\nA,T,2020,Pop,180\n")))
+    assert records == [{"artist": "A", "title": "T", "year": "2020", "genre": "Pop", "duration": "180"}]
+
+def test_iter_csv_records_missing_column():
+    """Test error when the CSV header lacks a song field."""
+    with pytest.raises(ValueError, match="CSV header is missing required columns: duration"):
+        list(iter_csv_records(io.StringIO("artist,title,year,genre\nA,T,2020,Pop\n")))
+
+def test_iter_ndjson_records():
+    """Test that blank lines are skipped and unparseable lines are passed through."""
+    records = list(iter_ndjson_records(io.StringIO('{"artist": "A"}\n\nnot json\n')))
+    assert records == [{"artist": "A"}, "not json"]
+
+def test_iter_records_binary_stream():
+    """Test that binary streams are decoded before parsing."""
+    records = list(iter_records(io.BytesIO(b'{"title": "\xc3\xa9t\xc3\xa9"}\n'), "ndjson"))
+    assert records == [{"title": "été"}]
+
+def test_iter_records_invalid_format():
+    """Test error when asking for an unsupported format."""
+    with pytest.raises(ValueError, match="Invalid format: xml"):
+        iter_records(io.StringIO(""), "xml")
+
+def test_async_chunk_reader():
+    """Test reading chunks in a thread while the loop feeds them through a one-chunk queue."""
+    async def chunks():
+        for i in range(20):
+            yield f"line {i}\n".encode()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        reader = AsyncChunkReader(loop, max_chunks=1)
+        feeding = asyncio.create_task(reader.feed(chunks()))
+        data = await loop.run_in_executor(None, lambda: io.BufferedReader(reader).read())
+        await feeding
+        return data
+
+    assert asyncio.run(run()) == "".join(f"line {i}\n" for i in range(20)).encode()
+
+def test_async_chunk_reader_abort():
+    """Test that a reader waiting for a chunk raises once the upload is abandoned."""
+    async def run():
+        loop = asyncio.get_running_loop()
+        reader = AsyncChunkReader(loop)
+        reading = loop.run_in_executor(None, reader.read, 10)
+        await asyncio.sleep(0.05)
+        reader.abort()
+        await reading
+
+    with pytest.raises(ConnectionError, match="The upload ended before it was read"):
+        asyncio.run(run())
+
+
+##################################################
+# Bulk Import Test Cases
+##################################################
+
+def test_create_songs_bulk_chunks(songs_db):
+    """Test that songs are inserted in chunks with one commit per chunk."""
+    records = ({"artist": "A", "title": f"T{i}", "year": "2000", "genre": "Pop", "duration": "100"} for i in range(25))
+
+    result = create_songs_bulk(records, chunk_size=10)
+
+    assert result["inserted"] == 25
+    assert result["duplicates"] == 0
+    assert result["invalid"] == 0
+    assert count_songs(songs_db) == 25
+
+def test_create_songs_bulk_duplicates_and_invalid_rows(songs_db):
+    """Test that duplicates and invalid rows are counted and skipped."""
+    records = [
+        {"artist": "A", "title": "T", "year": 2000, "genre": "Pop", "duration": 100},
+        {"artist": "A", "title": "T", "year": 2000, "genre": "Pop", "duration": 100},
+        {"artist": "A", "title": "Old", "year": 1850, "genre": "Pop", "duration": 100},
+        {"artist": "A", "title": "Empty", "year": 2000, "genre": "Pop", "duration": 0},
+        {"artist": "A", "title": "Float", "year": 2000.5, "genre": "Pop", "duration": 100},
+        "not a song",
+    ]
+
+    result = create_songs_bulk(records)
+
+    assert result["inserted"] == 1
+    assert result["duplicates"] == 1
+    assert result["invalid"] == 4
+    assert [error["index"] for error in result["errors"]] == [2, 3, 4, 5]
+    assert "Year must be greater than 1900" in result["errors"][0]["error"]
+    assert "Duration must be greater than 0" in result["errors"][1]["error"]
+    assert count_songs(songs_db) == 1
+
+def test_create_songs_bulk_parses_without_a_connection(songs_db, mocker):
+    """Test that a connection is checked out only while a chunk is written, not while records are read."""
+    checkout = song_model.get_db_connection
+    held = []
+
+    @contextmanager
+    def tracked_checkout():
+        held.append(True)
+        try:
+            with checkout() as conn:
+                yield conn
+        finally:
+            held.pop()
+
+    mocker.patch("music_collection.models.song_model.get_db_connection", tracked_checkout)
+
+    def records():
+        for i in range(25):
+            assert not held
+            yield {"artist": "A", "title": f"T{i}", "year": 2000, "genre": "Pop", "duration": 100}
+
+    result = create_songs_bulk(records(), chunk_size=10)
+
+    assert result["inserted"] == 25
+    assert count_songs(songs_db) == 25
+
+def test_create_songs_bulk_other_constraint_failure(songs_db, mocker):
+    """Test that a constraint failure other than a duplicate key is raised, not counted as a duplicate."""
+    # Let a row the CHECK constraint refuses past validation
+    mocker.patch("music_collection.models.song_model._validate_song_record", lambda record: record)
+
+    with pytest.raises(sqlite3.IntegrityError, match="CHECK constraint failed"):
+        create_songs_bulk([("A", "T", 1850, "Pop", 100)])
+
+    assert count_songs(songs_db) == 0
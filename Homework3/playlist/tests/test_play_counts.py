@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from music_collection.models import play_counts, song_model
+from music_collection.models.play_counts import PlayCountAggregator
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+@pytest.fixture
+def songs_db(tmp_path, mocker):
+    """Fixture for a real songs table holding three songs, shared by song_model and the aggregator."""
+    db_path = str(tmp_path / "song_catalog.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, ?, ?, ?, ?)",
+                         [("Artist", f"Song {i}", 2020, "Pop", 180) for i in range(1, 4)])
+    pool = ConnectionPool(db_path, max_size=2)
+    mocker.patch("music_collection.models.song_model.get_db_connection", pool.checkout)
+    mocker.patch("music_collection.models.play_counts.get_db_connection", pool.checkout)
+    yield db_path
+    pool.close()
+
+@pytest.fixture
+def aggregator(songs_db, mocker):
+    """Fixture for buffered update_play_count() backed by an aggregator that only flushes when asked."""
+    aggregator = PlayCountAggregator(flush_size=1000, flush_interval=60)
+    mocker.patch.object(song_model, "PLAY_COUNT_DURABILITY", "buffered")
+    mocker.patch.object(play_counts, "_aggregator", aggregator)
+    yield aggregator
+    aggregator.close()
+
+def play_counts_in_db(db_path: str) -> dict[int, int]:
+    with sqlite3.connect(db_path) as conn:
+        return dict(conn.execute("SELECT id, play_count FROM songs"))
+
+
+def test_buffered_plays_are_coalesced(songs_db, aggregator):
+    """Test that repeated plays of a song become one pending increment, written by one flush."""
+    for song_id in (1, 1, 2, 1):
+        song_model.update_play_count(song_id)
+
+    assert play_counts_in_db(songs_db) == {1: 0, 2: 0, 3: 0}
+    assert aggregator.stats()["pending"] == 4
+    assert aggregator.stats()["pending_songs"] == 2
+
+    assert aggregator.flush() == 4
+    assert play_counts_in_db(songs_db) == {1: 3, 2: 1, 3: 0}
+    stats = aggregator.stats()
+    assert stats["pending"] == 0
+    assert stats["flushes"] == 1
+    assert stats["songs_flushed"] == 2
+
+def test_buffered_play_of_deleted_song(songs_db, aggregator):
+    """Test that buffered mode still rejects deleted songs up front."""
+    song_model.delete_song(3)
+
+    with pytest.raises(ValueError, match="Song with ID 3 has been deleted"):
+        song_model.update_play_count(3)
+    assert aggregator.stats()["plays"] == 0
+
+def test_flush_skips_songs_deleted_while_pending(songs_db, aggregator):
+    """Test that plays of a song deleted before the flush are not written."""
+    song_model.update_play_count(2)
+    song_model.delete_song(2)
+
+    aggregator.flush()
+
+    assert play_counts_in_db(songs_db)[2] == 0
+
+def test_flush_on_size_threshold(songs_db):
+    """Test that reaching flush_size wakes the background flush."""
+    aggregator = PlayCountAggregator(flush_size=3, flush_interval=60)
+    for _ in range(3):
+        aggregator.add(1)
+
+    deadline = time.monotonic() + 2
+    while play_counts_in_db(songs_db)[1] != 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert play_counts_in_db(songs_db)[1] == 3
+    aggregator.close()
+
+def test_flush_on_interval(songs_db):
+    """Test that pending plays are written after flush_interval even below flush_size."""
+    aggregator = PlayCountAggregator(flush_size=1000, flush_interval=0.05)
+    aggregator.add(2)
+
+    deadline = time.monotonic() + 2
+    while play_counts_in_db(songs_db)[2] != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert play_counts_in_db(songs_db)[2] == 1
+    aggregator.close()
+
+def test_failed_flush_keeps_plays_pending(songs_db, aggregator, mocker):
+    """Test that a failed flush puts its increments back for the next one."""
+    aggregator.add(1, plays=2)
+    broken_connection = mocker.patch("music_collection.models.play_counts.get_db_connection",
+                                     side_effect=sqlite3.OperationalError("database is locked"))
+
+    with pytest.raises(sqlite3.OperationalError):
+        aggregator.flush()
+    assert aggregator.stats()["pending"] == 2
+    assert aggregator.stats()["flush_failures"] == 1
+
+    mocker.stop(broken_connection)
+    assert aggregator.flush() == 2
+    assert play_counts_in_db(songs_db)[1] == 2
+
+def test_close_flushes_pending_plays(songs_db):
+    """Test that closing the aggregator (as at exit) writes what is pending and refuses new plays."""
+    aggregator = PlayCountAggregator(flush_size=1000, flush_interval=60)
+    aggregator.add(3, plays=5)
+
+    aggregator.close()
+
+    assert play_counts_in_db(songs_db)[3] == 5
+    with pytest.raises(RuntimeError, match="closed"):
+        aggregator.add(3)
+
+def test_clear_catalog_discards_pending_plays(songs_db, aggregator):
+    """Test that clearing the catalog drops plays that would land on reused ids."""
+    song_model.update_play_count(1)
+
+    song_model.clear_catalog()
+
+    assert aggregator.stats()["pending"] == 0
+    assert aggregator.stats()["discarded"] == 1
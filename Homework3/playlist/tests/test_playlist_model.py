@@ -181,6 +181,35 @@ def test_get_playlist_duration(playlist_model, sample_playlist):
     playlist_model.playlist.extend(sample_playlist)
     assert playlist_model.get_playlist_duration() == 335, "Expected playlist duration to be 360 seconds"
 
+def test_get_track_start_time(playlist_model, sample_playlist):
+    """Test getting how far into the playlist each track starts."""
+    playlist_model.playlist.extend(sample_playlist)
+    assert playlist_model.get_track_start_time(1) == 0
+    assert playlist_model.get_track_start_time(2) == 180
+
+def test_seek(playlist_model, sample_playlist):
+    """Test finding the track and offset playing at a given time."""
+    playlist_model.playlist.extend(sample_playlist)
+    assert playlist_model.seek(0) == (1, 0)
+    assert playlist_model.seek(179) == (1, 179)
+    assert playlist_model.seek(180) == (2, 0)
+    assert playlist_model.seek(334) == (2, 154)
+
+def test_seek_after_reordering(playlist_model, sample_playlist):
+    """Test that seeking follows the playlist order after songs are moved."""
+    playlist_model.playlist.extend(sample_playlist)
+    playlist_model.move_song_to_beginning(2)
+    assert playlist_model.seek(155) == (2, 0)
+    assert playlist_model.get_track_start_time(2) == 155
+
+def test_seek_past_end(playlist_model, sample_playlist):
+    """Test error when seeking outside the playlist."""
+    playlist_model.playlist.extend(sample_playlist)
+    with pytest.raises(ValueError, match="Invalid playback time: 335"):
+        playlist_model.seek(335)
+    with pytest.raises(ValueError, match="Invalid playback time: -1"):
+        playlist_model.seek(-1)
+
 ##################################################
 # Utility Function Test Cases
 ##################################################
@@ -0,0 +1,237 @@
+import os
+import random
+import sqlite3
+
+import pytest
+
+from music_collection.models import song_model
+from music_collection.models.playlist_store import DEFAULT_PLAYLIST_ID, PlaylistStore, StoredPlaylistModel
+from music_collection.models.song_model import Song
+from music_collection.utils.migrations import apply_migrations, load_migrations
+from music_collection.utils.sql_utils import ConnectionPool
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+
+@pytest.fixture
+def songs_db(tmp_path, mocker):
+    """Fixture for a real database holding ten songs and the default playlist."""
+    db_path = str(tmp_path / "song_catalog.db")
+    with sqlite3.connect(db_path) as conn:
+        apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+        conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, ?, ?, ?, ?)",
+                         [("Artist", f"Song {i}", 2020, "Pop", 100 + i) for i in range(1, 11)])
+    pool = ConnectionPool(db_path, max_size=2)
+    mocker.patch("music_collection.models.song_model.get_db_connection", pool.checkout)
+    mocker.patch("music_collection.models.playlist_store.get_db_connection", pool.checkout)
+    mocker.patch.object(song_model, "PLAY_COUNT_DURABILITY", "immediate")
+    yield db_path
+    pool.close()
+
+@pytest.fixture
+def store(songs_db):
+    return PlaylistStore(capacity=4)
+
+def song(song_id: int) -> Song:
+    return Song(song_id, "Artist", f"Song {song_id}", 2020, "Pop", 100 + song_id)
+
+def stored_order(db_path: str, playlist_id: int = DEFAULT_PLAYLIST_ID) -> list[int]:
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT song_id FROM playlist_entries WHERE playlist_id = ? ORDER BY position", (playlist_id,))]
+
+def ids(model) -> list[int]:
+    return [track.id for track in model.playlist]
+
+
+def test_changes_are_written_through(songs_db, store):
+    """Test that adds, moves, swaps and removals are persisted and survive a reload."""
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        for song_id in range(1, 6):
+            playlist.add_song_to_playlist(song(song_id))
+        playlist.move_song_to_beginning(5)
+        playlist.move_song_to_end(1)
+        playlist.move_song_to_track_number(4, 2)
+        playlist.swap_songs_in_playlist(2, 3)
+        playlist.remove_song_by_song_id(5)
+        playlist.remove_song_by_track_number(1)
+
+    assert ids(playlist) == [3, 2, 1]
+    assert stored_order(songs_db) == [3, 2, 1]
+
+    reloaded = StoredPlaylistModel.load(DEFAULT_PLAYLIST_ID)
+    assert reloaded.get_all_songs() == [song(3), song(2), song(1)]
+    assert reloaded.version == playlist.version
+
+def test_move_writes_one_row(songs_db, store, mocker):
+    """Test that moving a song rewrites only that song's position."""
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        for song_id in range(1, 6):
+            playlist.add_song_to_playlist(song(song_id))
+        write = mocker.spy(playlist, "_write")
+        playlist.move_song_to_track_number(5, 2)
+
+    statements = write.call_args[0][0]
+    assert len(statements) == 1
+    assert len(statements[0][1]) == 1
+    assert stored_order(songs_db) == [1, 5, 2, 3, 4]
+
+def test_repeated_moves_renumber(songs_db, store, mocker):
+    """Test that the playlist is renumbered once moves use up the space between two positions."""
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        for song_id in range(1, 11):
+            playlist.add_song_to_playlist(song(song_id))
+        renumber = mocker.spy(playlist, "_renumber")
+        for _ in range(40):
+            playlist.move_song_to_track_number(playlist.playlist[-1].id, 2)
+
+    assert renumber.call_count >= 1
+    assert stored_order(songs_db) == ids(playlist)
+
+def test_random_changes_match_database(songs_db, store):
+    """Test that a random mix of changes leaves the database in the same order as the copy in memory."""
+    rng = random.Random(7)
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        for _ in range(300):
+            length = playlist.get_playlist_length()
+            absent = [song_id for song_id in range(1, 11) if not playlist.playlist.contains_id(song_id)]
+            operation = rng.randrange(5)
+            if absent and (length < 2 or operation == 0):
+                playlist.add_song_to_playlist(song(rng.choice(absent)))
+            elif operation == 1:
+                playlist.remove_song_by_track_number(rng.randint(1, length))
+            elif operation == 2:
+                first, second = rng.sample(range(1, length + 1), 2)
+                playlist.swap_songs_in_playlist(playlist.playlist[first - 1].id, playlist.playlist[second - 1].id)
+            else:
+                moved = playlist.playlist[rng.randrange(length)].id
+                playlist.move_song_to_track_number(moved, rng.randint(1, length))
+            assert stored_order(songs_db) == ids(playlist)
+
+    assert ids(StoredPlaylistModel.load(DEFAULT_PLAYLIST_ID)) == ids(playlist)
+
+def test_current_track_is_saved(songs_db, store):
+    """Test that playback's current track number is persisted when the checkout ends."""
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        for song_id in range(1, 4):
+            playlist.add_song_to_playlist(song(song_id))
+        playlist.go_to_track_number(3)
+
+    assert StoredPlaylistModel.load(DEFAULT_PLAYLIST_ID).current_track_number == 3
+
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        playlist.play_current_song()
+
+    assert StoredPlaylistModel.load(DEFAULT_PLAYLIST_ID).current_track_number == 1
+    with sqlite3.connect(songs_db) as conn:
+        assert conn.execute("SELECT play_count FROM songs WHERE id = 3").fetchone()[0] == 1
+
+def test_cached_playlist_is_reused(store):
+    """Test that a playlist is loaded once and then served from the cache."""
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        playlist.add_song_to_playlist(song(1))
+    with store.checkout(DEFAULT_PLAYLIST_ID) as cached:
+        assert cached is playlist
+
+    stats = store.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["reloads"] == 0
+
+def test_change_by_another_worker_reloads(songs_db, store):
+    """Test that a playlist changed through another store is reloaded on the next checkout."""
+    other_worker = PlaylistStore(capacity=4)
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        playlist.add_song_to_playlist(song(1))
+    with other_worker.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        playlist.add_song_to_playlist(song(2))
+
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        assert ids(playlist) == [1, 2]
+    assert store.stats()["reloads"] == 1
+
+def test_conflicting_write_is_refused(songs_db, store):
+    """Test that a write from an out of date copy fails and drops the copy from the cache."""
+    other_worker = PlaylistStore(capacity=4)
+    with pytest.raises(RuntimeError, match="changed by another request"):
+        with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+            with other_worker.checkout(DEFAULT_PLAYLIST_ID) as other:
+                other.add_song_to_playlist(song(2))
+            playlist.add_song_to_playlist(song(1))
+
+    assert playlist.stale
+    assert store.stats()["cached"] == 0
+    assert stored_order(songs_db) == [2]
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        assert ids(playlist) == [2]
+
+def test_least_recently_used_playlist_is_evicted(store):
+    """Test that the cache holds at most capacity playlists, dropping the least recently used."""
+    playlist_ids = [store.create_playlist(f"Playlist {i}") for i in range(5)]
+    for playlist_id in playlist_ids:
+        with store.checkout(playlist_id):
+            pass
+    with store.checkout(playlist_ids[1]):
+        pass
+
+    stats = store.stats()
+    assert stats["cached"] == 4
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1
+    with store.checkout(playlist_ids[0]):
+        pass
+    assert store.stats()["misses"] == 6
+
+def test_playlists_are_separate(songs_db, store):
+    """Test that songs added to one playlist do not appear in another."""
+    road_trip = store.create_playlist("Road Trip")
+    with store.checkout(road_trip) as playlist:
+        playlist.add_song_to_playlist(song(1))
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        playlist.add_song_to_playlist(song(2))
+
+    assert stored_order(songs_db, road_trip) == [1]
+    assert stored_order(songs_db) == [2]
+
+def test_missing_playlist(store):
+    """Test error when checking out a playlist that does not exist."""
+    with pytest.raises(ValueError, match="Playlist with ID 99 not found"):
+        with store.checkout(99):
+            pass
+
+def test_create_playlist_invalid_name(store):
+    """Test error when creating a playlist without a name."""
+    with pytest.raises(ValueError, match="Invalid playlist name"):
+        store.create_playlist("  ")
+
+def test_delete_playlist(songs_db, store):
+    """Test deleting a playlist removes its entries and its cached copy."""
+    playlist_id = store.create_playlist("Road Trip")
+    with store.checkout(playlist_id) as playlist:
+        playlist.add_song_to_playlist(song(1))
+
+    store.delete_playlist(playlist_id)
+
+    assert stored_order(songs_db, playlist_id) == []
+    assert store.stats()["cached"] == 0
+    with pytest.raises(ValueError, match="not found"):
+        store.delete_playlist(playlist_id)
+
+def test_delete_default_playlist(store):
+    """Test error when deleting the default playlist."""
+    with pytest.raises(ValueError, match="Cannot delete the default playlist"):
+        store.delete_playlist(DEFAULT_PLAYLIST_ID)
+
+def test_clear_catalog_empties_playlists(songs_db, store):
+    """Test that clearing the catalog empties cached playlists too."""
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        playlist.add_song_to_playlist(song(1))
+        playlist.add_song_to_playlist(song(2))
+        playlist.go_to_track_number(2)
+
+    song_model.clear_catalog()
+
+    with store.checkout(DEFAULT_PLAYLIST_ID) as playlist:
+        assert playlist.get_playlist_length() == 0
+        assert playlist.current_track_number == 1
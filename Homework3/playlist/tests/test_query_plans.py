@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+
+import pytest
+
+from music_collection.models.song_model import (
+    create_song,
+    get_all_songs,
+    get_song_by_compound_key,
+    get_songs_page,
+    iter_all_songs,
+    update_play_count
+)
+from music_collection.utils.migrations import apply_migrations, load_migrations
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+# A songs table created before schema versioning
+BASELINE_SONG_TABLE = """
+CREATE TABLE songs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    artist TEXT NOT NULL,
+    title TEXT NOT NULL,
+    year INTEGER NOT NULL CHECK(year >= 1900),
+    genre TEXT NOT NULL,
+    duration INTEGER NOT NULL CHECK(duration > 0),
+    play_count INTEGER DEFAULT 0,
+    deleted BOOLEAN DEFAULT FALSE,
+    UNIQUE(artist, title, year)
+);
+"""
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture(params=["fresh", "upgrade"])
+def songs_db(request, mocker):
+    """Fixture for a songs table built by the migrations, both from scratch and over an unversioned database."""
+    conn = sqlite3.connect(":memory:")
+    if request.param == "upgrade":
+        conn.executescript(BASELINE_SONG_TABLE)
+    apply_migrations(conn, load_migrations(MIGRATIONS_DIR))
+
+    # Record the SELECTs song_model runs so their plans can be checked
+    selects = []
+    conn.set_trace_callback(lambda sql: selects.append(sql) if sql.lstrip().startswith("SELECT") else None)
+
+    @contextmanager
+    def mock_get_db_connection():
+        yield conn
+
+    mocker.patch("music_collection.models.song_model.get_db_connection", mock_get_db_connection)
+    yield conn, selects
+    conn.close()
+
+def last_query_plan(db: tuple[sqlite3.Connection, list[str]]) -> str:
+    """Returns the EXPLAIN QUERY PLAN of the last SELECT song_model ran, one step per line."""
+    conn, selects = db
+    sql = selects[-1]
+    conn.set_trace_callback(None)
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+    return "\n".join(row[3] for row in rows)
+
+######################################################
+#
+#    Query plans
+#
+######################################################
+
+def test_all_songs_by_play_count_uses_index(songs_db):
+    """Test that sorting the catalog by play count reads the partial index instead of sorting."""
+    get_all_songs(sort_by_play_count=True)
+
+    plan = last_query_plan(songs_db)
+    assert "USING INDEX idx_songs_play_count" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_stream_songs_by_play_count_uses_index(songs_db):
+    """Test that streaming the catalog by play count reads the partial index instead of sorting."""
+    list(iter_all_songs(sort_by_play_count=True))
+
+    plan = last_query_plan(songs_db)
+    assert "USING INDEX idx_songs_play_count" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_songs_page_by_play_count_uses_index(songs_db):
+    """Test that a keyset page sorted by play count resumes from the partial index."""
+    for i in range(3):
+        create_song("Artist", f"Song {i}", 2020, "Pop", 180)
+    update_play_count(2)
+
+    songs, next_cursor = get_songs_page(limit=1, sort_by_play_count=True)
+    assert [song["id"] for song in songs] == [2]
+    songs, _ = get_songs_page(limit=1, cursor=next_cursor, sort_by_play_count=True)
+    assert [song["id"] for song in songs] == [1]
+
+    plan = last_query_plan(songs_db)
+    assert "USING INDEX idx_songs_play_count" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_song_by_compound_key_uses_index(songs_db):
+    """Test that compound key lookups search the unique index on (artist, title, year)."""
+    create_song("Artist", "Song", 2020, "Pop", 180)
+
+    get_song_by_compound_key("Artist", "Song", 2020)
+
+    plan = last_query_plan(songs_db)
+    assert "SEARCH songs USING INDEX" in plan
+    assert "(artist=? AND title=? AND year=?)" in plan
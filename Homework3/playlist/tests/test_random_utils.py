@@ -1,7 +1,24 @@
+import asyncio
+import threading
+import time
+
 import pytest
 import requests
 
-from music_collection.utils.random_utils import get_random
+from music_collection.utils import random_utils
+from music_collection.utils.random_stub import RandomStubServer
+from music_collection.utils.random_utils import (
+    RANDOM_INT_RANGE,
+    BufferedRandomSource,
+    LocalRandomSource,
+    fetch_random_integers,
+    fetch_random_integers_async,
+    get_random,
+    get_random_async,
+    get_random_int,
+    get_random_int_async,
+    set_random_source
+)
 
 
 RANDOM_NUMBER = 42
@@ -17,6 +34,19 @@ def mock_random_org(mocker):
     mocker.patch("requests.get", return_value=mock_response)
     return mock_response
 
+@pytest.fixture
+def stub_server(monkeypatch):
+    """Fixture to point the random.org URL at a local stub server."""
+    server = RandomStubServer(seed=42).start()
+    monkeypatch.setattr(random_utils, "RANDOM_ORG_URL", server.url)
+    yield server
+    server.stop()
+
+@pytest.fixture(autouse=True)
+def reset_random_source():
+    yield
+    set_random_source(None)
+
 
 def test_get_random(mock_random_org):
     """Test retrieving a random number from random.org."""
@@ -47,4 +77,174 @@ def test_get_random_invalid_response(mock_random_org):
     mock_random_org.text = "invalid_response"
 
     with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
-        get_random(NUM_SONGS)
\ No newline at end of file
+        get_random(NUM_SONGS)
+def test_fetch_random_integers(mock_random_org):
+    """Test fetching a batch of random ints over random.org's full range."""
+    mock_random_org.text = "7\n999999999\n"
+
+    assert fetch_random_integers(2) == [7, 999999999]
+    requests.get.assert_called_once_with(
+        "https://www.random.org/integers/?num=2&min=0&max=999999999&col=1&base=10&format=plain&rnd=new", timeout=5)
+
+def test_buffered_source_fetches_in_bulk(stub_server):
+    """Test that the buffered source serves many numbers from a single request."""
+    source = BufferedRandomSource(fetch_random_integers, batch_size=100, low_watermark=0)
+
+    numbers = [source.randint(NUM_SONGS) for _ in range(50)]
+
+    assert all(1 <= number <= NUM_SONGS for number in numbers)
+    assert stub_server.requests_served == 1
+
+def test_buffered_source_rejects_biased_values():
+    """Test that draws beyond the largest multiple of the range are skipped."""
+    # With a range of 3, RANDOM_INT_RANGE - 1 lies in the incomplete last block
+    source = BufferedRandomSource(lambda num: [RANDOM_INT_RANGE - 1, 4])
+
+    assert source.randint(3) == 2
+    assert source.stats()["rejected"] == 1
+
+def test_buffered_source_falls_back_to_local(mocker):
+    """Test that a failed fetch is served from the local fallback instead of raising."""
+    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    source = BufferedRandomSource(fetch_random_integers, fallback=LocalRandomSource(seed=1))
+
+    assert source.randint(NUM_SONGS) == LocalRandomSource(seed=1).randint(NUM_SONGS)
+    assert source.stats()["fallbacks"] == 1
+
+def test_buffered_source_shares_sync_fetch():
+    """Test that threads finding the buffer dry wait for one fetch instead of each fetching."""
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(num):
+        calls.append(num)
+        release.wait(5)
+        return list(range(num))
+
+    source = BufferedRandomSource(slow_fetch, batch_size=100, low_watermark=0)
+    numbers = []
+    threads = [threading.Thread(target=lambda: numbers.append(source.randint(NUM_SONGS))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(numbers) == list(range(1, 9))
+
+def test_buffered_source_backs_off_after_failure():
+    """Test that after a failed fetch the fallback is served without fetching again until the backoff ends."""
+    calls = []
+
+    def failing_fetch(num):
+        calls.append(num)
+        raise RuntimeError("Request to random.org timed out.")
+
+    source = BufferedRandomSource(failing_fetch, fallback=LocalRandomSource(seed=1), backoff=0.1)
+
+    for _ in range(5):
+        source.randint(NUM_SONGS)
+    assert len(calls) == 1
+    assert source.stats()["fallbacks"] == 5
+
+    time.sleep(0.15)
+    source.randint(NUM_SONGS)
+    assert len(calls) == 2
+
+def test_get_random_int_uses_configured_source():
+    """Test that get_random_int() draws from the process-wide source."""
+    set_random_source(LocalRandomSource(seed=3))
+
+    assert get_random_int(NUM_SONGS) == LocalRandomSource(seed=3).randint(NUM_SONGS)
+
+def test_fetch_random_integers_async(stub_server):
+    """Test fetching a batch of random ints without blocking the event loop."""
+    numbers = asyncio.run(fetch_random_integers_async(20))
+
+    assert len(numbers) == 20
+    assert all(0 <= number < RANDOM_INT_RANGE for number in numbers)
+    assert stub_server.requests_served == 1
+
+def test_get_random_async(stub_server):
+    """Test retrieving one random number with the async client."""
+    assert 1 <= asyncio.run(get_random_async(NUM_SONGS)) <= NUM_SONGS
+
+def test_get_random_async_error_status(stub_server, monkeypatch):
+    """Test that an HTTP error status is reported like a failed request."""
+    monkeypatch.setattr(random_utils, "RANDOM_ORG_URL", stub_server.url + "/missing")
+
+    with pytest.raises(RuntimeError, match="Request to random.org failed: Client error '404 Not Found'"):
+        asyncio.run(get_random_async(NUM_SONGS))
+
+def serve_raw(monkeypatch, response: bytes):
+    """Runs get_random_async() against a server that answers every request with response."""
+    async def run():
+        async def respond(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(response)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(respond, "127.0.0.1", 0)
+        monkeypatch.setattr(random_utils, "RANDOM_ORG_URL", f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}")
+        async with server:
+            return await get_random_async(NUM_SONGS)
+
+    return asyncio.run(run())
+
+def test_get_random_async_chunked_response(monkeypatch):
+    """Test reading a response sent with chunked transfer encoding."""
+    response = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n1\r\n4\r\n2\r\n2\n\r\n0\r\n\r\n"
+    assert serve_raw(monkeypatch, response) == 42
+
+def test_get_random_async_malformed_chunk(monkeypatch):
+    """Test that a malformed chunked body is reported like a failed request."""
+    response = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n42\r\n0\r\n\r\n"
+    with pytest.raises(RuntimeError, match="Request to random.org failed"):
+        serve_raw(monkeypatch, response)
+
+def test_get_random_async_follows_redirects(stub_server, monkeypatch):
+    """Test that a redirect is followed, as requests does."""
+    location = f"{stub_server.url}/integers/?num=1&min=1&max={NUM_SONGS}&col=1&base=10&format=plain&rnd=new"
+    response = f"HTTP/1.1 302 Found\r\nLocation: {location}\r\nContent-Length: 0\r\n\r\n".encode("ascii")
+
+    assert 1 <= serve_raw(monkeypatch, response) <= NUM_SONGS
+    assert stub_server.requests_served == 1
+
+def test_get_random_async_response_too_large(monkeypatch):
+    """Test error when random.org sends more than RANDOM_ORG_MAX_RESPONSE bytes."""
+    monkeypatch.setattr(random_utils, "RANDOM_ORG_MAX_RESPONSE", 4)
+    response = b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n4242424242"
+
+    with pytest.raises(ValueError, match="more than 4 bytes"):
+        serve_raw(monkeypatch, response)
+
+def test_buffered_source_shares_async_fetch(stub_server):
+    """Test that concurrent callers finding the buffer dry wait for a single fetch."""
+    source = BufferedRandomSource(fetch_random_integers, batch_size=100, low_watermark=0,
+                                  afetch=fetch_random_integers_async)
+
+    async def draw():
+        return await asyncio.gather(*(source.arandint(NUM_SONGS) for _ in range(50)))
+
+    numbers = asyncio.run(draw())
+
+    assert all(1 <= number <= NUM_SONGS for number in numbers)
+    assert stub_server.requests_served == 1
+
+def test_buffered_source_async_falls_back_to_local():
+    """Test that a failed async fetch is served from the local fallback instead of raising."""
+    async def fail(num):
+        raise RuntimeError("Request to random.org timed out.")
+    source = BufferedRandomSource(fetch_random_integers, afetch=fail, fallback=LocalRandomSource(seed=1))
+
+    assert asyncio.run(source.arandint(NUM_SONGS)) == LocalRandomSource(seed=1).randint(NUM_SONGS)
+    assert source.stats()["fallbacks"] == 1
+
+def test_get_random_int_async_uses_configured_source():
+    """Test that get_random_int_async() draws from the process-wide source."""
+    set_random_source(LocalRandomSource(seed=3))
+
+    assert asyncio.run(get_random_int_async(NUM_SONGS)) == LocalRandomSource(seed=3).randint(NUM_SONGS)
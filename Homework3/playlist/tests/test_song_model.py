@@ -4,6 +4,7 @@ import sqlite3
 
 import pytest
 
+from music_collection.models import song_model
 from music_collection.models.song_model import (
     Song,
     create_song,
@@ -12,9 +13,12 @@ from music_collection.models.song_model import (
     get_song_by_id,
     get_song_by_compound_key,
     get_all_songs,
+    get_songs_page,
+    iter_all_songs,
     get_random_song,
     update_play_count
 )
+from music_collection.utils.cache import LRUCache
 
 ######################################################
 #
@@ -158,21 +162,30 @@ def test_delete_song_already_deleted(mock_cursor):
     with pytest.raises(ValueError, match="Song with ID 999 has already been deleted"):
         delete_song(999)
 
-def test_clear_catalog(mock_cursor, mocker):
+def test_clear_catalog(mock_cursor):
     """Test clearing the entire song catalog (removes all songs)."""
 
-    # Mock the file reading
-    mocker.patch.dict('os.environ', {'SQL_CREATE_TABLE_PATH': 'sql/create_song_table.sql'})
-    mock_open = mocker.patch('builtins.open', mocker.mock_open(read_data="The body of the create statement"))
-
     # Call the clear_database function
     clear_catalog()
 
-    # Ensure the file was opened using the environment variable's path
-    mock_open.assert_called_once_with('sql/create_song_table.sql', 'r')
+    # Verify that the playlists were emptied and marked as changed
+    expected_entries_sql = normalize_whitespace("DELETE FROM playlist_entries")
+    expected_playlists_sql = normalize_whitespace("UPDATE playlists SET version = version + 1, current_track_number = 1")
+    actual_entries_sql = normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0])
+    actual_playlists_sql = normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0])
+
+    assert actual_entries_sql == expected_entries_sql, "The playlist entries were not deleted."
+    assert actual_playlists_sql == expected_playlists_sql, "The playlist versions were not bumped."
+
+    # Verify that the songs were deleted in place rather than by recreating the table
+    expected_delete_sql = normalize_whitespace("DELETE FROM songs")
+    expected_reset_sql = normalize_whitespace("DELETE FROM sqlite_sequence WHERE name = 'songs'")
+    actual_delete_sql = normalize_whitespace(mock_cursor.execute.call_args_list[2][0][0])
+    actual_reset_sql = normalize_whitespace(mock_cursor.execute.call_args_list[3][0][0])
 
-    # Verify that the correct SQL script was executed
-    mock_cursor.executescript.assert_called_once()
+    assert actual_delete_sql == expected_delete_sql, "The DELETE query did not match the expected structure."
+    assert actual_reset_sql == expected_reset_sql, "The id sequence was not reset."
+    mock_cursor.executescript.assert_not_called()
 
 
 ######################################################
@@ -243,6 +256,32 @@ def test_get_song_by_compound_key(mock_cursor):
     expected_arguments = ("Artist Name", "Song Title", 2022)
     assert actual_arguments == expected_arguments, f"The SQL query arguments did not match. Expected {expected_arguments}, got {actual_arguments}."
 
+SONG_ROW = (1, "Artist Name", "Song Title", 2022, "Pop", 180, False)
+
+def test_song_lookups_cached(mock_cursor, mocker):
+    """Test that a song read by compound key is then served by key and by id without a query."""
+    cache = mocker.patch.object(song_model, "song_cache", LRUCache())
+    mock_cursor.fetchone.return_value = SONG_ROW
+
+    song = get_song_by_compound_key("Artist Name", "Song Title", 2022)
+    assert get_song_by_compound_key("Artist Name", "Song Title", 2022) is song
+    assert get_song_by_id(1) is song
+
+    mock_cursor.execute.assert_called_once()
+    assert cache.stats()["hit_ratio"] == round(2 / 3, 3)
+
+@pytest.mark.parametrize("write", [lambda: delete_song(1), clear_catalog])
+def test_song_lookups_invalidated(mock_cursor, write):
+    """Test that deleting a song or clearing the catalog drops the cached songs."""
+    mock_cursor.fetchone.return_value = SONG_ROW
+    get_song_by_id(1)
+
+    mock_cursor.fetchone.return_value = (False,)
+    write()
+    mock_cursor.fetchone.return_value = SONG_ROW[:6] + (True,)
+    with pytest.raises(ValueError, match="has been deleted"):
+        get_song_by_compound_key("Artist Name", "Song Title", 2022)
+
 def test_get_all_songs(mock_cursor):
     """Test retrieving all songs that are not marked as deleted."""
 
@@ -330,57 +369,209 @@ def test_get_all_songs_ordered_by_play_count(mock_cursor):
 
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
 
-def test_get_random_song(mock_cursor, mocker):
-    """Test retrieving a random song from the catalog."""
+def test_iter_all_songs(mock_cursor):
+    """Test streaming the catalog in batches with fetchmany."""
 
-    # Simulate that there are multiple songs in the database
+    mock_cursor.fetchmany.side_effect = [
+        [(1, "Artist A", "Song A", 2020, "Rock", 210, 10), (2, "Artist B", "Song B", 2021, "Pop", 180, 20)],
+        [(3, "Artist C", "Song C", 2022, "Jazz", 200, 5)],
+        []
+    ]
+
+    songs = list(iter_all_songs(batch_size=2))
+
+    assert [song["id"] for song in songs] == [1, 2, 3]
+    assert songs[2] == {"id": 3, "artist": "Artist C", "title": "Song C", "year": 2022, "genre": "Jazz", "duration": 200, "play_count": 5}
+    mock_cursor.fetchmany.assert_called_with(2)
+    mock_cursor.fetchall.assert_not_called()
+
+def test_get_songs_page(mock_cursor):
+    """Test retrieving the first page of songs, with a cursor for the next one."""
+
+    # Simulate one more row than the page size
     mock_cursor.fetchall.return_value = [
         (1, "Artist A", "Song A", 2020, "Rock", 210, 10),
         (2, "Artist B", "Song B", 2021, "Pop", 180, 20),
         (3, "Artist C", "Song C", 2022, "Jazz", 200, 5)
     ]
 
+    songs, next_cursor = get_songs_page(limit=2)
+
+    assert [song["id"] for song in songs] == [1, 2]
+    assert next_cursor is not None
+
+    expected_query = normalize_whitespace("""
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE
+        ORDER BY id LIMIT ?
+    """)
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == [3]
+
+    # The cursor resumes after the last song of the page
+    mock_cursor.fetchall.return_value = [(3, "Artist C", "Song C", 2022, "Jazz", 200, 5)]
+    songs, next_cursor = get_songs_page(limit=2, cursor=next_cursor)
+
+    assert [song["id"] for song in songs] == [3]
+    assert next_cursor is None
+    assert "AND id > ?" in mock_cursor.execute.call_args[0][0]
+    assert mock_cursor.execute.call_args[0][1] == [2, 3]
+
+def test_get_songs_page_sorted_by_play_count(mock_cursor):
+    """Test that sorted pages resume after the (play_count, id) of the last song."""
+
+    mock_cursor.fetchall.return_value = [
+        (2, "Artist B", "Song B", 2021, "Pop", 180, 20),
+        (1, "Artist A", "Song A", 2020, "Rock", 210, 10)
+    ]
+
+    songs, next_cursor = get_songs_page(limit=1, sort_by_play_count=True)
+    get_songs_page(limit=1, cursor=next_cursor, sort_by_play_count=True)
+
+    expected_query = normalize_whitespace("""
+        SELECT id, artist, title, year, genre, duration, play_count
+        FROM songs
+        WHERE deleted = FALSE AND (play_count < ? OR (play_count = ? AND id > ?))
+        ORDER BY play_count DESC, id LIMIT ?
+    """)
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == [20, 20, 2, 2]
+
+def test_get_songs_page_invalid_cursor(mock_cursor):
+    """Test error when the cursor is malformed or belongs to the other sort order."""
+
+    with pytest.raises(ValueError, match="Invalid cursor: garbage"):
+        get_songs_page(cursor="garbage")
+
+    mock_cursor.fetchall.return_value = [
+        (1, "Artist A", "Song A", 2020, "Rock", 210, 10),
+        (2, "Artist B", "Song B", 2021, "Pop", 180, 20)
+    ]
+    _, next_cursor = get_songs_page(limit=1)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        get_songs_page(cursor=next_cursor, sort_by_play_count=True)
+
+def test_get_songs_page_invalid_limit():
+    """Test error when the page size is out of range."""
+
+    with pytest.raises(ValueError, match="Invalid limit: 0"):
+        get_songs_page(limit=0)
+
+def test_get_random_song(mock_cursor, mocker):
+    """Test retrieving a random song from the catalog."""
+
+    # Simulate the id range of the catalog, then the row for the chosen id
+    mock_cursor.fetchone.side_effect = [
+        (1, 3),
+        (2, "Artist B", "Song B", 2021, "Pop", 180, False)
+    ]
+
     # Mock random number generation to return the 2nd song
-    mock_random = mocker.patch("music_collection.models.song_model.get_random", return_value=2)
+    mock_random = mocker.patch("music_collection.models.song_model.get_random_int", return_value=2)
 
     # Call the get_random_song method
     result = get_random_song()
 
-    # Expected result based on the mock random number and fetchall return value
+    # Expected result based on the mock random number and fetchone return value
     expected_result = Song(2, "Artist B", "Song B", 2021, "Pop", 180)
 
     # Ensure the result matches the expected output
     assert result == expected_result, f"Expected {expected_result}, got {result}"
 
-    # Ensure that the random number was called with the correct number of songs
+    # Ensure that the random number was drawn over the id range
     mock_random.assert_called_once_with(3)
 
-    # Ensure the SQL query was executed correctly
-    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, play_count FROM songs WHERE deleted = FALSE")
+    # Ensure the song was looked up by primary key instead of loading the catalog
+    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, deleted FROM songs WHERE id = ?")
     actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
 
     # Assert that the SQL query was correct
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == (2,)
+    mock_cursor.fetchall.assert_not_called()
+
+def test_get_random_song_skips_deleted(mock_cursor, mocker):
+    """Test that a deleted or missing song id is retried with a new random id."""
+
+    mock_cursor.fetchone.side_effect = [
+        (1, 3),
+        (2, "Artist B", "Song B", 2021, "Pop", 180, True),
+        None,
+        (1, "Artist A", "Song A", 2020, "Rock", 210, False)
+    ]
+    mock_random = mocker.patch("music_collection.models.song_model.get_random_int", side_effect=[2, 3, 1])
+
+    result = get_random_song()
+
+    assert result == Song(1, "Artist A", "Song A", 2020, "Rock", 210)
+    assert mock_random.call_count == 3
+
+def test_get_random_song_sparse_catalog(mock_cursor, mocker):
+    """Test falling back to a random offset when no random id hits a live song."""
+
+    mocker.patch("music_collection.models.song_model.RANDOM_SONG_ATTEMPTS", 2)
+    mock_cursor.fetchone.side_effect = [
+        (1, 100),
+        None,
+        None,
+        (1,),
+        (50, "Artist C", "Song C", 2022, "Jazz", 200)
+    ]
+    mocker.patch("music_collection.models.song_model.get_random_int", side_effect=[10, 20, 1])
+
+    result = get_random_song()
+
+    assert result == Song(50, "Artist C", "Song C", 2022, "Jazz", 200)
+
+    expected_query = normalize_whitespace("""
+        SELECT id, artist, title, year, genre, duration
+        FROM songs
+        WHERE deleted = FALSE
+        ORDER BY id
+        LIMIT 1 OFFSET ?
+    """)
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == (0,)
+
+def test_get_random_song_draws_without_a_connection(mock_cursor, mocker):
+    """Test that no connection is checked out while a random number is drawn."""
+    checked_out = []
+    connection = song_model.get_db_connection
+
+    @contextmanager
+    def tracking_connection():
+        checked_out.append(True)
+        with connection() as conn:
+            yield conn
+        checked_out.pop()
+
+    def draw(max_value):
+        assert not checked_out, "random number drawn while holding a connection"
+        return 1
+
+    mocker.patch("music_collection.models.song_model.get_db_connection", tracking_connection)
+    mocker.patch("music_collection.models.song_model.get_random_int", side_effect=draw)
+    mock_cursor.fetchone.side_effect = [(1, 3), (1, "Artist A", "Song A", 2020, "Rock", 210, False)]
+
+    assert get_random_song() == Song(1, "Artist A", "Song A", 2020, "Rock", 210)
 
 def test_get_random_song_empty_catalog(mock_cursor, mocker):
     """Test retrieving a random song when the catalog is empty."""
 
     # Simulate that the catalog is empty
-    mock_cursor.fetchall.return_value = []
+    mock_cursor.fetchone.return_value = (None, None)
+    mock_random = mocker.patch("music_collection.models.song_model.get_random_int")
 
     # Expect a ValueError to be raised when calling get_random_song with an empty catalog
     with pytest.raises(ValueError, match="The song catalog is empty"):
         get_random_song()
 
     # Ensure that the random number was not called since there are no songs
-    mocker.patch("music_collection.models.song_model.get_random").assert_not_called()
-
-    # Ensure the SQL query was executed correctly
-    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, play_count FROM songs WHERE deleted = FALSE")
-    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
-
-    # Assert that the SQL query was correct
-    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    mock_random.assert_not_called()
 
 def test_update_play_count(mock_cursor):
     """Test updating the play count of a song."""
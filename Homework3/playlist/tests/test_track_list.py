@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+import random
+
+import pytest
+
+from music_collection.utils.track_list import TrackList
+
+
+@dataclass
+class Track:
+    id: int
+    duration: int = 180
+
+
+@pytest.fixture
+def tracks():
+    """Fixture for a list of five tracks with ids 1 to 5."""
+    return TrackList(Track(i) for i in range(1, 6))
+
+def ids(tracks: TrackList) -> list[int]:
+    return [track.id for track in tracks]
+
+def assert_index_consistent(tracks: TrackList) -> None:
+    for position, track in enumerate(tracks):
+        assert tracks.contains_id(track.id)
+        assert tracks.get_by_id(track.id) is track
+        assert tracks.index_of(track.id) == position
+
+
+def test_list_behaviour(tracks):
+    """Test that a TrackList reads like a list of tracks."""
+    assert len(tracks) == 5
+    assert tracks[0].id == 1
+    assert tracks[-1].id == 5
+    assert ids(tracks[1:3]) == [2, 3]
+    assert Track(3) in tracks
+    assert Track(9) not in tracks
+    assert tracks == [Track(i) for i in range(1, 6)]
+
+def test_lookup_by_id(tracks):
+    """Test membership, lookup and position by id."""
+    assert tracks.contains_id(4)
+    assert not tracks.contains_id(9)
+    assert tracks.get_by_id(4).id == 4
+    assert tracks.index_of(4) == 3
+    with pytest.raises(KeyError):
+        tracks.get_by_id(9)
+
+def test_duplicate_id_rejected(tracks):
+    """Test that a second track with an existing id is rejected without changing the list."""
+    with pytest.raises(ValueError, match="Track with id 2 is already in the list"):
+        tracks.append(Track(2))
+    with pytest.raises(ValueError, match="Track with id 2 is already in the list"):
+        tracks[0] = Track(2)
+    assert ids(tracks) == [1, 2, 3, 4, 5]
+
+@pytest.mark.parametrize("mutate, expected", [
+    (lambda t: t.append(Track(6)), [1, 2, 3, 4, 5, 6]),
+    (lambda t: t.insert(0, Track(6)), [6, 1, 2, 3, 4, 5]),
+    (lambda t: t.extend([Track(6), Track(7)]), [1, 2, 3, 4, 5, 6, 7]),
+    (lambda t: t.remove_id(3), [1, 2, 4, 5]),
+    (lambda t: t.remove(Track(1)), [2, 3, 4, 5]),
+    (lambda t: t.__delitem__(-1), [1, 2, 3, 4]),
+    (lambda t: t.__delitem__(slice(1, 3)), [1, 4, 5]),
+    (lambda t: t.__setitem__(2, Track(9)), [1, 2, 9, 4, 5]),
+    (lambda t: t.move(5, 0), [5, 1, 2, 3, 4]),
+    (lambda t: t.move(1, 4), [2, 3, 4, 5, 1]),
+    (lambda t: t.move(2, 3), [1, 3, 4, 2, 5]),
+    (lambda t: t.swap(1, 4), [4, 2, 3, 1, 5]),
+    (lambda t: t.clear(), []),
+])
+def test_mutations_keep_index_consistent(tracks, mutate, expected):
+    """Test that every mutation keeps the id index in step with the order."""
+    tracks.index_of(1)  # Build the position cache first so mutations must keep it right
+
+    mutate(tracks)
+
+    assert ids(tracks) == expected
+    assert_index_consistent(tracks)
+    for removed in {1, 2, 3, 4, 5} - set(expected):
+        assert not tracks.contains_id(removed)
+
+def test_move_out_of_range(tracks):
+    """Test that moving past the end is rejected."""
+    with pytest.raises(IndexError):
+        tracks.move(1, 5)
+    assert ids(tracks) == [1, 2, 3, 4, 5]
+
+def test_random_operations_match_list():
+    """Test a long random sequence of operations against a plain list."""
+    rng = random.Random(42)
+    tracks = TrackList(seed=7)
+    expected = []
+    next_id = 1
+
+    for _ in range(3000):
+        operation = rng.random()
+        if operation < 0.35 or not expected:
+            position = rng.randint(0, len(expected))
+            track = Track(next_id, rng.randint(1, 600))
+            tracks.insert(position, track)
+            expected.insert(position, track)
+            next_id += 1
+        elif operation < 0.5:
+            batch = [Track(next_id + i, rng.randint(1, 600)) for i in range(rng.randint(0, 5))]
+            tracks.extend(batch)
+            expected.extend(batch)
+            next_id += len(batch)
+        elif operation < 0.65:
+            track = rng.choice(expected)
+            tracks.remove_id(track.id)
+            expected.remove(track)
+        elif operation < 0.8:
+            track = rng.choice(expected)
+            position = rng.randrange(len(expected))
+            tracks.move(track.id, position)
+            expected.remove(track)
+            expected.insert(position, track)
+        elif operation < 0.9:
+            track_1, track_2 = rng.choice(expected), rng.choice(expected)
+            tracks.swap(track_1.id, track_2.id)
+            index_1, index_2 = expected.index(track_1), expected.index(track_2)
+            expected[index_1], expected[index_2] = expected[index_2], expected[index_1]
+        else:
+            position = rng.randrange(len(expected))
+            del tracks[position]
+            del expected[position]
+
+        assert len(tracks) == len(expected)
+        assert tracks.total_duration == sum(track.duration for track in expected)
+
+    assert list(tracks) == expected
+    assert [tracks[i] for i in range(len(expected))] == expected
+    assert_index_consistent(tracks)
+    start = 0
+    for position, track in enumerate(expected):
+        assert tracks.start_time(position) == start
+        assert tracks.seek(start + track.duration - 1) == (position, track.duration - 1)
+        start += track.duration
+
+def test_durations():
+    """Test total duration, start times and seeking, including after a swap changes durations in place."""
+    tracks = TrackList([Track(1, 100), Track(2, 50), Track(3, 200)])
+
+    assert tracks.total_duration == 350
+    assert [tracks.start_time(i) for i in range(4)] == [0, 100, 150, 350]
+    assert tracks.seek(0) == (0, 0)
+    assert tracks.seek(120) == (1, 20)
+    assert tracks.seek(349) == (2, 199)
+
+    tracks.swap(1, 3)
+    tracks[1] = Track(4, 10)
+
+    assert tracks.total_duration == 310
+    assert [tracks.start_time(i) for i in range(4)] == [0, 200, 210, 310]
+    assert tracks.seek(205) == (1, 5)
+    with pytest.raises(ValueError, match="Invalid playback time: 310"):
+        tracks.seek(310)
+    with pytest.raises(IndexError):
+        tracks.start_time(4)